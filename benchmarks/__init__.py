@@ -0,0 +1,4 @@
+"""Benchmarks of vdd, run with airspeed velocity (asv).
+
+Inputs at benchmark sizes are generated by `vdd.synthetic`.
+"""
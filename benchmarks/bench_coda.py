@@ -0,0 +1,45 @@
+"""CODA model construction and evaluation."""
+from vdd import synthetic
+from vdd.coda import models
+
+
+class Evaluation(object):
+    """Evaluation of a populated model."""
+
+    params = ([10, 100, 1000], [5, 20])
+    param_names = ['requirements', 'characteristics']
+
+    def setup(self, n, m):
+        self.model = synthetic.coda_model(n, m, seed=0)
+
+    def time_merit(self, n, m):
+        self.model.merit
+
+    def time_satisfaction(self, n, m):
+        self.model.satisfaction
+
+    def time_correlation(self, n, m):
+        self.model.correlation
+
+    def time_correlation__uncached(self, n, m):
+        self.model._correlation = None
+        self.model.correlation
+
+    def peakmem_merit(self, n, m):
+        self.model.merit
+
+
+class Construction(object):
+    """Model construction through add_* calls."""
+
+    params = ([10, 100, 1000], [5, 20])
+    param_names = ['requirements', 'characteristics']
+
+    def setup(self, n, m):
+        self.records = synthetic.coda_records(n, m, seed=0)
+
+    def time_add_elements(self, n, m):
+        models.CODA.from_records(self.records)
+
+    def peakmem_add_elements(self, n, m):
+        models.CODA.from_records(self.records)
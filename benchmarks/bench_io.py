@@ -0,0 +1,119 @@
+"""Workbook and Google Sheets parsing."""
+import os
+
+from vdd import synthetic
+from vdd.coda import io as coda_io
+from vdd.coda import models, DATA_DIR
+from vdd.requirements import io as requirements_io
+
+
+SAMPLE_COMPACT = os.path.join(DATA_DIR, 'sample_compact.xlsx')
+SAMPLE_FULL = os.path.join(os.path.dirname(DATA_DIR), 'tests', 'data',
+                           'demo_model.xlsx')
+
+
+class SampleWorkbook(object):
+    """Parsing the bundled sample workbooks."""
+
+    params = ['compact', 'full']
+    param_names = ['layout']
+
+    def setup(self, layout):
+        # The sample's first sheet is deliberately invalid.
+        self.path, self.sheet_name, self.parser_class = {
+            'compact': (SAMPLE_COMPACT, 'Sheet1',
+                        coda_io.CompactExcelParser),
+            'full': (SAMPLE_FULL, 0, coda_io.ExcelParser),
+        }[layout]
+
+    def time_read_excel(self, layout):
+        models.CODA.from_records(
+            self.parser_class(self.path, self.sheet_name)
+        )
+
+    def time_parse(self, layout):
+        parser = self.parser_class(self.path, self.sheet_name)
+        parser.df
+        parser.get_relationships()
+
+
+class LargeWorkbook(object):
+    """Parsing generated workbooks."""
+
+    params = (['compact', 'full'], [100, 1000, 5000])
+    param_names = ['layout', 'requirements']
+    timeout = 300
+
+    def setup_cache(self):
+        # Written once, to asv's working directory for the benchmark.
+        paths = {}
+        for layout in self.params[0]:
+            for n in self.params[1]:
+                records = synthetic.coda_records(n, 20, seed=0)
+                path = os.path.abspath('{}-{}.xlsx'.format(layout, n))
+                synthetic.write_excel(records, path, layout)
+                paths[layout, n] = path
+        return paths
+
+    def setup(self, paths, layout, n):
+        self.path = paths[layout, n]
+        self.parser_class = {'compact': coda_io.CompactExcelParser,
+                             'full': coda_io.ExcelParser}[layout]
+
+    def time_read_excel(self, paths, layout, n):
+        models.CODA.read_excel(self.path, self.parser_class)
+
+    def time_parse(self, paths, layout, n):
+        parser = self.parser_class(self.path)
+        parser.df
+        parser.get_relationships()
+
+    def peakmem_read_excel(self, paths, layout, n):
+        models.CODA.read_excel(self.path, self.parser_class)
+
+
+class _StubFacade(object):
+    # Stands in for common.io.GSheetsFacade, serving fixed rows.
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get_rows(self, value_range=None):
+        return self.rows
+
+
+class GSheetCODAParsing(object):
+    """Parsing CODA models read from Google Sheets."""
+
+    params = [100, 1000, 5000]
+    param_names = ['requirements']
+    timeout = 300
+
+    def setup(self, n):
+        rows = synthetic.coda_rows(synthetic.coda_records(n, 20, seed=0))
+        self.sheet = coda_io.GSheetCODA('Benchmark')
+        self.sheet._facade = _StubFacade(rows)
+
+    def time_from_records(self, n):
+        self.sheet.refresh()
+        models.CODA.from_records(self.sheet)
+
+
+class GSheetBinWMValidation(object):
+    """Validating binary weighting matrices read from Google Sheets."""
+
+    params = [10, 100, 1000]
+    param_names = ['requirements']
+
+    def setup(self, n):
+        rows = synthetic.binwm_rows(synthetic.binwm_matrix(n, seed=0))
+        self.sheet = requirements_io.GSheetBinWM('Benchmark')
+        self.sheet._facade = _StubFacade(rows)
+
+    def time_df(self, n):
+        self.sheet.refresh()
+        self.sheet.df
+
+    def peakmem_df(self, n):
+        self.sheet.refresh()
+        self.sheet.df
@@ -0,0 +1,26 @@
+"""Requirements weighting."""
+from vdd import synthetic
+
+
+class BinWMScore(object):
+
+    params = [10, 100, 1000, 5000]
+    param_names = ['requirements']
+
+    def setup(self, n):
+        self.bwm = synthetic.binwm(n, noise=0.5, seed=0)
+
+    def time_score(self, n):
+        # From the decisions, discarding the cached score.
+        self.bwm._tally = self.bwm._score = None
+        self.bwm.score
+
+    def time_score__incremental(self, n):
+        # Revising a decision of a scored matrix.
+        self.bwm.score
+        self.bwm._set_decision(0, n - 1, not self.bwm._decisions[0, n - 1])
+        self.bwm.score
+
+    def peakmem_score(self, n):
+        self.bwm._tally = self.bwm._score = None
+        self.bwm.score
@@ -73,7 +73,8 @@ setup(
 
     # You can just specify the packages manually here if your project is
     # simple. Or you can use find_packages().
-    packages=find_packages(exclude=['contrib', 'docs', 'tests']),
+    packages=find_packages(exclude=['benchmarks', 'contrib', 'docs',
+                                    'tests']),
 
     # Alternatively, if you want to distribute just a my_module.py, uncomment
     # this:
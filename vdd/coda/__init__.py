@@ -2,5 +2,7 @@ import os
 
 from .models import CODA
 from .io import CompactExcelParser, ExcelParser
+from .qfd import HouseOfQuality
+from .watch import WorkbookWatcher
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
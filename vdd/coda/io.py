@@ -1,7 +1,8 @@
 import abc
 import re
 import collections
-import itertools
+import multiprocessing
+import os
 import warnings
 
 import numpy as np
@@ -13,6 +14,12 @@ except ImportError:
     warnings.warn('`pandas` and `xlrd` packages required for '
                   'spreadsheet support.')
 
+try:
+    import openpyxl
+except ImportError:
+    # Only required for writing workbooks.
+    openpyxl = None
+
 from .. import common
 
 
@@ -59,22 +66,70 @@ class CODASheet(common.ABC):
         return list[()]
 
 
+class CODARecords(CODASheet):
+    """In-memory source holding the records read from another source.
+
+    Records are stored as plain tuples so instances are compact and
+    picklable (the record classes above are not), making them suitable
+    for passing parsed models between processes.
+    """
+
+    def __init__(self, requirements=(), characteristics=(),
+                 relationships=()):
+        self._requirements = tuple(map(tuple, requirements))
+        self._characteristics = tuple(map(tuple, characteristics))
+        self._relationships = tuple(map(tuple, relationships))
+
+    @classmethod
+    def from_sheet(cls, sheet):
+        """Read all records from another CODASheet."""
+        return cls(sheet.get_requirements(),
+                   sheet.get_characteristics(),
+                   sheet.get_relationships())
+
+    def get_characteristics(self):
+        return [self.CDefRecord(*rec) for rec in self._characteristics]
+
+    def get_requirements(self):
+        return [self.ReqRecord(*rec) for rec in self._requirements]
+
+    def get_relationships(self):
+        return [self.OptRelRecord(*rec) if rec[2] == 'opt'
+                else self.MinMaxRelRecord(*rec)
+                for rec in self._relationships]
+
+
 class ExcelParser(CODASheet):
 
     # 20 characteristic definitions are supported ((4*26)/5 cols)
     _MAX_COL = 'CZ'
     _NCOLS_CHAR = 4
+    # First column of the relationship cells in `df`
+    _RELATIONSHIP_COLUMN = 'Correlation'
+
+    def __init__(self, path, sheet_name=0):
+        """
+            path: str | pd.ExcelFile
+                Filesystem path to the workbook, or an open workbook
+                (avoids re-reading the file for each sheet).
 
-    def __init__(self, path):
+            sheet_name: int | str
+                Index or name of the CODA sheet within the workbook.
+        """
         self.path = path
+        self.sheet_name = sheet_name
 
     @property
+    @common.instrument.timed('ExcelParser.df')
     def df(self):
         """DataFrame of requirement-characteristic relationships."""
         try:
             return self._df
         except AttributeError:
-            df = self._df = pd.read_excel(self.path, skiprows=[0,1])
+            df = self._df = pd.read_excel(self.path,
+                                          sheet_name=self.sheet_name,
+                                          skiprows=[0,1])
+            common.instrument.count('ExcelParser.rows', len(df))
             return df
 
     @property
@@ -88,6 +143,7 @@ class ExcelParser(CODASheet):
         except AttributeError:
             df = pd.read_excel(
                 self.path,
+                sheet_name=self.sheet_name,
                 usecols="C:{}".format(self._MAX_COL)
             )[:1]
 
@@ -145,29 +201,43 @@ class ExcelParser(CODASheet):
 
         return self._parse_row(reqts, chars)
 
-    def _parse_row(self, reqts, chars):
+    @property
+    def relationship_values(self):
+        """2D array of the relationship cells (row per requirement).
 
-        n = self._NCOLS_CHAR
-        df = self.df.loc[:,'Correlation':]
+        Each characteristic occupies a group of adjacent columns.
+        """
+        return self.df.loc[:,self._RELATIONSHIP_COLUMN:].values
 
-        relationships = []
-        for (i, r), (j, c) in itertools.product(enumerate(reqts),
-                                                enumerate(chars)):
-            row = df.loc[i,:].values
-            base_tup = (r, c, row[j*n+1], row[j*n+0], row[j*n+2])
+    @common.instrument.timed('ExcelParser._parse_row')
+    def _parse_row(self, reqts, chars):
+        values = self.relationship_values
 
-            if np.isnan(base_tup[4]):
-                # The target value is always a quantity.
-                continue
+        relationships = []
+        for i, r in enumerate(reqts):
+            for j, c in enumerate(chars):
+                tup = self._parse_relationship(values[i], j, r, c)
+                if tup is not None:
+                    relationships.append(tup)
+
+        common.instrument.count('ExcelParser.relationships',
+                                len(relationships))
+        return relationships
 
-            if base_tup[2] == 'opt':
-                tup = self.OptRelRecord(*(base_tup + (row[j*n+3],)))
-            else:
-                tup = self.MinMaxRelRecord(*base_tup)
+    def _parse_relationship(self, row, j, r, c):
+        # Record for the j-th characteristic group in a row of
+        # relationship values, or None if no relationship is defined.
+        n = self._NCOLS_CHAR
+        base_tup = (r, c, row[j*n+1], row[j*n+0], row[j*n+2])
 
-            relationships.append(tup)
+        if np.isnan(base_tup[4]):
+            # The target value is always a quantity.
+            return None
 
-        return relationships
+        if base_tup[2] == 'opt':
+            return self.OptRelRecord(*(base_tup + (row[j*n+3],)))
+        else:
+            return self.MinMaxRelRecord(*base_tup)
 
     def get_requirements(self):
         cols = ('Weighting', 'Requirements')
@@ -178,6 +248,7 @@ class ExcelParser(CODASheet):
 class CompactExcelParser(ExcelParser):
 
     _NCOLS_CHAR = 3
+    _RELATIONSHIP_COLUMN = 'Relationship Type'
 
     def _cdf_base(self, df):
         dd = collections.defaultdict(list)
@@ -202,36 +273,306 @@ class CompactExcelParser(ExcelParser):
         self._cdf = unordered_transformed_df[sorted_columns]
         return self._cdf
 
-    def _parse_row(self, reqts, chars):
+    def _parse_relationship(self, row, j, r, c):
         n = self._NCOLS_CHAR
-        df = self.df.loc[:,'Relationship Type':]
+        rel = row[j*n]
 
-        relationships = []
-        for (i, r), (j, c) in itertools.product(enumerate(reqts),
-                                                enumerate(chars)):
-            row = df.loc[i,:].values
-            rel = row[j*n]
+        try:
+            type_ = {'+': 'max', 'o': 'opt', '-': 'min'}[rel[0]]
+        except (TypeError, IndexError):
+            # rel is not a recognised string.
+            return None
+
+        base_tup = (r, c, type_, rel, row[j*n+1])
+
+        if np.isnan(base_tup[4]):
+            # The target value is always a quantity.
+            return None
+
+        if base_tup[2] == 'opt':
+            return self.OptRelRecord(*(base_tup + (row[j*n+2],)))
+        else:
+            return self.MinMaxRelRecord(*base_tup)
+
+
+def write_excel(source, path, sheet_name='CODA'):
+    """Write the records in a CODASheet as an Excel template.
+
+    The workbook uses the layout read by ExcelParser (correlations
+    and relationship types in separate columns).
+    """
+    characteristics = source.get_characteristics()
+    requirements = source.get_requirements()
+    cidx = {rec[0]: j for j, rec in enumerate(characteristics)}
+    ridx = {rec[0]: i for i, rec in enumerate(requirements)}
+
+    n = ExcelParser._NCOLS_CHAR
+    body = [[name, weight] + [None] * (n * len(characteristics))
+            for name, weight in requirements]
+    for rec in source.get_relationships():
+        row = body[ridx[rec[0]]]
+        j = 2 + cidx[rec[1]] * n
+        row[j:j+3] = rec[3], rec[2], rec[4]
+        if rec[2] == 'opt':
+            row[j+3] = rec[5]
+
+    rows = [[None, 'Characteristics'], [None, None],
+            ['Requirements', 'Weighting']]
+    for name, min_, max_ in characteristics:
+        rows[0] += [name, None, None, None]
+        rows[1] += ['Min', min_, 'Max', max_]
+        rows[2] += ['Correlation', 'Relationship Type', 'Target Value',
+                    'Tolerance']
+
+    with ExcelResultWriter(path, sheet_name=sheet_name) as writer:
+        writer.write_rows(rows + body)
+
+
+def write_compact_excel(source, path, sheet_name='CODA'):
+    """Write the records in a CODASheet as a compact Excel template.
+
+    The workbook uses the layout read by CompactExcelParser, so it
+    round trips with `CODA.from_excel`. Relationship correlations may
+    be symbolic (e.g. '++') or numeric (0.1, 0.3, 0.9).
+    """
+    characteristics = source.get_characteristics()
+    requirements = source.get_requirements()
+    cidx = {rec[0]: j for j, rec in enumerate(characteristics)}
+    ridx = {rec[0]: i for i, rec in enumerate(requirements)}
+
+    n = CompactExcelParser._NCOLS_CHAR
+    body = [[name, weight] + [None] * (n * len(characteristics))
+            for name, weight in requirements]
+    for rec in source.get_relationships():
+        row = body[ridx[rec[0]]]
+        j = 2 + cidx[rec[1]] * n
+        row[j] = _relationship_symbol(rec[2], rec[3])
+        row[j+1] = rec[4]
+        if rec[2] == 'opt':
+            row[j+2] = rec[5]
+
+    rows = [[None, 'Characteristics'], [None, None],
+            ['Requirements', 'Weighting']]
+    for name, min_, max_ in characteristics:
+        rows[0] += [name, None, None]
+        rows[1] += ['Bounds', min_, max_]
+        rows[2] += ['Relationship Type', 'Target Value', 'Tolerance']
+
+    with ExcelResultWriter(path, sheet_name=sheet_name) as writer:
+        writer.write_rows(rows + body)
+
+
+def _relationship_symbol(relationship_type, correlation):
+    # Compact notation, e.g. ('max', 0.3) -> '++'
+    char = {'max': '+', 'opt': 'o', 'min': '-'}[relationship_type]
+    if isinstance(correlation, str) and set(correlation) == {char}:
+        return correlation
+    try:
+        return char * {0.1: 1, 0.3: 2, 0.9: 3}[correlation]
+    except KeyError:
+        raise ValueError(
+            "Correlation {!r} has no compact notation".format(
+                correlation
+            )
+        )
 
-            try:
-                type_ = {'+': 'max', 'o': 'opt', '-': 'min'}[rel[0]]
-            except (TypeError, IndexError):
-                # rel is not a recognised string.
-                continue
 
-            base_tup = (r, c, type_, rel, row[j*n+1])
+class ExcelResultWriter(object):
+    """Writes rows of values to a new Excel workbook.
+
+    Rows are streamed to disk as they are written (openpyxl's
+    write-only mode), so large tables are written in constant memory.
+    The workbook is saved when the writer is closed; use it as a
+    context manager:
+
+        with ExcelResultWriter('results.xlsx', header) as writer:
+            writer.write_rows(rows)
+    """
+
+    def __init__(self, path, header=None, sheet_name='Results'):
+        """
+            path: str
+                Path to save the workbook to.
+
+            header: sequence, optional
+                First row of the sheet.
+
+            sheet_name: str
+                Name of the worksheet.
+        """
+        if openpyxl is None:
+            raise ImportError("`openpyxl` package required for "
+                              "writing Excel workbooks.")
+        self.path = path
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(sheet_name)
+        if header is not None:
+            self.write_row(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_row(self, row):
+        """Append a row; NaNs are written as blank cells."""
+        self._sheet.append([self._cell_value(x) for x in row])
+
+    def write_rows(self, rows):
+        """Append rows from any iterable (consumed lazily)."""
+        for row in rows:
+            self.write_row(row)
+
+    def close(self):
+        """Save the workbook."""
+        self._workbook.save(self.path)
+
+    @staticmethod
+    def _cell_value(x):
+        if isinstance(x, np.generic):
+            x = x.item()
+        if isinstance(x, float) and np.isnan(x):
+            return None
+        return x
+
+
+class TableParser(CODASheet):
+    """Parser for CODA models stored as long-form tables.
+
+    A model is stored in a directory as three tables (one file each,
+    named after the table, e.g. 'relationships.csv'):
+
+      - requirements: name, weight
+      - characteristics: name, min, max
+      - relationships: requirement, characteristic, type,
+        correlation, target, tolerance
+
+    Each row is a single record, so tables can be generated, streamed
+    and diffed line by line. Blank bounds and tolerances are read as
+    NaN.
+    """
+
+    COLUMNS = collections.OrderedDict([
+        ('requirements', ['name', 'weight']),
+        ('characteristics', ['name', 'min', 'max']),
+        ('relationships', ['requirement', 'characteristic', 'type',
+                           'correlation', 'target', 'tolerance']),
+    ])
+
+    # Labels are always read as strings (e.g. a requirement "1"), as
+    # are correlations, which may mix symbols ('+++') and numbers.
+    _STR_COLUMNS = ('name', 'requirement', 'characteristic', 'type',
+                    'correlation')
+
+    FORMATS = ('csv', 'parquet')
 
-            if np.isnan(base_tup[4]):
-                # The target value is always a quantity.
-                continue
+    def __init__(self, path, format='csv'):
+        """
+            path: str
+                Directory containing the tables.
+
+            format: str {'csv', 'parquet'}
+                Storage format of the tables (Parquet requires
+                `pyarrow` or `fastparquet`).
+        """
+        if format not in self.FORMATS:
+            raise ValueError(
+                "format must be one of {}".format(self.FORMATS)
+            )
+        self.path = path
+        self.format = format
+
+    @classmethod
+    def table_path(cls, path, table, format='csv'):
+        """Path to a table file within the model directory."""
+        return os.path.join(path, '{}.{}'.format(table, format))
+
+    def read_table(self, table):
+        """DataFrame of a single table, with the schema's columns."""
+        path = self.table_path(self.path, table, self.format)
+        columns = self.COLUMNS[table]
+        if self.format == 'csv':
+            dtype = {col: str for col in columns
+                     if col in self._STR_COLUMNS}
+            df = pd.read_csv(path, dtype=dtype)
+        else:
+            df = pd.read_parquet(path)
+
+        missing = set(columns).difference(df.columns)
+        if missing:
+            raise ValueError(
+                "Table '{}' is missing columns {}".format(
+                    table, sorted(missing)
+                )
+            )
+        df = df[columns]
+        if 'correlation' in columns:
+            df = df.assign(correlation=df['correlation'].map(
+                self._parse_correlation
+            ))
+        return df
 
-            if base_tup[2] == 'opt':
-                tup = self.OptRelRecord(*(base_tup + (row[j*n+2],)))
+    @staticmethod
+    def _parse_correlation(value):
+        # Numeric correlations as numbers; others (e.g. '+++') are
+        # left for the relationship to look up.
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+
+    def get_characteristics(self):
+        df = self.read_table('characteristics')
+        return [self.CDefRecord(*rec)
+                for rec in df.itertuples(index=False)]
+
+    def get_requirements(self):
+        df = self.read_table('requirements')
+        return [self.ReqRecord(*rec)
+                for rec in df.itertuples(index=False)]
+
+    def get_relationships(self):
+        records = []
+        df = self.read_table('relationships')
+        for rec in df.itertuples(index=False):
+            if rec.type == 'opt':
+                records.append(self.OptRelRecord(*rec))
             else:
-                tup = self.MinMaxRelRecord(*base_tup)
+                records.append(self.MinMaxRelRecord(*rec[:-1]))
+        return records
 
-            relationships.append(tup)
 
-        return relationships
+def write_tables(source, path, format='csv'):
+    """Write the records in a CODASheet as long-form tables.
+
+    See TableParser for the layout; the directory is created if
+    necessary and existing tables are overwritten.
+    """
+    if format not in TableParser.FORMATS:
+        raise ValueError(
+            "format must be one of {}".format(TableParser.FORMATS)
+        )
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    relationships = [
+        # Min/max records have no tolerance.
+        tuple(rec) + (np.nan,) * (6 - len(rec))
+        for rec in source.get_relationships()
+    ]
+    tables = {
+        'requirements': source.get_requirements(),
+        'characteristics': source.get_characteristics(),
+        'relationships': relationships,
+    }
+    for table, columns in TableParser.COLUMNS.items():
+        df = pd.DataFrame.from_records(tables[table], columns=columns)
+        fpath = TableParser.table_path(path, table, format)
+        if format == 'csv':
+            df.to_csv(fpath, index=False)
+        else:
+            df.to_parquet(fpath, index=False)
 
 
 class GSheetCODA(common.io.AbstractGSheet, CompactExcelParser):
@@ -251,7 +592,7 @@ class GSheetCODA(common.io.AbstractGSheet, CompactExcelParser):
             # we don't benefit hugely by relying on external process
             # to generate the dataframe and it can cause issues with
             # the very non-standard CODA sheet layout.
-            rows = self._facade.get_rows()
+            rows = self._facade.get_rows(self._value_range)
             header = rows[0]
             body = rows[1:]
 
@@ -264,6 +605,84 @@ class GSheetCODA(common.io.AbstractGSheet, CompactExcelParser):
                 self._cached_df = df
                 return self._cached_df
 
+    # Typed, read-only form of the source cells (see _parsed).
+    _ParsedSheet = collections.namedtuple(
+        '_ParsedSheet',
+        ['characteristic_label', 'requirement_label', 'characteristics',
+         'requirements', 'relationship_fields', 'relationship_types',
+         'target_values', 'tolerances']
+    )
+
+    @property
+    def _parsed(self):
+        # Source cells parsed once per fetched revision (i.e. per raw
+        # dataframe); all the derived views read from this.
+        df = self.df
+        try:
+            source, parsed = self._cached_parsed
+        except AttributeError:
+            pass
+        else:
+            if source is df:
+                return parsed
+
+        parsed = self._parse(df)
+        self._cached_parsed = (df, parsed)
+        return parsed
+
+    def _parse(self, df):
+        # Sheet layout (compact): the header holds the characteristic
+        # names (every third column from C), the first row their
+        # bounds and the second row the relationship field labels.
+        # Requirements and weights are in the first two columns
+        # below these.
+        n = self._NCOLS_CHAR
+        cells = df.values
+        names = list(df.columns[2::n])
+        if (cells.shape[1] - 2) % n or cells.shape[0] < 2:
+            raise self.InvalidSource("Unexpected CODA table layout.")
+
+        # First column of each group is a label ('Bounds').
+        bounds = cells[0,2:].reshape(-1, n)[:,1:]
+        bounds = self._to_float(bounds)
+        characteristics = tuple(
+            self.CDefRecord(name, min_, max_)
+            for name, (min_, max_) in zip(names, bounds)
+        )
+
+        body = cells[2:]
+        weights = self._to_float(body[:,1])
+        requirements = tuple(
+            self.ReqRecord(name, weight)
+            for name, weight in zip(body[:,0], weights)
+        )
+
+        relationship_cells = body[:,2:].reshape(len(body), -1, n)
+        types = relationship_cells[:,:,0].astype(str)
+        targets = self._to_float(relationship_cells[:,:,1])
+        tolerances = self._to_float(relationship_cells[:,:,2])
+        for array in types, targets, tolerances:
+            array.flags.writeable = False
+
+        return self._ParsedSheet(
+            characteristic_label=df.columns[1],
+            requirement_label=df.columns[0] or 'Requirements',
+            characteristics=characteristics,
+            requirements=requirements,
+            relationship_fields=tuple(cells[1,2:2+n]),
+            relationship_types=types,
+            target_values=targets,
+            tolerances=tolerances
+        )
+
+    def _to_float(self, cells):
+        # Blank cells are NaN.
+        cells = np.asarray(cells, dtype=object)
+        try:
+            return np.where(cells == '', np.nan, cells).astype(float)
+        except ValueError:
+            raise self.InvalidSource("Expected numeric values.")
+
     @property
     def characteristic_df(self):
         """Dataframe containing characteristic definitions.
@@ -271,38 +690,24 @@ class GSheetCODA(common.io.AbstractGSheet, CompactExcelParser):
         Each row is a characteristic (index) with min/max bounds for
         the possible values.
         """
-        # Characteristics are the first row (sparse, excluding the
-        # label in B1).
-        label = self.df.columns[1]
-        df = self._drop_df_columns_by_index(self.df, [0, 1])
-        df = self._extract_characteristic_bounds(df)
+        parsed = self._parsed
+        df = pd.DataFrame.from_records(
+            list(parsed.characteristics),
+            columns=self.CDefRecord._fields
+        )
         df = df.set_index('name')
-        df.index.name = label
-
-        df = df.replace('', np.nan)
-        df['max'] = df['max'].astype(float)
-        df['min'] = df['min'].astype(float)
+        df.index.name = parsed.characteristic_label
         return df
 
-    @staticmethod
-    def _drop_df_columns_by_index(df, indices):
-        keep = set(range(df.shape[1])).difference(set(indices))
-        return df.iloc[:,list(sorted(keep))]
-
-    def _extract_characteristic_bounds(self, df):
-        # Glue to improve readibility; TODO: deprecate "_cdf_base"
-        return self._cdf_base(df)
-
     @property
     def requirement_df(self):
         """Dataframe containing the requirements with weighting."""
-        label = self.df.iloc[2,0]
-        df = self.df.iloc[2:,:2]
-        df.columns = ['Requirement', 'Weight']
-        df = df.set_index('Requirement')
-        df.index.name = 'Requirement'
-        df['Weight'] = df['Weight'].astype(float)
-        return df
+        parsed = self._parsed
+        df = pd.DataFrame.from_records(
+            list(parsed.requirements),
+            columns=['Requirement', 'Weight']
+        )
+        return df.set_index('Requirement')
 
     @property
     def relationship_df(self):
@@ -311,45 +716,25 @@ class GSheetCODA(common.io.AbstractGSheet, CompactExcelParser):
         Relationship property / subcolumns are coerced to the
         appropriate data type.
         """
-        # Fill all column headers (currently they are sparse)
-
-        df = self.df
-        df.columns = pd.Series(df.columns).replace('', np.nan).ffill()
-
-        # Preserve the relationship fields (tolerance etc.)
-        relationship_fields = self.df.iloc[1,2:]
-
-        # Get rid of the first two rows (characteristic bounds and
-        # relationship field labels)
-        df = self.df.drop([0, 1])
-
-        # Get rid of the requirements weighting column, we don't need
-        # it here.
-        df = self._drop_df_columns_by_index(df, [1])
-
-        # Requirements (index) column is currently NaN label
-        # TODO: "Requirements" should be singular; but, this should
-        #       also be up to the user to label and we just base it
-        #       off whatever is in that cell.
-        df.columns = df.columns.fillna('Requirements')
-        df = df.set_index('Requirements')
-
-        # Convert the columns into a multi-index
-        arrays = [relationship_fields.index.values,
-                  relationship_fields.values]
-        df.columns = pd.MultiIndex.from_tuples(
-            list(zip(*arrays)),
+        parsed = self._parsed
+        characteristics = [rec.name for rec in parsed.characteristics]
+        columns = pd.MultiIndex.from_product(
+            [characteristics, parsed.relationship_fields],
             names=['characteristic', 'relationship_property']
         )
-
-        # Convert the column datatypes
-        for header in 'Target Value', 'Tolerance':
-            col_idxs = df.columns.get_level_values(1)==header
-            cols = df.iloc[:,col_idxs]
-            cols = cols.replace('', np.nan)
-            cols = cols.astype(float)
-            df.iloc[:,col_idxs] = cols
-
+        index = pd.Index([rec.name for rec in parsed.requirements],
+                         name=parsed.requirement_label)
+
+        # Interleave the fields for each characteristic.
+        data = collections.OrderedDict()
+        arrays = (parsed.relationship_types, parsed.target_values,
+                  parsed.tolerances)
+        for j, characteristic in enumerate(characteristics):
+            for field, array in zip(parsed.relationship_fields, arrays):
+                data[characteristic, field] = array[:,j]
+
+        df = pd.DataFrame(data, index=index)
+        df.columns = columns
         return df
 
     def is_valid(self):
@@ -358,14 +743,11 @@ class GSheetCODA(common.io.AbstractGSheet, CompactExcelParser):
         # parsers).
         pattern = re.compile(r'(^\++$|^-+$|^o+$)|^$')
         vectorised_match = np.vectorize(
-            lambda x: pattern.match(x) is not None
+            lambda x: pattern.match(x) is not None,
+            otypes=[bool]
         )
-        df = self.relationship_df
-
-
-        filt = df.columns.get_level_values(1) == 'Relationship Type'
-        values = df.iloc[:,filt].values
-        if not vectorised_match(values).all():
+        types = self._parsed.relationship_types
+        if types.size and not vectorised_match(types).all():
             warnings.warn(
                 """Invalid relationship_type notation in source."""
             )
@@ -383,8 +765,7 @@ class GSheetCODA(common.io.AbstractGSheet, CompactExcelParser):
 
         list of GSheetCODA.CDefRecord
         """
-        return [self.CDefRecord(*record)
-                for record in self.characteristic_df.itertuples()]
+        return list(self._parsed.characteristics)
 
     def get_requirements(self):
         """List requirements and their weights defined in the source.
@@ -397,8 +778,7 @@ class GSheetCODA(common.io.AbstractGSheet, CompactExcelParser):
 
         list of GSheetCODA.ReqRecord
         """
-        return [self.ReqRecord(*record)
-                for record in self.requirement_df.itertuples()]
+        return list(self._parsed.requirements)
 
     def get_relationships(self):
         """List relationships defined in the source.
@@ -413,58 +793,161 @@ class GSheetCODA(common.io.AbstractGSheet, CompactExcelParser):
         """
         type_lookup = {'+': 'max', 'o': 'opt', '-': 'min'}
 
+        parsed = self._parsed
+        types = parsed.relationship_types
+        targets = parsed.target_values
+        tolerances = parsed.tolerances
+
+        # Cells are empty if all of the fields are blank.
+        defined = ((types != '') | ~np.isnan(targets)
+                   | ~np.isnan(tolerances))
+
         coerced_records = []
-        df = self.relationship_df
-        for ch in df.columns.unique(level='characteristic'):
-            # Each characteristic has 3 sub-columns so we create a
-            # dataframe, make sure it's NaNs not blanks and drop any
-            # rows that are empty.
-            ch_cols = df[ch].replace('', np.nan).dropna(how='all')
-
-            for record in ch_cols.to_records():
-
-                req = record[0] # Ignore the specific field name
-
-                # Derive the relationship type
-                type_symbolic = record['Relationship Type']
-                type_name = type_lookup[type_symbolic[0]]
-
-                target_value = record['Target Value']
-
-                tolerance = record['Tolerance']
-                if pd.isnull(tolerance):
-                    tolerance = None
-                elif type_name != 'opt':
-                    warnings.warn("Tolerance specified for a "
-                                  "non-optimising relationship "
-                                  "({}, {})".format(req, ch))
-                    tolerance = None
-
-                # Fix this variable record length? It's better now
-                # it's a list of variable type.
-                if type_name in ('min', 'max'):
-                    coerced_records.append(
-                        self.MinMaxRelRecord(
-                            characteristic=ch,
-                            requirement=req,
-                            relationship_type=type_name,
-                            correlation=type_symbolic,
-                            neutral_value=target_value
-                        )
+        for i, j in zip(*np.nonzero(defined.T)[::-1]):
+            req = parsed.requirements[i].name
+            ch = parsed.characteristics[j].name
+
+            # Derive the relationship type
+            type_symbolic = types[i,j]
+            type_name = type_lookup[type_symbolic[0]]
+
+            target_value = targets[i,j]
+
+            tolerance = tolerances[i,j]
+            if np.isnan(tolerance):
+                tolerance = None
+            elif type_name != 'opt':
+                warnings.warn("Tolerance specified for a "
+                              "non-optimising relationship "
+                              "({}, {})".format(req, ch))
+                tolerance = None
+
+            # Fix this variable record length? It's better now
+            # it's a list of variable type.
+            if type_name in ('min', 'max'):
+                coerced_records.append(
+                    self.MinMaxRelRecord(
+                        characteristic=ch,
+                        requirement=req,
+                        relationship_type=type_name,
+                        correlation=type_symbolic,
+                        neutral_value=target_value
                     )
-                elif type_name == 'opt':
-                    coerced_records.append(
-                        self.OptRelRecord(
-                            characteristic=ch,
-                            requirement=req,
-                            relationship_type=type_name,
-                            correlation=type_symbolic,
-                            optimum_value=target_value,
-                            tolerance=tolerance
-                        )
+                )
+            elif type_name == 'opt':
+                coerced_records.append(
+                    self.OptRelRecord(
+                        characteristic=ch,
+                        requirement=req,
+                        relationship_type=type_name,
+                        correlation=type_symbolic,
+                        optimum_value=target_value,
+                        tolerance=tolerance
                     )
+                )
 
         return coerced_records
 
     def update(self, df):
         raise NotImplementedError
+
+
+# --------------------------------------------------------------------
+# Batch loading
+# --------------------------------------------------------------------
+WorkbookResult = collections.namedtuple(
+    'WorkbookResult',
+    ['path', 'sheet_name', 'records', 'error']
+)
+
+
+def find_workbooks(directory, extensions=('.xlsx', '.xlsm', '.xls')):
+    """List the workbooks in a directory tree, sorted by path.
+
+    Excel lock files (prefixed '~$') are ignored.
+    """
+    paths = []
+    for root, _, fnames in os.walk(directory):
+        for fname in fnames:
+            ext = os.path.splitext(fname)[1].lower()
+            if ext in extensions and not fname.startswith('~$'):
+                paths.append(os.path.join(root, fname))
+    return sorted(paths)
+
+
+def read_workbooks(paths, parser_class=CompactExcelParser,
+                   sheet_names=None, processes=None):
+    """Parse CODA sheets from many workbooks in a process pool.
+
+    Parameters
+    ----------
+
+    paths : str or list of str
+        Workbook paths, or a directory to search for workbooks.
+
+    parser_class : type
+        ExcelParser or CompactExcelParser, depending on the layout.
+
+    sheet_names : list, optional
+        Sheets to parse in each workbook (default: all sheets).
+
+    processes : int, optional
+        Size of the process pool (default: number of CPUs). If 1,
+        workbooks are parsed serially in this process.
+
+    Returns
+    -------
+
+    list of WorkbookResult
+        One result per sheet (or per workbook if it can't be opened)
+        in path order. Each holds either the parsed `CODARecords` or
+        a description of the error; errors don't abort the batch.
+    """
+    if not isinstance(paths, (list, tuple)):
+        paths = find_workbooks(paths)
+    tasks = [(path, parser_class, sheet_names) for path in paths]
+
+    if processes == 1 or len(tasks) <= 1:
+        batches = list(map(_parse_workbook, tasks))
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            batches = pool.map(_parse_workbook, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    return [result for batch in batches for result in batch]
+
+
+def _parse_workbook(task):
+    # Pool worker (module level so it can be pickled). The workbook is
+    # opened once and shared by the parsers for each sheet. Errors are
+    # reported as strings as not all exceptions survive pickling.
+    path, parser_class, sheet_names = task
+    try:
+        workbook = pd.ExcelFile(path)
+    except Exception as err:
+        return [WorkbookResult(path, None, None, _describe_error(err))]
+
+    results = []
+    try:
+        if sheet_names is None:
+            sheet_names = workbook.sheet_names
+        for sheet_name in sheet_names:
+            try:
+                parser = parser_class(workbook, sheet_name=sheet_name)
+                records = CODARecords.from_sheet(parser)
+            except Exception as err:
+                results.append(WorkbookResult(path, sheet_name, None,
+                                              _describe_error(err)))
+            else:
+                results.append(WorkbookResult(path, sheet_name,
+                                              records, None))
+    finally:
+        workbook.close()
+    return results
+
+
+def _describe_error(err):
+    return '{}: {}'.format(type(err).__name__, err)
@@ -13,10 +13,17 @@ from __future__ import division
 
 from operator import attrgetter, itemgetter
 import abc
-import collections
+import itertools
+
+try:
+    from collections.abc import Sequence
+except ImportError:
+    # Python 2
+    from collections import Sequence
 
 import numpy as np
 
+from .. import common
 from . import io
 
 try:
@@ -47,7 +54,7 @@ class CODA(object):
         return cls.read_excel(path, parser_class)
 
     @classmethod
-    def from_google_sheet(cls, workbook_name):
+    def from_google_sheet(cls, workbook_name, value_range=None):
         """Construct a CODA model from a Google Sheet.
 
         Parameters
@@ -56,6 +63,10 @@ class CODA(object):
         workbook_name : str
             Name of shared Google Sheet
 
+        value_range : str, optional
+            Range of the sheet holding the model, in A1 notation
+            (default: the used range).
+
         Returns
         -------
 
@@ -69,10 +80,122 @@ class CODA(object):
         which credentials are provided in the configuration
         directory.
         """
-        sheet = cls._get_sheet(workbook_name)
+        sheet = cls._get_sheet(workbook_name, value_range)
         model = cls()
         return cls._transfer_elements(model, sheet)
 
+    @classmethod
+    def afrom_google_sheet(cls, workbook_name, value_range=None,
+                           executor='sheets'):
+        """Awaitable `from_google_sheet`, run in an executor.
+
+        e.g. `model = await CODA.afrom_google_sheet(name)`. The
+        executor bounds concurrent fetches; see `common.aio`.
+        """
+        return common.aio.run_in_executor(executor, cls.from_google_sheet,
+                                          workbook_name, value_range)
+
+    @classmethod
+    def from_google_sheets(cls, workbook_names, threads=8):
+        """Construct CODA models from many Google Sheets.
+
+        Sheets are fetched concurrently, rate limited to the Sheets
+        API quota, and cached by revision; see
+        `common.io.fetch_sheets`.
+
+        Parameters
+        ----------
+
+        workbook_names : iterable of str
+            Names of shared Google Sheets.
+
+        threads : int
+            Maximum number of concurrent fetches.
+
+        Returns
+        -------
+
+        models : dict
+            Populated CODA models keyed by workbook name.
+
+        errors : dict
+            Descriptions of the errors raised fetching or
+            constructing a model, keyed by workbook name.
+        """
+        models, errors = {}, {}
+        for result in common.io.fetch_sheets(io.GSheetCODA,
+                                             workbook_names,
+                                             threads=threads):
+            if result.error is not None:
+                errors[result.workbook_name] = result.error
+                continue
+            try:
+                models[result.workbook_name] = cls._transfer_elements(
+                    cls(), result.sheet
+                )
+            except Exception as err:
+                errors[result.workbook_name] = io._describe_error(err)
+        return models, errors
+
+    @classmethod
+    def from_excel_batch(cls, paths, parser_class=io.CompactExcelParser,
+                         processes=None):
+        """Construct CODA models from many Excel workbooks.
+
+        Workbooks (and every sheet within them) are parsed in
+        parallel; see `io.read_workbooks`.
+
+        Parameters
+        ----------
+
+        paths : str or list of str
+            Workbook paths, or a directory containing workbooks.
+
+        processes : int, optional
+            Size of the process pool (default: number of CPUs).
+
+        Returns
+        -------
+
+        models : dict
+            Populated CODA models keyed by (path, sheet_name).
+
+        errors : dict
+            Descriptions of the errors raised reading or constructing
+            a model, keyed by (path, sheet_name).
+        """
+        models, errors = {}, {}
+        for result in io.read_workbooks(paths, parser_class,
+                                        processes=processes):
+            key = (result.path, result.sheet_name)
+            if result.error is not None:
+                errors[key] = result.error
+                continue
+            try:
+                models[key] = cls.from_records(result.records)
+            except Exception as err:
+                errors[key] = io._describe_error(err)
+        return models, errors
+
+    @classmethod
+    def from_records(cls, source):
+        """Construct a CODA model from records in any io.CODASheet.
+
+        Parameters
+        ----------
+
+        source : io.CODASheet
+            Source of records, e.g. io.CODARecords.
+
+        Returns
+        -------
+
+        CODA
+            Populated CODA model
+        """
+        model = cls()
+        return cls._transfer_elements(model, source)
+
     @classmethod
     def read_excel(cls, path, parser_class=io.CompactExcelParser):
         """Import model from spreadsheet."""
@@ -80,7 +203,104 @@ class CODA(object):
         model = cls()
         return cls._transfer_elements(model, parser)
 
+    @classmethod
+    def aread_excel(cls, path, parser_class=io.CompactExcelParser,
+                    executor='excel'):
+        """Awaitable `read_excel`, parsing in an executor.
+
+        e.g. `model = await CODA.aread_excel(path)`. The executor
+        bounds concurrent parsing (a ProcessPoolExecutor parses in
+        parallel); see `common.aio`.
+        """
+        return common.aio.run_in_executor(executor, cls.read_excel, path,
+                                          parser_class)
+
+    @classmethod
+    def read_tables(cls, path, format='csv'):
+        """Import model from long-form tables (see io.TableParser).
+
+        Parameters
+        ----------
+
+        path : str
+            Directory containing the tables.
+
+        format : str {'csv', 'parquet'}
+            Storage format of the tables.
+
+        Returns
+        -------
+
+        CODA
+            Populated CODA model
+        """
+        return cls.from_records(io.TableParser(path, format))
+
+    def to_records(self):
+        """Export the model definition as records.
+
+        Requirement weights are exported as provided (i.e. not
+        normalised) and characteristic parameter values are not
+        included.
+
+        Returns
+        -------
+
+        io.CODARecords
+        """
+        requirements = [
+            (r.name, getattr(r, 'base_weight', r.weight))
+            for r in self.requirements
+        ]
+        characteristics = [
+            (c.name,) + tuple(c.limits) for c in self.characteristics
+        ]
+
+        type_names = {
+            CODAMaximise: 'max',
+            CODAMinimise: 'min',
+            CODAOptimise: 'opt',
+        }
+        relationships = []
+        for (i, j), rel in np.ndenumerate(self.matrix):
+            if isinstance(rel, CODANull):
+                continue
+            rec = (self.requirements[i].name,
+                   self.characteristics[j].name,
+                   type_names[type(rel)],
+                   rel.correlation,
+                   rel.target)
+            if isinstance(rel, CODAOptimise):
+                rec += (rel.tolerance,)
+            relationships.append(rec)
+
+        return io.CODARecords(requirements, characteristics,
+                              relationships)
+
+    def to_excel(self, path, sheet_name='CODA'):
+        """Export the model definition as a compact Excel template.
+
+        The workbook can be read by `CODA.from_excel` (see
+        io.write_compact_excel). Requires `openpyxl`.
+        """
+        io.write_compact_excel(self.to_records(), path, sheet_name)
+
+    def to_tables(self, path, format='csv'):
+        """Export the model definition as long-form tables.
+
+        Parameters
+        ----------
+
+        path : str
+            Directory for the tables (created if necessary).
+
+        format : str {'csv', 'parquet'}
+            Storage format of the tables.
+        """
+        io.write_tables(self.to_records(), path, format)
+
     @staticmethod
+    @common.instrument.timed('CODA._transfer_elements')
     def _transfer_elements(inst, source):
         # Helper method for the constructors.
         for element in 'requirement','characteristic','relationship':
@@ -93,9 +313,9 @@ class CODA(object):
         return inst
 
     @staticmethod
-    def _get_sheet(workbook_name):
+    def _get_sheet(workbook_name, value_range=None):
         # TODO: remove redundancy with BinWM
-        return io.GSheetCODA(workbook_name)
+        return io.GSheetCODA(workbook_name, value_range)
 
     # ----------------------------------------------------------------
     # Properties
@@ -129,9 +349,30 @@ class CODA(object):
 
         Defines the strength of the relationship between a requirement
         and characteristic.
+
+        Compiled from the relationships once (read-only); updated by
+        `add_relationship` and `remove_relationship`, and recompiled
+        after any relationship matrix or relationship correlation is
+        otherwise changed.
         """
-        vfunc = np.vectorize(attrgetter('correlation'))
-        return vfunc(self.matrix)
+        correlation = self._compiled_correlation()
+        if correlation is None:
+            vfunc = np.vectorize(attrgetter('correlation'),
+                                 otypes=[float])
+            correlation = vfunc(np.asarray(self.matrix))
+            correlation.flags.writeable = False
+            self._correlation = (_Revision.token, correlation)
+        return correlation
+
+    def _compiled_correlation(self):
+        # Compiled correlation if still current, else None.
+        try:
+            token, correlation = self._correlation
+        except AttributeError:
+            return None
+        if token is _Revision.token and correlation.shape == self.shape:
+            return correlation
+        return None
 
     @property
     def characteristics(self):
@@ -173,7 +414,7 @@ class CODA(object):
             value = value.tolist()[0]
 
         if (len(value) == m and
-            isinstance(value, (collections.Sequence, np.ndarray))):
+            isinstance(value, (Sequence, np.ndarray))):
             try:
                 for x, c in zip(value, self.characteristics):
                     c.value = x
@@ -226,6 +467,10 @@ class CODA(object):
         Each requirement contributions to the overall model according
         to its weight.
         """
+        binding = getattr(self, '_weight_binding', None)
+        if binding is not None:
+            score = binding.score()
+            return (score / score.sum())[:,np.newaxis]
         vec = np.array([[reqt.weight for reqt in self.requirements]])
         return vec.T # Return as column vector
 
@@ -264,9 +509,48 @@ class CODA(object):
                 raise RuntimeError(
                     "Combined requirement weight exceeds unity."
                 )
+        binding = getattr(self, '_weight_binding', None)
+        if binding is not None:
+            # Rebound before the requirement is added, so a model
+            # which doesn't weight it leaves this one unchanged.
+            binding = _WeightBinding(binding.model,
+                                     [r.name for r in tup] + [name])
         self._requirements = tup + (
             cls(context=self, name=name, weight=weight),
         )
+        if binding is not None:
+            self._weight_binding = binding
+
+    def bind_weights(self, model):
+        """Take requirement weights from a live weighting model.
+
+        e.g. `coda.bind_weights(bwm)`; weights then follow the
+        model's score as it's edited (e.g. `bwm.prompt()`) without
+        rebuilding this model. Requirements are matched by name on
+        binding, and again if the model's requirements change (e.g.
+        a BradleyTerry voted a new name); weights are normalised over
+        those in this model. Weights set on requirements apply again once unbound.
+
+            model: BinWM | AHP | BradleyTerry | HierarchicalWM
+                Weighting model, any object with `requirements` and
+                `score`, including all of this model's requirements.
+        """
+        if any(not isinstance(r, CODARequirementNorm)
+               for r in self.requirements):
+            raise RuntimeError(
+                "Requirements must be normalised to bind weights."
+            )
+        names = [r.name for r in self.requirements]
+        self._weight_binding = _WeightBinding(model, names)
+
+    def unbind_weights(self):
+        """Stop taking weights from a weighting model.
+
+        Returns the model, or None if not bound.
+        """
+        binding = getattr(self, '_weight_binding', None)
+        self._weight_binding = None
+        return binding.model if binding is not None else None
 
     def add_characteristic(self, name, limits=None, value=None):
         """Add a characteristic to the model.
@@ -343,7 +627,75 @@ class CODA(object):
         }
 
         cls, args = relationships[reltype]
-        self.matrix[r,c] = cls(*args)
+        self._set_relationship(r, c, cls(*args))
+
+    def remove_relationship(self, rlkup, clkup):
+        """Remove a requirement-characteristic relationship.
+
+        The relationship is replaced with a null relationship.
+
+            rlkup: int | str
+                Index or name of the requirement.
+
+            clkup: int | str
+                Index or name of the characteristic.
+        """
+        r = self._rc_lookup('requirement', rlkup)
+        c = self._rc_lookup('characteristic', clkup)
+        self._set_relationship(r, c, CODANull())
+
+    def sweep(self, concepts):
+        """Evaluate a series of concepts.
+
+        Each concept is a sequence of characteristic parameter values
+        which is assigned to the model in turn (the model is left with
+        the values of the final concept).
+
+            concepts: iterable
+                Parameter values for each concept; consumed lazily.
+
+        Yields a 2-tuple (merit, satisfaction) per concept, where
+        satisfaction is a 1D array of requirement satisfaction.
+        """
+        for values in concepts:
+            self.parameter_value = values
+            satisfaction = self.satisfaction
+            yield (np.multiply(self.weight, satisfaction).sum(),
+                   satisfaction[:,0])
+
+    def write_sweep(self, path, concepts, labels=None,
+                    sheet_name='Results'):
+        """Write the evaluation of a series of concepts to Excel.
+
+        Each concept is a row containing its label, parameter values,
+        merit and the satisfaction of each requirement. Rows are
+        written as they are evaluated so large sweeps (e.g. from a
+        generator) are written in constant memory. Requires
+        `openpyxl`.
+
+            path: str
+                Path to save the workbook to.
+
+            concepts: iterable
+                Parameter values for each concept (see `sweep`).
+
+            labels: iterable, optional
+                Concept labels (default: sequential integers).
+        """
+        header = (['Concept']
+                  + [c.name for c in self.characteristics]
+                  + ['Merit']
+                  + ['Satisfaction: {}'.format(r.name)
+                     for r in self.requirements])
+
+        labels = itertools.count() if labels is None else iter(labels)
+
+        with io.ExcelResultWriter(path, header, sheet_name) as writer:
+            for values in concepts:
+                values = list(np.ravel(values))
+                (merit, satisfaction), = self.sweep([values])
+                writer.write_row([next(labels)] + values + [merit]
+                                 + list(satisfaction))
 
     def compare(self, other):
         """Return True if the model matrix is the same as another's.
@@ -355,11 +707,22 @@ class CODA(object):
         # populate with Null relationships.
         array = np.empty(self.shape, dtype=object)
         array[:] = CODANull()
-        return array
-
+        return array.view(_RelationshipMatrix)
+
+    def _set_relationship(self, r, c, relationship):
+        # Updates rather than recompiles the correlation.
+        correlation = self._compiled_correlation()
+        self.matrix[r,c] = relationship
+        if correlation is not None:
+            correlation.flags.writeable = True
+            correlation[r,c] = relationship.correlation
+            correlation.flags.writeable = False
+            self._correlation = (_Revision.token, correlation)
+
+    @common.instrument.timed('CODA._merit')
     def _merit(self):
         vfunc = np.vectorize(lambda f, x: f(x))
-        return vfunc(self.matrix, self.parameter_value)
+        return vfunc(np.asarray(self.matrix), self.parameter_value)
 
     def _rc_lookup(self, type_, value):
         type_title = type_.capitalize()
@@ -387,6 +750,59 @@ class CODA(object):
         return idx
 
 
+class _Revision(object):
+    # Identity token of the state of all relationship matrices and
+    # relationships, replaced on any change; models' compiled
+    # correlations are current while their token is. Tokens compare
+    # by identity, so a pickled or copied one is never current.
+
+    token = object()
+
+    @classmethod
+    def changed(cls):
+        cls.token = object()
+
+
+class _RelationshipMatrix(np.ndarray):
+    # Object array of a model's relationships; writes (e.g.
+    # model.matrix[i, j] = relationship) are changes.
+
+    def __setitem__(self, index, value):
+        super(_RelationshipMatrix, self).__setitem__(index, value)
+        if self.dtype == object:
+            _Revision.changed()
+
+
+class _WeightBinding(object):
+    # Requirement weights from a weighting model's score. Names are
+    # matched to score positions once, and again only if the model's
+    # requirements change (e.g. a BradleyTerry voted a new name), so
+    # reading them is usually a single indexing operation.
+
+    def __init__(self, model, names):
+        self.model = model
+        self.names = names
+        self._resolve(tuple(model.requirements))
+
+    def _resolve(self, requirements):
+        index = dict((name, k) for k, name in enumerate(requirements))
+        missing = [name for name in self.names if name not in index]
+        if missing:
+            raise ValueError(
+                "Requirements not weighted by the model: {}"
+                .format(missing)
+            )
+        self.requirements = requirements
+        self.index = np.array([index[name] for name in self.names],
+                              dtype=int)
+
+    def score(self):
+        requirements = tuple(self.model.requirements)
+        if requirements != self.requirements:
+            self._resolve(requirements)
+        return np.asarray(self.model.score)[self.index]
+
+
 class CODAElement(object):
 
     def __init__(self, name, context=None):
@@ -523,6 +939,9 @@ class CODARequirementNorm(CODAElement):
     @property
     def weight(self):
         """Normalised requirement weight."""
+        if getattr(self.context, '_weight_binding', None) is not None:
+            index = self.context.requirements.index(self)
+            return self.context.weight[index, 0]
         sum_weights =  sum([r.base_weight
                             for r in self.context.requirements])
         return self.base_weight / sum_weights
@@ -574,6 +993,8 @@ class CODARelationship(object):
         return self._correlation
     @correlation.setter
     def correlation(self, value):
+        # A new relationship isn't yet in any model's matrix.
+        changed = hasattr(self, '_correlation')
         try:
             self._correlation = self.__correlation_map[value]
         except KeyError:
@@ -581,6 +1002,8 @@ class CODARelationship(object):
             raise ValueError(
                 "Correlation must be in set {}".format(valid_set)
             )
+        if changed:
+            _Revision.changed()
 
     @property
     def target(self):
@@ -0,0 +1,175 @@
+"""House of Quality (Quality Function Deployment) weighting.
+
+The House of Quality relates requirements ("whats") to
+characteristics ("hows"). A characteristic's importance is the sum
+of its correlations with each requirement, weighted by requirement
+importance; i.e. the product of the weight vector and the
+correlation matrix. Its roof records how characteristics interact
+with one another: negative where improving one works against the
+other (a trade-off), positive where they reinforce one another.
+
+References
+----------
+
+  - J.R. Hauser and D. Clausing, 1988. The House of Quality -
+    Harvard Business Review 66(3) pp. 63-73
+"""
+from __future__ import division
+
+import numbers
+
+import numpy as np
+
+
+class HouseOfQuality(object):
+    """Characteristic importance and roof (trade-off) analysis.
+
+    Operates on arrays throughout, so models with thousands of
+    requirements, and many alternative weightings (e.g. one per
+    stakeholder or per weighting method), are evaluated in single
+    matrix products.
+    """
+
+    def __init__(self, requirements, characteristics, correlation,
+                 weight=None, roof=None):
+        """
+            requirements: sequence of str
+                Names of the N requirements.
+
+            characteristics: sequence of str
+                Names of the M characteristics.
+
+            correlation: array
+                (N, M) correlation of each requirement with each
+                characteristic.
+
+            weight: array
+                Requirement weights, (N,); equal by default.
+
+            roof: array
+                (M, M) interactions between characteristics; only
+                the upper triangle (above the diagonal) is
+                significant. None by default.
+        """
+        self.requirements = tuple(requirements)
+        self.characteristics = tuple(characteristics)
+        n, m = len(self.requirements), len(self.characteristics)
+
+        correlation = np.asarray(correlation, dtype=float)
+        if correlation.shape != (n, m):
+            raise ValueError(
+                "Correlation must be {}x{} (requirements x "
+                "characteristics).".format(n, m)
+            )
+        self.correlation = correlation
+
+        self.weight = (np.full(n, 1 / n) if weight is None
+                       else self._check_weights(weight))
+
+        self._roof = np.zeros((m, m))
+        if roof is not None:
+            roof = np.asarray(roof, dtype=float)
+            if roof.shape != (m, m):
+                raise ValueError("Roof must be {0}x{0}.".format(m))
+            self._roof = np.triu(roof, k=1)
+
+    @classmethod
+    def from_coda(cls, model, roof=None):
+        """House of Quality of a CODA model.
+
+        Uses the model's compiled correlation array and requirement
+        weights, rather than its relationship objects.
+        """
+        return cls([r.name for r in model.requirements],
+                   [c.name for c in model.characteristics],
+                   model.correlation, model.weight[:,0], roof)
+
+    @property
+    def roof(self):
+        """Copy of the (symmetric) roof matrix."""
+        return self._roof + self._roof.T
+
+    def set_roof(self, a, b, value):
+        """Set the interaction of two characteristics.
+
+            a, b: int | str
+                Index or name of each characteristic.
+
+            value: real
+                Negative for a trade-off, positive if reinforcing.
+        """
+        i, j = sorted(map(self._lookup, (a, b)))
+        if i == j:
+            raise ValueError("Can't relate a characteristic to itself.")
+        self._roof[i,j] = value
+
+    def importance(self, weights=None):
+        """Absolute importance of each characteristic.
+
+            weights: array
+                Requirement weights, (N,) or (K, N) for K
+                alternative weightings; the model's by default.
+
+        Returns an (M,) or (K, M) array.
+        """
+        weights = (self.weight if weights is None
+                   else self._check_weights(weights))
+        return np.dot(weights, self.correlation)
+
+    def relative_importance(self, weights=None):
+        """Importance of each characteristic, summing to 1.
+
+        See `importance`.
+        """
+        importance = self.importance(weights)
+        return importance / importance.sum(axis=-1, keepdims=True)
+
+    def exposure(self, weights=None):
+        """Relative importance traded off by each characteristic.
+
+        The sum of the relative importance of the characteristics
+        in conflict with each, weighted by the strength of the
+        conflict (a negative roof value); 0 where unconstrained.
+
+        Returns an (M,) or (K, M) array; see `importance`.
+        """
+        conflicts = np.maximum(-self.roof, 0)
+        return np.dot(self.relative_importance(weights), conflicts)
+
+    def trade_offs(self, weights=None):
+        """Conflicting pairs of characteristics, most severe first.
+
+        Severity is the strength of the conflict times the smaller
+        relative importance of the pair (the importance given up).
+
+        Returns a list of (characteristic, characteristic, roof
+        value) tuples.
+        """
+        importance = self.relative_importance(weights)
+        if importance.ndim > 1:
+            raise ValueError("Trade-offs are for a single weighting.")
+        rows, cols = np.nonzero(self._roof < 0)
+        values = self._roof[rows,cols]
+        severity = -values * np.minimum(importance[rows],
+                                        importance[cols])
+        names = self.characteristics
+        return [(names[rows[k]], names[cols[k]], values[k])
+                for k in np.argsort(-severity, kind='mergesort')]
+
+    def _check_weights(self, weights):
+        weights = np.asarray(weights, dtype=float)
+        if weights.shape[-1:] != (len(self.requirements),):
+            raise ValueError("Expected {} requirement weights."
+                             .format(len(self.requirements)))
+        return weights
+
+    def _lookup(self, value):
+        # Index of a characteristic, by index or name.
+        if isinstance(value, numbers.Integral):
+            if not 0 <= value < len(self.characteristics):
+                raise KeyError("Characteristic index out of bounds.")
+            return value
+        try:
+            return self.characteristics.index(value)
+        except ValueError:
+            raise KeyError("Unknown characteristic: {!r}".format(value))
@@ -1,6 +1,9 @@
 import unittest
 import os
+import pickle
+import shutil
 import sys
+import tempfile
 
 import mock
 import numpy as np
@@ -13,6 +16,7 @@ except ImportError:
 
 from ... import common
 from .. import io
+from .. import models
 from . import DATA_DIR
 
 
@@ -132,6 +136,273 @@ class TestCompactExcelParser(unittest.TestCase):
             self.assertAlmostEqual(t1[4], t2[4])
 
 
+
+class TestCODARecords(unittest.TestCase):
+
+    def setUp(self):
+        if not deps_present:
+            self.skipTest("`pandas` package required for tests.")
+
+    def test_from_sheet(self):
+        """Records are the same as those read from the source."""
+        parser = io.CompactExcelParser(
+            os.path.join(DATA_DIR, 'demo_model_compact.xlsx')
+        )
+        records = io.CODARecords.from_sheet(parser)
+
+        self.assertEqual(records.get_requirements(),
+                         parser.get_requirements())
+        self.assertEqual(records.get_relationships(),
+                         parser.get_relationships())
+        # We use numpy testing here because data contains NaNs.
+        np.testing.assert_array_equal(
+            np.array(records.get_characteristics()),
+            np.array(parser.get_characteristics())
+        )
+
+    def test_pickle(self):
+        """Instances survive a round trip through pickle."""
+        records = io.CODARecords(
+            [('Requirement 1', 0.5)],
+            [('Characteristic 1', 0, 1)],
+            [('Requirement 1', 'Characteristic 1', 'opt', 'o', 0.5, 0.1)]
+        )
+        actual = pickle.loads(pickle.dumps(records))
+        self.assertEqual(actual.get_relationships(),
+                         records.get_relationships())
+        self.assertIsInstance(actual.get_relationships()[0],
+                              io.CODASheet.OptRelRecord)
+
+
+class TestReadWorkbooks(unittest.TestCase):
+
+    def setUp(self):
+        if not deps_present:
+            self.skipTest("`pandas` package required for tests.")
+        self.paths = [
+            os.path.join(DATA_DIR, 'demo_model_compact.xlsx'),
+            os.path.join(DATA_DIR, 'missing_workbook.xlsx'),
+            os.path.join(DATA_DIR, 'demo_model_casestudy1.xlsx'),
+        ]
+
+    def test_find_workbooks(self):
+        actual = io.find_workbooks(DATA_DIR)
+        expected = sorted(
+            os.path.join(DATA_DIR, fname)
+            for fname in ('demo_model.xlsx',
+                          'demo_model_casestudy1.xlsx',
+                          'demo_model_compact.xlsx')
+        )
+        self.assertEqual(actual, expected)
+
+    def test_read_workbooks(self):
+        """Errors are reported per workbook without aborting."""
+        results = io.read_workbooks(self.paths, processes=2)
+
+        self.assertEqual([r.path for r in results], self.paths)
+        ok, missing, case_study = results
+
+        self.assertIsNone(ok.error)
+        self.assertEqual(ok.sheet_name, 'Sheet1')
+        self.assertEqual(len(ok.records.get_relationships()), 3)
+
+        self.assertIsNone(missing.records)
+        self.assertIsNone(missing.sheet_name)
+        self.assertIn('missing_workbook.xlsx', missing.error)
+
+        self.assertIsNone(case_study.error)
+        self.assertEqual(len(case_study.records.get_relationships()),
+                         16)
+
+    def test_read_workbooks__serial(self):
+        """Serial parsing gives the same results as the pool."""
+        self.assertEqual(
+            [r.error for r in io.read_workbooks(self.paths,
+                                                processes=1)],
+            [r.error for r in io.read_workbooks(self.paths,
+                                                processes=2)]
+        )
+
+    def test_read_workbooks__every_sheet(self):
+        """Each sheet is parsed; invalid sheets are reported."""
+        path = os.path.join(os.path.dirname(io.__file__), 'data',
+                            'sample_compact.xlsx')
+        results = io.read_workbooks([path])
+
+        self.assertEqual([r.sheet_name for r in results],
+                         ['Sheet2', 'Sheet1'])
+        self.assertIsNotNone(results[0].error)
+        self.assertIsNone(results[1].error)
+
+
+
+class TestTableParser(unittest.TestCase):
+    """Long-form tabular storage (CSV/Parquet) of CODA models."""
+
+    def setUp(self):
+        if not deps_present:
+            self.skipTest("`pandas` package required for tests.")
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.records = io.CODARecords(
+            [('Stiffness', 0.2), ('Weight', 0.8)],
+            [('Tyre Diameter', 24.0, 29.0),
+             ('Tyre Width', np.nan, np.nan)],
+            [('Stiffness', 'Tyre Diameter', 'min', 0.9, 29.0),
+             ('Weight', 'Tyre Width', 'opt', 0.1, 14.0, 1.0)]
+        )
+
+    def check_round_trip(self, format):
+        io.write_tables(self.records, self.tmpdir, format)
+        sut = io.TableParser(self.tmpdir, format)
+
+        self.assertEqual(sut.get_requirements(),
+                         self.records.get_requirements())
+        self.assertEqual(sut.get_relationships(),
+                         self.records.get_relationships())
+        np.testing.assert_array_equal(
+            np.array(sut.get_characteristics()),
+            np.array(self.records.get_characteristics())
+        )
+
+    def test_round_trip__csv(self):
+        self.check_round_trip('csv')
+
+    def test_round_trip__parquet(self):
+        try:
+            pd.io.parquet.get_engine('auto')
+        except ImportError:
+            self.skipTest("`pyarrow` or `fastparquet` required for "
+                          "parquet support.")
+        self.check_round_trip('parquet')
+
+    def test_csv_layout(self):
+        """One row per record; blank cells for missing values."""
+        io.write_tables(self.records, self.tmpdir)
+        path = io.TableParser.table_path(self.tmpdir, 'relationships')
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines, [
+            'requirement,characteristic,type,correlation,target,'
+            'tolerance',
+            'Stiffness,Tyre Diameter,min,0.9,29.0,',
+            'Weight,Tyre Width,opt,0.1,14.0,1.0',
+        ])
+
+    def test_mixed_correlations(self):
+        """Symbolic and numeric correlations may share a column."""
+        sut = io.TableParser(os.path.join(DATA_DIR, 'mixed_tables'))
+
+        self.assertEqual([rec[3] for rec in sut.get_relationships()],
+                         ['---', 0.1, 'moderate', 3.0])
+
+        model = models.CODA.read_tables(sut.path)
+        np.testing.assert_array_equal(model.correlation,
+                                      [[0.9, 0.0], [0.0, 0.1],
+                                       [0.3, 0.3]])
+
+    def test_missing_column(self):
+        io.write_tables(self.records, self.tmpdir)
+        path = io.TableParser.table_path(self.tmpdir, 'requirements')
+        pd.DataFrame({'name': ['Stiffness']}).to_csv(path, index=False)
+
+        sut = io.TableParser(self.tmpdir)
+        self.assertRaises(ValueError, sut.get_requirements)
+
+    def test_unsupported_format(self):
+        self.assertRaises(ValueError, io.TableParser, self.tmpdir,
+                          'xlsx')
+        self.assertRaises(ValueError, io.write_tables, self.records,
+                          self.tmpdir, 'xlsx')
+
+
+
+class TestWriteCompactExcel(unittest.TestCase):
+
+    def setUp(self):
+        if not deps_present or io.openpyxl is None:
+            self.skipTest("`pandas` and `openpyxl` packages required "
+                          "for tests.")
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.path = os.path.join(tmpdir, 'model.xlsx')
+
+    def test_round_trip(self):
+        """Written workbooks are read back by CompactExcelParser."""
+        reference = io.CompactExcelParser(
+            os.path.join(DATA_DIR, 'demo_model_compact.xlsx')
+        )
+
+        io.write_compact_excel(reference, self.path)
+        sut = io.CompactExcelParser(self.path)
+
+        self.assertEqual(sut.get_requirements(),
+                         reference.get_requirements())
+        self.assertEqual(sut.get_relationships(),
+                         reference.get_relationships())
+        np.testing.assert_array_equal(
+            np.array(sut.get_characteristics()),
+            np.array(reference.get_characteristics())
+        )
+
+    def test_write_excel__round_trip(self):
+        """Full layout workbooks are read back by ExcelParser."""
+        reference = io.ExcelParser(os.path.join(DATA_DIR,
+                                                'demo_model.xlsx'))
+
+        io.write_excel(reference, self.path)
+        sut = io.ExcelParser(self.path)
+
+        self.assertEqual(sut.get_requirements(),
+                         reference.get_requirements())
+        self.assertEqual(sut.get_relationships(),
+                         reference.get_relationships())
+        np.testing.assert_array_equal(
+            np.array(sut.get_characteristics()),
+            np.array(reference.get_characteristics())
+        )
+
+    def test_numeric_correlation(self):
+        """Numeric correlations are written in compact notation."""
+        records = io.CODARecords(
+            [('Requirement 1', 1.0)],
+            [('Mass', 0, 1), ('Length', 0, 1)],
+            [('Requirement 1', 'Mass', 'min', 0.3, 0.5),
+             ('Requirement 1', 'Length', 'opt', 0.9, 0.5,
+              0.1)]
+        )
+
+        io.write_compact_excel(records, self.path)
+
+        actual = [rec[:4] for rec in
+                  io.CompactExcelParser(self.path).get_relationships()]
+        self.assertEqual(actual, [
+            ('Requirement 1', 'Mass', 'min', '--'),
+            ('Requirement 1', 'Length', 'opt', 'ooo'),
+        ])
+
+    def test_invalid_correlation(self):
+        records = io.CODARecords(
+            [('Requirement 1', 1.0)],
+            [('Characteristic 1', 0, 1)],
+            [('Requirement 1', 'Characteristic 1', 'min', 0.5, 0.5)]
+        )
+        self.assertRaises(ValueError, io.write_compact_excel, records,
+                          self.path)
+
+    def test_result_writer(self):
+        """Rows are written beneath the header; NaNs are blank."""
+        with io.ExcelResultWriter(self.path, ['a', 'b']) as writer:
+            writer.write_row([1, np.float64(2.5)])
+            writer.write_rows(iter([[3, np.nan]]))
+
+        df = pd.read_excel(self.path)
+        self.assertEqual(list(df.columns), ['a', 'b'])
+        self.assertEqual(df.shape, (2, 2))
+        self.assertEqual(df.iloc[0, 1], 2.5)
+        self.assertTrue(np.isnan(df.iloc[1, 1]))
+
+
 @mock.patch.object(io.GSheetCODA, 'df',
                    new_callable=mock.PropertyMock)
 class TestGSheetCODA(unittest.TestCase):
@@ -229,6 +500,58 @@ class TestGSheetCODA(unittest.TestCase):
         mock_df_property.return_value = self.reference_df
         self.assertTrue(self.sut.is_valid())
 
+    def test_parsed_once(self, mock_df_property):
+        """Source cells are parsed once for all views & validation."""
+        mock_df_property.return_value = self.reference_df
+        with mock.patch.object(io.GSheetCODA, '_parse',
+                               wraps=self.sut._parse) as mock_parse:
+            self.sut.is_valid()
+            self.sut.get_requirements()
+            self.sut.get_characteristics()
+            self.sut.get_relationships()
+            self.sut.relationship_df
+            self.sut.characteristic_df
+            self.sut.requirement_df
+        mock_parse.assert_called_once_with(self.reference_df)
+
+    def test_parsed__new_revision(self, mock_df_property):
+        """A newly fetched source is parsed again."""
+        mock_df_property.return_value = self.reference_df
+        self.sut.get_requirements()
+
+        df = self.reference_df.copy()
+        df.iloc[2,1] = '0.7'
+        mock_df_property.return_value = df
+
+        self.assertEqual(self.sut.get_requirements()[0],
+                         ('Stiffness', 0.7))
+
+    def test_relationship_df(self, mock_df_property):
+        """Fields are typed and the raw dataframe is untouched."""
+        mock_df_property.return_value = df = self.reference_df.copy()
+        columns = list(df.columns)
+
+        actual = self.sut.relationship_df
+
+        self.assertEqual(list(df.columns), columns)
+        self.assertEqual(actual.shape, (3, 9))
+        self.assertEqual(actual.loc['Weight', ('Tyre Width',
+                                               'Relationship Type')],
+                         'o')
+        self.assertEqual(actual.loc['Weight', ('Tyre Width',
+                                               'Tolerance')],
+                         1.0)
+        self.assertTrue(np.isnan(
+            actual.loc['Stiffness', ('Tyre Width', 'Target Value')]
+        ))
+
+    def test_is_valid__invalid_type(self, mock_df_property):
+        df = self.reference_df.copy()
+        df.iloc[2,2] = '+-'
+        mock_df_property.return_value = df
+        with mock.patch('warnings.warn'):
+            self.assertFalse(self.sut.is_valid())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,8 @@
+import copy
 import os
+import pickle
+import shutil
+import tempfile
 import unittest
 
 import numpy as np
@@ -12,6 +16,7 @@ from ddt import data, unpack, ddt
 
 from .. import models
 from .. import io
+from ...requirements import BinWM
 from . import DATA_DIR
 
 
@@ -429,6 +434,67 @@ class TestCODA(unittest.TestCase):
                       '+++', 3),
         ])
 
+    def test_from_records(self):
+        """Constructor transfers elements from a record source."""
+        records = io.CODARecords(
+            [('Requirement 1', 1.0), ('Requirement 2', 3.0)],
+            [('Characteristic 1', 0.0, 10.0)],
+            [('Requirement 2', 'Characteristic 1', 'opt', 'oo', 5, 1)]
+        )
+
+        sut = models.CODA.from_records(records)
+
+        self.assertEqual(sut.shape, (2, 1))
+        self.assertEqual(sut.requirements[1].weight, 0.75)
+        self.assertEqual(sut.characteristics[0].limits, (0.0, 10.0))
+        self.assertEqual(sut.matrix[1,0],
+                         models.CODAOptimise(0.3, 5, 1))
+
+    @mock.patch.object(io, 'read_workbooks')
+    def test_from_excel_batch(self, mock_read_workbooks):
+        """Models are built per sheet and errors are collected."""
+        good = io.CODARecords([('Requirement 1', 1.0)],
+                              [('Characteristic 1', 0, 1)], [])
+        duplicate = io.CODARecords([('Requirement 1', 1.0)] * 2, [], [])
+        mock_read_workbooks.return_value = [
+            io.WorkbookResult('a.xlsx', 'Sheet1', good, None),
+            io.WorkbookResult('a.xlsx', 'Sheet2', None, 'KeyError: x'),
+            io.WorkbookResult('b.xlsx', 'Sheet1', duplicate, None),
+        ]
+
+        models_, errors = models.CODA.from_excel_batch(['a.xlsx',
+                                                        'b.xlsx'])
+
+        self.assertEqual(list(models_), [('a.xlsx', 'Sheet1')])
+        self.assertEqual(models_['a.xlsx', 'Sheet1'].shape, (1, 1))
+        self.assertEqual(errors['a.xlsx', 'Sheet2'], 'KeyError: x')
+        self.assertTrue(
+            errors['b.xlsx', 'Sheet1'].startswith('ValueError')
+        )
+
+    @mock.patch.object(models.common.io, 'fetch_sheets')
+    def test_from_google_sheets(self, mock_fetch_sheets):
+        """Models are built per workbook and errors are collected."""
+        good = io.CODARecords([('Requirement 1', 1.0)],
+                              [('Characteristic 1', 0, 1)], [])
+        duplicate = io.CODARecords([('Requirement 1', 1.0)] * 2, [], [])
+        SheetResult = models.common.io.SheetResult
+        mock_fetch_sheets.return_value = [
+            SheetResult('a', good, None),
+            SheetResult('b', None, 'HttpError: 403'),
+            SheetResult('c', duplicate, None),
+        ]
+
+        models_, errors = models.CODA.from_google_sheets('abc',
+                                                         threads=2)
+
+        mock_fetch_sheets.assert_called_once_with(io.GSheetCODA, 'abc',
+                                                  threads=2)
+        self.assertEqual(list(models_), ['a'])
+        self.assertEqual(models_['a'].shape, (1, 1))
+        self.assertEqual(errors['b'], 'HttpError: 403')
+        self.assertTrue(errors['c'].startswith('ValueError'))
+
     def test__merit(self):
         """Returns a matrix of merit values for design relationships.
 
@@ -513,6 +579,151 @@ class TestCODACaseStudy1(unittest.TestCase):
     def test_merit(self):
         self.assertAlmostEqual(self.wheel.merit, .5788, places=4)
 
+    def test_correlation__compiled(self):
+        """Compiled once, updated as relationships change."""
+        correlation = self.wheel.correlation
+        self.assertFalse(correlation.flags.writeable)
+
+        self.wheel.add_relationship('Friction', 'Spoke Thickness',
+                                    'max', 'weak', 3)
+        self.wheel.remove_relationship('Stiffness', 'Tyre Diameter')
+
+        self.assertIs(self.wheel.correlation, correlation)
+        self.assertEqual(correlation[1,2], 0.1)
+        self.assertEqual(correlation[0,0], 0)
+
+        self.wheel.add_characteristic('Rim Depth', (10, 50), 30)
+        self.assertEqual(self.wheel.correlation.shape, (5, 5))
+        np.testing.assert_array_equal(self.wheel.correlation[:,:4],
+                                      correlation)
+
+    def test_correlation__matrix_changed(self):
+        """Recompiled after the matrix is written to directly."""
+        correlation = self.wheel.correlation
+        merit = self.wheel.merit
+
+        self.wheel.matrix[0,0] = models.CODANull()
+        self.assertEqual(self.wheel.correlation[0,0], 0)
+
+        self.wheel.matrix[0,:2] = [models.CODAMaximise('strong', 1),
+                                   models.CODANull()]
+        np.testing.assert_array_equal(self.wheel.correlation[0,:2],
+                                      [0.9, 0])
+        np.testing.assert_array_equal(self.wheel.correlation[1:],
+                                      correlation[1:])
+        self.assertNotAlmostEqual(self.wheel.merit, merit)
+
+    def test_correlation__relationship_changed(self):
+        """Recompiled after a relationship's correlation changes."""
+        self.wheel.correlation
+        relationship = self.wheel.matrix[3,1]
+        self.assertEqual(relationship.correlation, 0.1)
+
+        relationship.correlation = 'strong'
+
+        self.assertEqual(self.wheel.correlation[3,1], 0.9)
+
+    def test_correlation__shared_relationship(self):
+        """Each model sharing a relationship sees it change."""
+        other = self.setup_other_wheel()
+        relationship = models.CODAMaximise('weak', 1)
+        self.wheel.matrix[0,0] = relationship
+        other.matrix[0,0] = relationship
+        self.wheel.correlation, other.correlation
+
+        relationship.correlation = 'strong'
+
+        self.assertEqual(self.wheel.correlation[0,0], 0.9)
+        self.assertEqual(other.correlation[0,0], 0.9)
+
+    def setup_other_wheel(self):
+        return models.CODA.from_records(self.wheel.to_records())
+
+    def check_copy(self, copy):
+        self.wheel.correlation
+        sut = copy(self.wheel)
+        np.testing.assert_array_equal(sut.correlation,
+                                      self.wheel.correlation)
+
+        sut.matrix[3,0] = models.CODAMaximise('strong', 1)
+        self.assertEqual(sut.correlation[3,0], 0.9)
+        self.assertEqual(self.wheel.correlation[3,0], 0)
+
+        sut.matrix[3,1].correlation = 'moderate'
+        self.assertEqual(sut.correlation[3,1], 0.3)
+        self.assertEqual(self.wheel.correlation[3,1], 0.1)
+
+    def test_correlation__pickled(self):
+        self.check_copy(lambda model: pickle.loads(pickle.dumps(model)))
+
+    def test_correlation__deepcopy(self):
+        self.check_copy(copy.deepcopy)
+
+    def test_bind_weights(self):
+        """Weights follow a live BinWM, matched by name."""
+        names = ['Weight', 'Extra', 'Friction', 'Repairability',
+                 'Stiffness', 'Manufacturability']
+        bwm = BinWM(*names, matrix=np.triu(np.ones((6, 6)), k=1))
+
+        self.wheel.bind_weights(bwm)
+        order = [names.index(r.name) for r in self.wheel.requirements]
+
+        def check():
+            score = bwm.score[order] / bwm.score[order].sum()
+            np.testing.assert_allclose(self.wheel.weight[:,0], score)
+            self.assertAlmostEqual(self.wheel.requirements[2].weight,
+                                   score[2])
+            merit = (score[:,None] * self.wheel.satisfaction).sum()
+            self.assertAlmostEqual(self.wheel.merit, merit)
+            return merit
+        merit = check()
+
+        # Re-scoring re-weights without rebuilding.
+        bwm._set_decision(0, 4, 0)
+        self.assertNotAlmostEqual(check(), merit)
+
+        self.assertIs(self.wheel.unbind_weights(), bwm)
+        np.testing.assert_allclose(self.wheel.weight, 0.2)
+        self.assertAlmostEqual(self.wheel.merit, .5788, places=4)
+
+    def test_bind_weights__missing(self):
+        bwm = BinWM('Stiffness', 'Friction', 'Weight')
+        self.assertRaises(ValueError, self.wheel.bind_weights, bwm)
+
+    def test_bind_weights__model_requirements_change(self):
+        """Weights are matched by name as the model's requirements grow.
+        """
+        from ...requirements import BradleyTerry, HierarchicalWM
+        names = [r.name for r in self.wheel.requirements]
+        votes = BradleyTerry(*names[:3])
+        model = HierarchicalWM([('A', votes),
+                                ('B', BinWM(*names[3:]))])
+        self.wheel.bind_weights(model)
+
+        votes.add_vote('Styling', names[2], 5)
+        votes.add_vote(names[1], names[0], 2)
+
+        expected = model.get_score_as_series()[names]
+        np.testing.assert_allclose(self.wheel.weight[:,0],
+                                   expected / expected.sum())
+
+    def test_bind_weights__add_requirement(self):
+        """Requirements added while bound must be weighted by the model.
+        """
+        names = [r.name for r in self.wheel.requirements]
+        bwm = BinWM(*names + ['Cost'])
+        self.wheel.bind_weights(bwm)
+        merit = self.wheel.merit
+
+        self.assertRaises(ValueError, self.wheel.add_requirement,
+                          'Styling', 1)
+        self.assertEqual(self.wheel.shape, (5, 4))
+        self.assertAlmostEqual(self.wheel.merit, merit)
+
+        self.wheel.add_requirement('Cost', 1)
+        self.assertEqual(self.wheel.weight.shape, (6, 1))
+        self.assertAlmostEqual(self.wheel.weight.sum(), 1)
+
     def test_sum_of_correlations(self):
         """Sum of correlation factors for all requirements."""
         np.testing.assert_array_almost_equal(
@@ -520,6 +731,89 @@ class TestCODACaseStudy1(unittest.TestCase):
             np.array([[2.4, 1.2, 3.0, 1.3, 1.3]]).T
         )
 
+    def test_to_records(self):
+        """Records describe the model definition."""
+        records = self.wheel.to_records()
+
+        self.assertEqual(records.get_requirements()[0],
+                         ('Stiffness', 0.2))
+        self.assertEqual(records.get_characteristics()[3],
+                         ('Use of Composites', 0.05, 0.8))
+        relationships = records.get_relationships()
+        self.assertEqual(len(relationships), 16)
+        self.assertEqual(relationships[3],
+                         ('Stiffness', 'Use of Composites', 'opt', 0.3,
+                          0.5, 0.2))
+
+    def test_tables__round_trip(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+
+        self.wheel.to_tables(tmpdir)
+        model = models.CODA.read_tables(tmpdir)
+
+        for char, ref in zip(model.characteristics,
+                             self.wheel.characteristics):
+            char.value = ref.value
+        self.assertEqual(self.wheel.merit, model.merit)
+
+    def test_sweep(self):
+        """Merit and satisfaction are evaluated for each concept."""
+        values = [c.value for c in self.wheel.characteristics]
+        expected_merit = self.wheel.merit
+        expected_satisfaction = self.wheel.satisfaction[:,0]
+
+        results = list(self.wheel.sweep([[25, 12, 3, 0.1], values]))
+
+        self.assertEqual(len(results), 2)
+        self.assertNotAlmostEqual(results[0][0], expected_merit)
+        self.assertAlmostEqual(results[1][0], expected_merit)
+        np.testing.assert_array_almost_equal(results[1][1],
+                                             expected_satisfaction)
+
+    def test_write_sweep(self):
+        try:
+            import pandas as pd
+            import openpyxl
+        except ImportError:
+            self.skipTest("`pandas` and `openpyxl` required for "
+                          "writing spreadsheets")
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'results.xlsx')
+        concepts = ([24, 13, 4.3, x] for x in (0.1, 0.2, 0.3))
+
+        self.wheel.write_sweep(path, concepts, labels='ABC')
+
+        df = pd.read_excel(path, index_col=0)
+        self.assertEqual(list(df.index), ['A', 'B', 'C'])
+        self.assertEqual(list(df.columns[:5]),
+                         ['Tyre Diameter', 'Tyre Width',
+                          'Spoke Thickness', 'Use of Composites',
+                          'Merit'])
+        self.assertEqual(df.shape, (3, 10))
+        self.assertAlmostEqual(df.loc['B', 'Merit'], .5788, places=4)
+
+    def test_to_excel__round_trip(self):
+        try:
+            import pandas
+            import openpyxl
+        except ImportError:
+            self.skipTest("`pandas` and `openpyxl` required for "
+                          "writing spreadsheets")
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'model.xlsx')
+
+        self.wheel.to_excel(path)
+        model = models.CODA.from_excel(path)
+
+        self.assertTrue((model.matrix == self.wheel.matrix).all())
+        for char, ref in zip(model.characteristics,
+                             self.wheel.characteristics):
+            char.value = ref.value
+        self.assertEqual(self.wheel.merit, model.merit)
+
     def test_read_excel(self):
         try:
             import pandas
@@ -536,6 +830,24 @@ class TestCODACaseStudy1(unittest.TestCase):
             char.value = ref.value
         self.assertEqual(self.wheel.merit, model.merit)
 
+    def test_aread_excel(self):
+        from ...common import aio
+        if aio.asyncio is None:
+            self.skipTest("asyncio requires Python 3")
+        path = os.path.join(DATA_DIR, 'demo_model_casestudy1.xlsx')
+        loop = aio.asyncio.new_event_loop()
+        aio.asyncio.set_event_loop(loop)
+        self.addCleanup(aio.asyncio.set_event_loop, None)
+        self.addCleanup(loop.close)
+
+        models_ = loop.run_until_complete(aio.asyncio.gather(
+            *[models.CODA.aread_excel(path) for _ in range(3)]
+        ))
+
+        for model in models_:
+            model.parameter_value = self.wheel.parameter_value
+            self.assertEqual(self.wheel.merit, model.merit)
+
 
 @ddt
 class TestCODACharacteristic(unittest.TestCase):
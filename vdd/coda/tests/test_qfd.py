@@ -0,0 +1,113 @@
+import os
+import unittest
+
+import numpy as np
+
+from .. import models
+from .. import qfd
+from . import DATA_DIR
+
+
+class TestHouseOfQuality(unittest.TestCase):
+
+    def setUp(self):
+        self.correlation = np.array([[0.9, 0.3, 0.0],
+                                     [0.1, 0.9, 0.3],
+                                     [0.0, 0.1, 0.9],
+                                     [0.3, 0.0, 0.1]])
+        self.weight = np.array([0.4, 0.3, 0.2, 0.1])
+        self.sut = qfd.HouseOfQuality(
+            ['R1', 'R2', 'R3', 'R4'], ['C1', 'C2', 'C3'],
+            self.correlation, self.weight
+        )
+
+    def test_importance(self):
+        np.testing.assert_allclose(self.sut.importance(),
+                                   [0.42, 0.41, 0.28])
+        np.testing.assert_allclose(self.sut.relative_importance(),
+                                   np.array([0.42, 0.41, 0.28]) / 1.11)
+
+    def test_importance__batch(self):
+        """Many weightings are evaluated together."""
+        weights = np.random.rand(50, 4)
+        actual = self.sut.relative_importance(weights)
+        self.assertEqual(actual.shape, (50, 3))
+        for w, row in zip(weights, actual):
+            np.testing.assert_allclose(
+                row, self.sut.relative_importance(w)
+            )
+
+    def test_importance__default_weight(self):
+        sut = qfd.HouseOfQuality(['R1', 'R2', 'R3', 'R4'],
+                                 ['C1', 'C2', 'C3'], self.correlation)
+        np.testing.assert_allclose(sut.importance(),
+                                   self.correlation.mean(axis=0))
+
+    def test_invalid_shapes(self):
+        self.assertRaises(ValueError, qfd.HouseOfQuality, ['R1'],
+                          ['C1', 'C2', 'C3'], self.correlation)
+        self.assertRaises(ValueError, self.sut.importance, [0.5, 0.5])
+        self.assertRaises(ValueError, qfd.HouseOfQuality,
+                          ['R1', 'R2', 'R3', 'R4'], ['C1', 'C2', 'C3'],
+                          self.correlation, roof=np.zeros((2, 2)))
+
+    def test_roof(self):
+        self.sut.set_roof('C2', 'C1', -3)
+        self.sut.set_roof(1, 2, 1)
+        np.testing.assert_array_equal(self.sut.roof, [[0, -3, 0],
+                                                      [-3, 0, 1],
+                                                      [0, 1, 0]])
+        self.assertRaises(ValueError, self.sut.set_roof, 'C1', 0, -1)
+        self.assertRaises(KeyError, self.sut.set_roof, 'C1', 'C9', -1)
+        self.assertRaises(KeyError, self.sut.set_roof, 'C1', 3, -1)
+
+    def test_roof__numpy_index(self):
+        """Characteristics may be indexed by numpy integers."""
+        i, j = np.nonzero([[0, 0, 1]])
+        self.sut.set_roof(i[0], j[0], -1)
+        self.assertEqual(self.sut.roof[0,2], -1)
+        self.assertRaises(KeyError, self.sut.set_roof, 'C1', np.int64(3),
+                          -1)
+
+    def test_exposure(self):
+        """Importance of conflicting characteristics, by strength."""
+        self.sut.set_roof('C1', 'C2', -3)
+        self.sut.set_roof('C1', 'C3', -1)
+        self.sut.set_roof('C2', 'C3', 9)
+        relative = self.sut.relative_importance()
+        np.testing.assert_allclose(
+            self.sut.exposure(),
+            [3 * relative[1] + relative[2], 3 * relative[0],
+             relative[0]]
+        )
+        self.assertEqual(self.sut.exposure(np.ones((2, 4))).shape, (2, 3))
+
+    def test_trade_offs(self):
+        self.sut.set_roof('C1', 'C3', -3)
+        self.sut.set_roof('C1', 'C2', -1)
+        self.sut.set_roof('C2', 'C3', 9)
+        # 3 * 0.28 (C3) is given up before 1 * 0.41 (C2).
+        self.assertEqual(self.sut.trade_offs(),
+                         [('C1', 'C3', -3), ('C1', 'C2', -1)])
+        self.assertEqual(self.sut.trade_offs([0, 0, 0, 1]),
+                         [('C1', 'C3', -3), ('C1', 'C2', -1)])
+
+    def test_from_coda(self):
+        model = models.CODA.read_excel(
+            os.path.join(DATA_DIR, 'demo_model_casestudy1.xlsx')
+        )
+
+        sut = qfd.HouseOfQuality.from_coda(model)
+
+        self.assertEqual(sut.requirements,
+                         tuple(r.name for r in model.requirements))
+        self.assertEqual(sut.characteristics,
+                         tuple(c.name for c in model.characteristics))
+        np.testing.assert_allclose(
+            sut.importance(),
+            (model.weight * model.correlation).sum(axis=0)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+
+from .. import models
+from .. import watch
+from . import DATA_DIR
+
+
+class TestWorkbookWatcher(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            import pandas
+            import openpyxl
+        except ImportError:
+            self.skipTest("`pandas` and `openpyxl` required for "
+                          "writing spreadsheets")
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.path = os.path.join(tmpdir, 'model.xlsx')
+
+        self.reference = models.CODA.read_excel(
+            os.path.join(DATA_DIR, 'demo_model_casestudy1.xlsx')
+        )
+        self.values = [24, 13, 4.3, 0.2]
+        self.reference.parameter_value = self.values
+        self.save()
+
+        self.sut = watch.WorkbookWatcher(self.path)
+        self.sut.model.parameter_value = self.values
+
+    def save(self):
+        # Simulate an edit by saving the reference model, making sure
+        # the modification time changes.
+        self.reference.to_excel(self.path)
+        mtime = time.time() + getattr(self, '_saves', 0)
+        self._saves = getattr(self, '_saves', 0) + 1
+        os.utime(self.path, (mtime, mtime))
+
+    def test_poll__unchanged(self):
+        self.assertIsNone(self.sut.poll())
+
+    def test_poll__changes(self):
+        """Only changed elements are applied to the live model."""
+        model = self.sut.model
+        self.reference.requirements[0].base_weight = 0.5
+        self.reference.characteristics[0].limits = (20, 30)
+        self.reference.add_relationship('Stiffness', 'Tyre Diameter',
+                                        'max', 'weak', 20)
+        self.reference.remove_relationship('Friction', 'Tyre Width')
+        self.save()
+
+        changes = self.sut.poll()
+
+        self.assertIs(self.sut.model, model)
+        self.assertEqual(changes, watch.WorkbookWatcher.Changes(
+            rebuilt=False,
+            requirements=['Stiffness'],
+            characteristics=['Tyre Diameter'],
+            relationships=[('Stiffness', 'Tyre Diameter'),
+                           ('Friction', 'Tyre Width')]
+        ))
+        self.assertTrue((model.matrix == self.reference.matrix).all())
+        self.assertEqual(model.characteristics[0].limits, (20, 30))
+        self.assertAlmostEqual(self.sut.merit, self.reference.merit)
+
+    def test_poll__structural_change(self):
+        """Adding elements rebuilds the model, retaining values."""
+        model = self.sut.model
+        self.reference.add_characteristic('Rim Depth', (10, 50), 30)
+        self.reference.add_relationship('Weight', 'Rim Depth', 'min',
+                                        'weak', 20)
+        self.save()
+
+        changes = self.sut.poll()
+
+        self.assertTrue(changes.rebuilt)
+        self.assertIsNot(self.sut.model, model)
+        self.assertEqual(self.sut.model.shape, (5, 5))
+        self.assertEqual(
+            [c.value for c in self.sut.model.characteristics[:4]],
+            self.values
+        )
+
+    def test_poll__unreadable(self):
+        """Errors reading the workbook are warned about and retried."""
+        self.save()
+        with mock.patch.object(self.sut, '_read',
+                               side_effect=IOError("Part-saved")), \
+                mock.patch('warnings.warn') as mock_warn:
+            self.assertIsNone(self.sut.poll())
+        self.assertTrue(mock_warn.called)
+
+        # Retried without the workbook being saved again.
+        self.assertIsNotNone(self.sut.poll())
+
+    def test_poll__apply_error(self):
+        """Errors applying changes are raised, then retried."""
+        self.reference.requirements[0].base_weight = 0.5
+        self.save()
+        with mock.patch.object(self.sut, '_apply',
+                               side_effect=ValueError("Invalid")):
+            self.assertRaises(ValueError, self.sut.poll)
+
+        changes = self.sut.poll()
+
+        self.assertTrue(changes.rebuilt)
+        self.assertAlmostEqual(self.sut.merit, self.reference.merit)
+
+    def test_merit__incremental(self):
+        """Merit tracks parameter values and workbook changes."""
+        self.assertAlmostEqual(self.sut.merit, self.reference.merit)
+
+        values = [25, 14, 4.3, 0.2]
+        self.sut.model.parameter_value = values
+        self.reference.parameter_value = values
+        self.assertAlmostEqual(self.sut.merit, self.reference.merit)
+
+        with mock.patch.object(models.CODA, '_merit') as mock_merit:
+            self.reference.add_relationship('Friction', 'Tyre Width',
+                                            'min', 'moderate', 15)
+            self.save()
+            self.sut.poll()
+            actual = self.sut.merit
+        self.assertFalse(mock_merit.called)
+        self.assertAlmostEqual(actual, self.reference.merit)
+
+    def test_watch(self):
+        callback = mock.Mock()
+        self.reference.requirements[1].base_weight = 0.4
+        self.save()
+
+        self.sut.watch(callback, interval=0.01, timeout=0.05)
+
+        callback.assert_called_once_with(self.sut, mock.ANY)
+        changes = callback.call_args[0][1]
+        self.assertEqual(changes.requirements, ['Friction'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+"""Keep CODA models in sync with workbooks as they are edited.
+
+Intended for workshops, where a workbook is edited and saved
+repeatedly while the model is evaluated; only the changes made to
+the workbook are applied to the live model.
+"""
+from __future__ import division
+
+import collections
+import os
+import time
+import warnings
+
+import numpy as np
+
+from . import io
+from .models import CODA
+
+try:
+    import pandas as pd
+except ImportError:
+    # Warned about in io.
+    pass
+
+
+class WorkbookWatcher(object):
+    """Keeps a CODA model in sync with an Excel workbook.
+
+    The workbook is re-read whenever it is saved and its cells are
+    compared with the previous read. Changed requirement weights,
+    characteristic limits and relationships are applied to the live
+    model, which is only rebuilt if requirements or characteristics
+    are added, removed or renamed (parameter values are carried over
+    by characteristic name).
+
+    Merit is recomputed incrementally; see `merit`.
+    """
+
+    Changes = collections.namedtuple(
+        'Changes',
+        ['rebuilt', 'requirements', 'characteristics', 'relationships']
+    )
+
+    # Cells read from the workbook (parser retains the dataframes).
+    _Grid = collections.namedtuple(
+        '_Grid',
+        ['parser', 'requirements', 'characteristics', 'values']
+    )
+
+    def __init__(self, path, parser_class=io.CompactExcelParser,
+                 sheet_name=0):
+        """
+            path: str
+                Path to the workbook.
+
+            parser_class: type
+                ExcelParser or CompactExcelParser, depending on the
+                layout.
+
+            sheet_name: int | str
+                Index or name of the CODA sheet within the workbook.
+        """
+        self.path = path
+        self.parser_class = parser_class
+        self.sheet_name = sheet_name
+
+        self._model = None
+        self._stat = self._get_stat()
+        self._grid = self._read()
+        self._rebuild(self._grid)
+
+    @property
+    def model(self):
+        """The live CODA model.
+
+        Note that a new model is created if the workbook changes
+        structurally (see `Changes.rebuilt`).
+        """
+        return self._model
+
+    @property
+    def merit(self):
+        """Overall design merit of the live model.
+
+        Equivalent to `model.merit`, but merit values are only
+        recomputed for relationships and parameter values which have
+        changed since the last evaluation. Call `invalidate` after
+        modifying the model's relationships directly.
+        """
+        model = self._model
+        values = model.parameter_value[0]
+        matrix = model.matrix
+
+        if self._eta is None:
+            self._cf = model.correlation.astype(float)
+            self._eta = model._merit().astype(float)
+        else:
+            for j in np.flatnonzero(values != self._values):
+                self._eta[:,j] = [f(values[j]) for f in matrix[:,j]]
+            for i, j in self._dirty:
+                self._cf[i,j] = matrix[i,j].correlation
+                self._eta[i,j] = matrix[i,j](values[j])
+
+        self._dirty = set()
+        self._values = values
+
+        satisfaction = (np.multiply(self._cf, self._eta).sum(axis=1)
+                        / self._cf.sum(axis=1))
+        return np.multiply(model.weight[:,0], satisfaction).sum()
+
+    def invalidate(self):
+        """Discard the cached merit values."""
+        self._cf = self._eta = self._values = None
+        self._dirty = set()
+
+    def poll(self):
+        """Apply any changes saved to the workbook since the last poll.
+
+        Returns
+        -------
+
+        WorkbookWatcher.Changes or None
+            Names of the requirements and characteristics, and
+            (requirement, characteristic) names of relationships,
+            which changed. None if the workbook is unchanged or can't
+            be read (e.g. part way through saving); it's read again
+            on the next poll, as it is after an error applying the
+            changes.
+        """
+        stat = self._get_stat()
+        if stat == self._stat:
+            return None
+
+        try:
+            grid = self._read()
+        except Exception as err:
+            warnings.warn("Couldn't read {}: {}".format(self.path, err))
+            return None
+
+        try:
+            changes = self._apply(self._grid, grid)
+        except Exception:
+            # The model may be part updated; rebuild on the next poll
+            # (the workbook isn't recorded as read).
+            self._grid = None
+            raise
+        self._stat = stat
+        self._grid = grid
+        return changes
+
+    def watch(self, callback=None, interval=0.5, timeout=None):
+        """Poll the workbook until interrupted.
+
+            callback: callable, optional
+                Called as callback(watcher, changes) after changes
+                are applied.
+
+            interval: real
+                Seconds between polls.
+
+            timeout: real, optional
+                Stop watching after this many seconds.
+        """
+        start = time.time()
+        while timeout is None or time.time() - start < timeout:
+            changes = self.poll()
+            if changes is not None and callback is not None:
+                callback(self, changes)
+            time.sleep(interval)
+
+    def _get_stat(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime, stat.st_size
+
+    def _read(self):
+        workbook = pd.ExcelFile(self.path)
+        try:
+            parser = self.parser_class(workbook,
+                                       sheet_name=self.sheet_name)
+            grid = self._Grid(parser,
+                              parser.get_requirements(),
+                              parser.get_characteristics(),
+                              parser.relationship_values)
+        finally:
+            workbook.close()
+        return grid
+
+    def _rebuild(self, grid):
+        old_model = self._model
+        model = CODA.from_records(grid.parser)
+
+        if old_model is not None:
+            for old, new in self._common_characteristics(old_model,
+                                                         model):
+                try:
+                    new.value = old.value
+                except (AttributeError, ValueError):
+                    # Unset or no longer within limits.
+                    pass
+
+        self._model = model
+        self.invalidate()
+
+    @staticmethod
+    def _common_characteristics(old_model, new_model):
+        old = {c.name: c for c in old_model.characteristics}
+        return [(old[c.name], c) for c in new_model.characteristics
+                if c.name in old]
+
+    def _apply(self, old, new):
+        # Apply the differences between two grids to the model.
+        reqts = [rec[0] for rec in new.requirements]
+        chars = [rec[0] for rec in new.characteristics]
+
+        if (old is None
+                or reqts != [rec[0] for rec in old.requirements]
+                or chars != [rec[0] for rec in old.characteristics]
+                or old.values.shape != new.values.shape):
+            self._rebuild(new)
+            relationships = [rec[:2] for rec in
+                             new.parser.get_relationships()]
+            return self.Changes(True, reqts, chars, relationships)
+
+        model = self._model
+
+        changed_reqts = []
+        for i, (o, n) in enumerate(zip(old.requirements,
+                                       new.requirements)):
+            if not _equal(o.weight, n.weight):
+                model.requirements[i].base_weight = n.weight
+                changed_reqts.append(n.name)
+
+        changed_chars = []
+        for j, (o, n) in enumerate(zip(old.characteristics,
+                                       new.characteristics)):
+            if not (_equal(o.min, n.min) and _equal(o.max, n.max)):
+                model.characteristics[j].limits = (n.min, n.max)
+                changed_chars.append(n.name)
+
+        # Each characteristic has a group of columns; find the groups
+        # with changed cells.
+        same = ((old.values == new.values)
+                | (pd.isnull(old.values) & pd.isnull(new.values)))
+        rows, cols = np.nonzero(~same)
+        cells = sorted(set(zip(rows.tolist(),
+                               (cols // self.parser_class._NCOLS_CHAR)
+                               .tolist())))
+
+        changed_rels = []
+        for i, j in cells:
+            if j >= len(chars):
+                # Beyond the defined characteristics.
+                continue
+            rec = new.parser._parse_relationship(new.values[i], j,
+                                                 reqts[i], chars[j])
+            if rec is None:
+                model.remove_relationship(i, j)
+            else:
+                model.add_relationship(i, j, *rec[2:])
+            self._dirty.add((i, j))
+            changed_rels.append((reqts[i], chars[j]))
+
+        return self.Changes(False, changed_reqts, changed_chars,
+                            changed_rels)
+
+
+def _equal(a, b):
+    # Equality treating NaNs (blank cells) as equal.
+    return a == b or (pd.isnull(a) and pd.isnull(b))
@@ -1,2 +1,2 @@
 from .abstract import ABC
-from . import io
+from . import aio, instrument, io
@@ -0,0 +1,69 @@
+"""Awaitable counterparts of the blocking spreadsheet I/O.
+
+Blocking work (Google Sheets requests, parsing workbooks) runs in an
+executor so it doesn't stall the event loop. The executor's workers
+bound the number of concurrent calls; pass an executor such as
+`concurrent.futures.ThreadPoolExecutor(max_workers=n)` to set a
+different limit, or a `ProcessPoolExecutor` to parse many workbooks
+in parallel.
+
+Cancelling an awaitable before its call has started prevents the
+call; calls already running complete in the background and their
+results are discarded.
+
+Requires Python 3 (asyncio).
+"""
+import functools
+import multiprocessing
+import threading
+
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # Python 2
+    asyncio = None
+
+
+# Default concurrency; Sheets requests are rate limited regardless
+# (see io.rate_limiter), this bounds the requests in flight.
+SHEETS_WORKERS = 8
+EXCEL_WORKERS = multiprocessing.cpu_count()
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def get_executor(name):
+    """Shared default executor, 'sheets' or 'excel'."""
+    workers = {'sheets': SHEETS_WORKERS, 'excel': EXCEL_WORKERS}[name]
+    with _lock:
+        try:
+            return _executors[name]
+        except KeyError:
+            executor = _executors[name] = ThreadPoolExecutor(workers)
+            return executor
+
+
+def run_in_executor(executor, func, *args):
+    """Return an awaitable for func(*args) called in an executor.
+
+        executor: concurrent.futures.Executor | str
+            Executor, or the name of a default executor (see
+            get_executor).
+    """
+    if asyncio is None:
+        raise NotImplementedError("Asynchronous I/O requires Python 3.")
+    if not hasattr(executor, 'submit'):
+        executor = get_executor(executor)
+    return _get_loop().run_in_executor(executor,
+                                       functools.partial(func, *args))
+
+
+def _get_loop():
+    # The running loop, where called from a coroutine or callback;
+    # otherwise (or before Python 3.7) the current event loop.
+    try:
+        return asyncio.get_running_loop()
+    except (AttributeError, RuntimeError):
+        return asyncio.get_event_loop()
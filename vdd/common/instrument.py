@@ -0,0 +1,212 @@
+"""Opt-in timers and counters on the hot paths.
+
+Shows whether time goes to spreadsheet I/O, parsing, model
+construction or evaluation. Instrumented functions report the time
+of each call, and counters the amount of work (e.g. rows fetched),
+to the registered sinks. With no sinks (the default) an instrumented
+call costs one extra check.
+
+Profile a block of code:
+
+    with instrument.profile() as stats:
+        model = CODA.from_google_sheet('Model')
+        model.merit
+    print(stats.report())
+
+or register a sink for the process, e.g.
+`instrument.add_sink(instrument.LoggingSink())`. Setting the
+VDD_INSTRUMENT environment variable registers a LoggingSink on
+import.
+"""
+from __future__ import absolute_import, division
+
+import collections
+import contextlib
+import functools
+import logging
+import os
+import threading
+import time
+
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+# Registered sinks; replaced, never mutated, so reading is safe
+# without a lock.
+_sinks = ()
+_lock = threading.Lock()
+
+# Sink of the active profile block, if any.
+_profile_sink = None
+
+
+def add_sink(sink):
+    """Report timings and counts to a sink."""
+    global _sinks
+    with _lock:
+        _sinks = _sinks + (sink,)
+
+
+def remove_sink(sink):
+    """Stop reporting to a sink."""
+    global _sinks
+    with _lock:
+        _sinks = tuple(s for s in _sinks if s is not sink)
+
+
+def timed(name):
+    """Decorator timing calls to a function as `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _sinks:
+                return func(*args, **kwargs)
+            start = _clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = _clock() - start
+                for sink in _sinks:
+                    sink.record(name, elapsed)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """Add to the counter `name`."""
+    for sink in _sinks:
+        sink.count(name, value)
+
+
+@contextlib.contextmanager
+def profile():
+    """Collect timings and counts within a block; yields StatsSink.
+
+    Timings and counts are collected from every thread (including
+    the workers of e.g. io.fetch_sheets), so blocks can't be nested
+    or overlap: RuntimeError is raised entering a block while another
+    is active.
+    """
+    global _profile_sink
+    sink = StatsSink()
+    with _lock:
+        if _profile_sink is not None:
+            raise RuntimeError("Already profiling; profile blocks "
+                               "can't be nested or run concurrently.")
+        _profile_sink = sink
+    add_sink(sink)
+    try:
+        yield sink
+    finally:
+        remove_sink(sink)
+        with _lock:
+            _profile_sink = None
+
+
+class Sink(object):
+    """Receives timings and counts; override either or both."""
+
+    def record(self, name, seconds):
+        pass
+
+    def count(self, name, value):
+        pass
+
+
+class LoggingSink(Sink):
+    """Logs each timing and count (at DEBUG level by default)."""
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger('vdd.instrument')
+        self.level = level
+
+    def record(self, name, seconds):
+        self.logger.log(self.level, "%s took %.6fs", name, seconds)
+
+    def count(self, name, value):
+        self.logger.log(self.level, "%s +%s", name, value)
+
+
+class StatsSink(Sink):
+    """Aggregates timings and counts in dicts.
+
+    `timings` maps names to TimingStats (calls, total, min and max
+    seconds); `counters` maps names to totals.
+    """
+
+    TimingStats = collections.namedtuple(
+        'TimingStats', ['calls', 'total', 'min', 'max']
+    )
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = collections.defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            try:
+                calls, total, min_, max_ = self.timings[name]
+            except KeyError:
+                calls, total, min_, max_ = 0, 0.0, seconds, seconds
+            self.timings[name] = self.TimingStats(
+                calls + 1, total + seconds, min(min_, seconds),
+                max(max_, seconds)
+            )
+
+    def count(self, name, value):
+        with self._lock:
+            self.counters[name] += value
+
+    def report(self):
+        """Text table of timings (slowest first) and counters."""
+        lines = ['{:<32} {:>8} {:>12} {:>12}'.format(
+            'timer', 'calls', 'total (s)', 'max (s)'
+        )]
+        for name, stats in sorted(self.timings.items(),
+                                  key=lambda item: -item[1].total):
+            lines.append('{:<32} {:>8} {:>12.6f} {:>12.6f}'.format(
+                name, stats.calls, stats.total, stats.max
+            ))
+        if self.counters:
+            lines.append('')
+            lines.append('{:<32} {:>8}'.format('counter', 'total'))
+            for name, value in sorted(self.counters.items()):
+                lines.append('{:<32} {:>8}'.format(name, value))
+        return '\n'.join(lines)
+
+    def to_openmetrics(self, prefix='vdd'):
+        """Timings and counters in OpenMetrics text format.
+
+        e.g. for a Prometheus textfile collector or pushgateway.
+        """
+        lines = []
+        if self.timings:
+            metric = '{}_call_seconds'.format(prefix)
+            lines.append('# TYPE {} summary'.format(metric))
+            lines.append('# UNIT {} seconds'.format(metric))
+            for name, stats in sorted(self.timings.items()):
+                label = _label(name)
+                lines.append('{}_count{} {}'.format(metric, label,
+                                                    stats.calls))
+                lines.append('{}_sum{} {!r}'.format(metric, label,
+                                                    stats.total))
+        if self.counters:
+            metric = '{}_work'.format(prefix)
+            lines.append('# TYPE {} counter'.format(metric))
+            for name, value in sorted(self.counters.items()):
+                lines.append('{}_total{} {}'.format(metric, _label(name),
+                                                    value))
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+def _label(name):
+    # OpenMetrics label set for a timer or counter name.
+    escaped = (name.replace('\\', '\\\\').replace('"', '\\"')
+               .replace('\n', '\\n'))
+    return '{{name="{}"}}'.format(escaped)
+
+
+if os.environ.get('VDD_INSTRUMENT'):
+    add_sink(LoggingSink())
@@ -1,11 +1,27 @@
-from __future__ import absolute_import
+from __future__ import absolute_import, division
 
 import abc
+import collections
+import datetime
+import functools
+import hashlib
+import json
 import os
+import random
+import re
+import threading
+import time
+from multiprocessing.pool import ThreadPool
 
+import google.auth.transport.requests
+import numpy as np
+import pandas as pd
 import pygsheets
 import xdg
+from google.oauth2 import service_account
+from googleapiclient.errors import HttpError
 
+from . import instrument
 from .abstract import ABC
 
 
@@ -13,10 +29,30 @@ class AbstractGSheet(ABC):
 
     class InvalidSource(Exception): pass
 
-    def __init__(self, workbook_name):
+    def __init__(self, workbook_name, value_range=None):
+        """
+            workbook_name: str
+                Name of the shared Google Sheet.
+
+            value_range: str, optional
+                Range of the first worksheet to read, in A1 notation
+                (default: the used range).
+        """
         self._workbook_name = workbook_name
+        self._value_range = value_range
         self._facade = GSheetsFacade(workbook_name)
 
+    def refresh(self):
+        """Discard the cached source data; it's fetched on next use."""
+        try:
+            del self._cached_df
+        except AttributeError:
+            pass
+
+    def get_revision(self):
+        """Identifier of the current revision of the source sheet."""
+        return self._facade.get_revision()
+
     @abc.abstractmethod
     def is_valid(self):
         """Method reports whether the source worksheet is valid."""
@@ -28,8 +64,220 @@ class AbstractGSheet(ABC):
         return None
 
 
+class ClientPool(object):
+    """Process-wide pool of Google Sheets clients.
+
+    Credentials are authorised once per credentials file and shared.
+    Each thread gets its own client per credentials file (the HTTP
+    connections aren't thread-safe), reused by every facade on that
+    thread. Access tokens are persisted to the cache directory so
+    other processes can reuse them until they expire.
+    """
+
+    _scopes = ('https://www.googleapis.com/auth/spreadsheets',
+               'https://www.googleapis.com/auth/drive')
+
+    _token_dir = os.path.join(xdg.XDG_CACHE_HOME, 'vdd', 'tokens')
+
+    # Tokens expiring sooner than this aren't reused.
+    _token_margin = datetime.timedelta(minutes=5)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._credentials = {}
+        self._local = threading.local()
+
+    def get_client(self, credentials_path):
+        """Client for this thread using a credentials file."""
+        key = os.path.abspath(credentials_path)
+        local = self._local
+        try:
+            clients = local.clients
+        except AttributeError:
+            clients = local.clients = {}
+
+        try:
+            return clients[key]
+        except KeyError:
+            client = self._new_client(self.get_credentials(key))
+            clients[key] = client
+            return client
+
+    def get_credentials(self, credentials_path):
+        """Authorised (shared) credentials from a credentials file."""
+        key = os.path.abspath(credentials_path)
+        with self._lock:
+            try:
+                return self._credentials[key]
+            except KeyError:
+                credentials = self._authorize(key)
+                self._credentials[key] = credentials
+                return credentials
+
+    def clear(self):
+        """Discard all clients and credentials."""
+        with self._lock:
+            self._credentials.clear()
+            self._local = threading.local()
+
+    def _new_client(self, credentials):
+        # Retries are left to the facade (see call_with_backoff).
+        client = pygsheets.authorize(custom_credentials=credentials,
+                                     retries=0, check=False)
+        client.drive.retries = 0
+        return client
+
+    def _authorize(self, credentials_path):
+        credentials = (
+            service_account.Credentials.from_service_account_file(
+                credentials_path, scopes=self._scopes
+            )
+        )
+        token_path = self._token_path(credentials_path)
+        if not self._load_token(credentials, token_path):
+            request = google.auth.transport.requests.Request()
+            credentials.refresh(request)
+            self._save_token(credentials, token_path)
+        return credentials
+
+    def _token_path(self, credentials_path):
+        digest = hashlib.sha1(credentials_path.encode('utf-8'))
+        return os.path.join(self._token_dir,
+                            '{}.json'.format(digest.hexdigest()))
+
+    def _load_token(self, credentials, token_path):
+        # Apply a persisted token to the credentials if it's current.
+        try:
+            with open(token_path) as f:
+                data = json.load(f)
+            expiry = datetime.datetime.strptime(data['expiry'],
+                                                '%Y-%m-%dT%H:%M:%S')
+        except (IOError, OSError, ValueError, KeyError):
+            return False
+
+        # Expiry is naive UTC (as used by google-auth).
+        if expiry - datetime.datetime.utcnow() < self._token_margin:
+            return False
+        credentials.token = data['token']
+        credentials.expiry = expiry
+        return True
+
+    def _save_token(self, credentials, token_path):
+        if credentials.expiry is None:
+            return
+        if not os.path.isdir(self._token_dir):
+            os.makedirs(self._token_dir)
+        data = {
+            'token': credentials.token,
+            'expiry': credentials.expiry.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        # The token is a secret; readable by the owner only.
+        fd = os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                     0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+
+
+client_pool = ClientPool()
+
+# Atomic on POSIX and (where available) Windows.
+_replace = getattr(os, 'replace', os.rename)
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket rate limiter.
+
+    Tokens accumulate at `rate` per second up to `capacity`. Each
+    request takes a token, waiting for it if the bucket is empty;
+    waiting requests are served in turn.
+    """
+
+    _clock = staticmethod(getattr(time, 'monotonic', time.time))
+
+    def __init__(self, rate, capacity=1):
+        """
+            rate: real
+                Tokens added per second.
+
+            capacity: real
+                Maximum tokens held (i.e. burst size).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._time = self._clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Take tokens, blocking until they're available.
+
+        Returns the time waited in seconds.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._time) * self.rate)
+            self._time = now
+            # Tokens are reserved immediately; a deficit is the wait.
+            self._tokens -= tokens
+            wait = max(0, -self._tokens / self.rate)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+# Sheets API read quota is 60 requests per minute per user; the burst
+# and refill are sized so no 60 second window exceeds it.
+rate_limiter = TokenBucket(rate=50 / 60, capacity=10)
+
+_RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+def call_with_backoff(func, args=(), limiter=None, retries=5,
+                      delay=1.0, max_delay=32.0):
+    """Call a Google API function, retrying transient errors.
+
+    Rate limit (429) and server (5xx) errors are retried with
+    exponential backoff and full jitter, i.e. a random wait up to
+    delay * 2**attempt (capped at max_delay) seconds.
+
+        func: callable
+            Function making an API request.
+
+        args: tuple
+            Arguments for func.
+
+        limiter: TokenBucket, optional
+            Rate limiter acquired before each attempt.
+
+        retries: int
+            Maximum number of retries.
+    """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return func(*args)
+        except HttpError as err:
+            if (attempt >= retries
+                    or int(err.resp.status) not in _RETRY_STATUSES):
+                raise
+        time.sleep(random.uniform(0, min(max_delay, delay * 2**attempt)))
+        attempt += 1
+
+
 class GSheetsFacade(object):
-    """Facade providing restrictred API to Google Sheets."""
+    """Facade providing restrictred API to Google Sheets.
+
+    Rows read are mirrored to the cache directory with the sheet's
+    revision (modification time); they're reused while the revision
+    is unchanged, which costs a single metadata request. In offline
+    mode (set `GSheetsFacade.offline` or the VDD_OFFLINE environment
+    variable) rows are read from the mirror only.
+    """
+
+    class NotMirrored(Exception): pass
 
     _credentials_path = os.path.join(
         xdg.XDG_CONFIG_HOME,
@@ -37,6 +285,22 @@ class GSheetsFacade(object):
         'gsheets_credentials.json'
     )
 
+    # Mirrored sheets; None to disable the mirror.
+    _mirror_dir = os.path.join(xdg.XDG_CACHE_HOME, 'vdd', 'sheets')
+
+    offline = os.environ.get('VDD_OFFLINE', '').lower() in ('1', 'true',
+                                                            'yes')
+
+    # Backoff parameters (see call_with_backoff)
+    _retries = 5
+    _retry_delay = 1.0
+
+    # Seconds a checked revision is trusted for reads (so checking
+    # the revision then reading the rows is one metadata request).
+    _revision_ttl = 1.0
+
+    _clock = staticmethod(getattr(time, 'monotonic', time.time))
+
     def __init__(self, workbook_name):
         # We shouldn't really init the facade with a workbook name.
         # It's here to support the retention of the sheet, but perhaps
@@ -44,43 +308,377 @@ class GSheetsFacade(object):
         # referencing, specifying the workbook name each time we want
         # to operate on it.
         self._workbook_name = workbook_name
+        self._key = None
+        self._checked_revision = (None, None)     # (time, revision)
+        # (upper left cell, cells) as last read or written; see
+        # write_dataframe
+        self._synced = None
 
     @property
     def _client(self):
-        # google sheets client (cached)
-        try:
-            return self._cached_client
-        except AttributeError:
-            self._cached_client = pygsheets.authorize(
-                service_account_file=self._credentials_path
-            )
-            return self._cached_client
+        # google sheets client (shared; see ClientPool)
+        return client_pool.get_client(self._credentials_path)
 
     @property
     def _sheet(self):
+        # Cached with the client it was opened by; clients are per
+        # thread so the sheet is reopened (by key) on other threads.
+        client = self._client
         try:
-            return self._cached_sheet
+            cached_client, sheet = self._cached_sheet
         except AttributeError:
-            sheet = self._client.open(self._workbook_name).sheet1
-            self._cached_sheet = WorksheetAdapter(sheet)
-            return self._cached_sheet
+            pass
+        else:
+            if cached_client is client:
+                return sheet
 
+        if self._key is None:
+            spreadsheet = self._call(client.open, self._workbook_name)
+            self._key = spreadsheet.id
+        else:
+            spreadsheet = self._call(client.open_by_key, self._key)
+        sheet = WorksheetAdapter(spreadsheet.sheet1)
+        self._cached_sheet = (client, sheet)
+        return sheet
+
+    def _call(self, func, *args):
+        # Rate limited API request, retrying transient errors.
+        return call_with_backoff(func, args, limiter=rate_limiter,
+                                 retries=self._retries,
+                                 delay=self._retry_delay)
+
+    def get_revision(self):
+        """Return the sheet's last modification time (RFC 3339).
+
+        Cheaper than fetching the rows, so used to detect changes.
+        Offline, the revision of the mirrored sheet is returned.
+        """
+        if self.offline:
+            return self._get_mirror(required=True)['revision']
+
+        if self._key is None:
+            # The mirror saves opening the sheet (to find its key).
+            mirror = self._get_mirror()
+            if mirror is None:
+                self._sheet
+            else:
+                self._key = mirror['key']
+        revision = self._call(self._client.drive.get_update_time,
+                              self._key)
+        self._checked_revision = (self._clock(), revision)
+        return revision
+
+    @instrument.timed('GSheetsFacade.get_rows')
+    def get_rows(self, value_range=None):
+        """Return a 2D list of populated rows/columns.
+
+        Parameters
+        ----------
 
-    def get_rows(self):
-        """Return a 2D list of populated rows/columns."""
-        return self._sheet.get_all_values()
+        value_range : str, optional
+            Range to read in A1 notation (default: the used range).
+
+        Raises
+        ------
+
+        GSheetsFacade.NotMirrored
+            If offline and the range isn't mirrored.
+        """
+        range_key = value_range or ''
+        if self.offline:
+            try:
+                rows = self._get_mirror(required=True)['ranges'][range_key]
+            except KeyError:
+                raise self.NotMirrored(
+                    "Range {!r} of {!r} not mirrored."
+                    .format(value_range, self._workbook_name)
+                )
+        else:
+            checked, revision = self._checked_revision
+            if (checked is None
+                    or self._clock() - checked > self._revision_ttl):
+                revision = self.get_revision()
+            mirror = self._get_mirror()
+            if mirror is None or mirror['revision'] != revision:
+                mirror = {'key': self._key, 'revision': revision,
+                          'ranges': {}}
+            try:
+                rows = mirror['ranges'][range_key]
+            except KeyError:
+                sheet = self._sheet
+                rows = self._call(sheet.get_all_values, value_range)
+                mirror['ranges'][range_key] = rows
+                self._save_mirror(mirror)
+
+        self._synced = (range_start(value_range), rows)
+        instrument.count('GSheetsFacade.rows', len(rows))
+        return rows
+
+    @property
+    def _mirror_path(self):
+        digest = hashlib.sha1(self._workbook_name.encode('utf-8'))
+        return os.path.join(self._mirror_dir,
+                            '{}.json'.format(digest.hexdigest()))
+
+    def _get_mirror(self, required=False):
+        # Mirrored sheet: key, revision and rows by range (or None).
+        if self._mirror_dir is not None:
+            try:
+                with open(self._mirror_path) as f:
+                    mirror = json.load(f)
+            except (IOError, OSError, ValueError):
+                pass
+            else:
+                if mirror.get('workbook_name') == self._workbook_name:
+                    return mirror
+        if required:
+            raise self.NotMirrored(
+                "{!r} not mirrored.".format(self._workbook_name)
+            )
+        return None
+
+    def _save_mirror(self, mirror):
+        if self._mirror_dir is None:
+            return
+        if not os.path.isdir(self._mirror_dir):
+            os.makedirs(self._mirror_dir)
+        mirror['workbook_name'] = self._workbook_name
+        # Written then moved into place so readers (e.g. other
+        # processes) never see part of a file.
+        path = self._mirror_path
+        tmp_path = '{}.{}-{}.tmp'.format(path, os.getpid(),
+                                         threading.current_thread().ident)
+        with open(tmp_path, 'w') as f:
+            json.dump(mirror, f)
+        _replace(tmp_path, path)
+
+    def get_ranges(self, value_ranges):
+        """Return a 2D list of populated rows/columns per range.
+
+        The ranges are read in a single request.
+        """
+        sheet = self._sheet
+        return self._call(sheet.get_ranges, value_ranges)
 
     def write_dataframe(self, df, position):
         """Write a dataframe to the worksheet at position.
 
+        The index and header are written with the values. Only the
+        cells which differ from the sheet as last read (by get_rows,
+        from the same upper left cell) or written are updated, in a
+        single batched request. The whole dataframe is written,
+        resizing the sheet to fit, if those cells aren't known or the
+        dataframe's extent differs from theirs. Once written, the sheet is read
+        afresh by get_rows (rather than from the mirror).
+
         Parameters
         ----------
 
         position : str
             Upper left cell for the dataframe position.
         """
-        self._sheet.set_dataframe(df, start=position, copy_index=True,
-                                  copy_head=True, fit=True)
+        sheet = self._sheet
+        rows = _dataframe_rows(df)
+        start = range_start(position)
+        synced_start, synced = self._synced or (None, None)
+
+        if (start == synced_start and rows is not None
+                and _shape(synced) == _shape(rows)):
+            ranges = _changed_ranges(synced, rows, start)
+            if ranges:
+                self._call(sheet.update_ranges, ranges)
+                self._invalidate_mirror()
+        else:
+            self._call(functools.partial(sheet.set_dataframe, df,
+                                         start=position,
+                                         copy_index=True,
+                                         copy_head=True, fit=True))
+            self._invalidate_mirror()
+
+        self._synced = None if rows is None else (start, rows)
+
+    def _invalidate_mirror(self):
+        # After a write the checked revision and mirrored rows are
+        # stale; the new revision may not be reported at once, so the
+        # mirror's is discarded rather than waiting for it to change.
+        self._checked_revision = (None, None)
+        mirror = self._get_mirror()
+        if mirror is not None:
+            mirror['revision'] = None
+            mirror['ranges'] = {}
+            self._save_mirror(mirror)
+
+
+def range_start(value_range):
+    """Return the upper left cell of an A1 range, e.g. 'B2' for
+    'B2:E5' (row or column 1 where the range omits them, and 'A1'
+    for the used range, None).
+    """
+    if value_range is None:
+        return 'A1'
+    column, row = re.match(r'([A-Za-z]*)(\d*)',
+                           value_range.split(':')[0]).groups()
+    return '{}{}'.format(column.upper() or 'A', row or 1)
+
+
+def _dataframe_rows(df):
+    # Cells written by set_dataframe (copying index and header) as
+    # strings; None for multi-level indexes, which aren't supported.
+    if (isinstance(df.index, pd.MultiIndex)
+            or isinstance(df.columns, pd.MultiIndex)):
+        return None
+    header = [df.index.name] + list(df.columns)
+    body = np.column_stack([df.index.astype(str),
+                            df.fillna('NaN').astype(str).values])
+    return ([['' if label is None else str(label) for label in header]]
+            + body.tolist())
+
+
+def _shape(rows):
+    return len(rows), max([len(row) for row in rows] or [0])
+
+
+def _changed_ranges(old_rows, new_rows, start='A1'):
+    # Group cells which differ between two (equally sized) grids, with
+    # their upper left cell at start, into rectangular A1 ranges: runs
+    # of changed cells in each row, merged with identical runs in the
+    # rows below.
+    row0, col0 = pygsheets.utils.format_addr(start, 'tuple')
+    old = np.array(old_rows, dtype=object).astype(str)
+    new = np.array(new_rows, dtype=object).astype(str)
+    changed = old != new
+
+    blocks = []
+    open_blocks = {}    # (first col, last col) -> [first row, last row]
+    for i in np.flatnonzero(changed.any(axis=1)):
+        cols = np.flatnonzero(changed[i])
+        runs = np.split(cols, np.flatnonzero(np.diff(cols) != 1) + 1)
+        for run in runs:
+            key = (run[0], run[-1])
+            block = open_blocks.get(key)
+            if block is not None and block[1] == i - 1:
+                block[1] = i
+            else:
+                block = open_blocks[key] = [i, i]
+                blocks.append((block, key))
+
+    ranges = []
+    for (r0, r1), (c0, c1) in blocks:
+        value_range = '{}:{}'.format(
+            pygsheets.utils.format_addr((row0 + r0, col0 + c0), 'label'),
+            pygsheets.utils.format_addr((row0 + r1, col0 + c1), 'label')
+        )
+        ranges.append((value_range, new[r0:r1+1, c0:c1+1].tolist()))
+    return ranges
+
+
+class SheetCache(object):
+    """Fetched sheets by workbook name, valid for one revision."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sheets = {}
+
+    def get(self, sheet_class, workbook_name):
+        """Return the cached (revision, sheet), or (None, None)."""
+        with self._lock:
+            return self._sheets.get((sheet_class, workbook_name),
+                                    (None, None))
+
+    def put(self, sheet_class, workbook_name, revision, sheet):
+        with self._lock:
+            self._sheets[(sheet_class, workbook_name)] = (revision, sheet)
+
+    def clear(self):
+        with self._lock:
+            self._sheets.clear()
+
+
+sheet_cache = SheetCache()
+
+
+SheetResult = collections.namedtuple(
+    'SheetResult',
+    ['workbook_name', 'sheet', 'error']
+)
+
+
+def fetch_sheets(sheet_class, workbook_names, threads=8,
+                 cache=sheet_cache):
+    """Fetch many Google Sheets concurrently.
+
+    Requests share the module rate limiter, so the number of threads
+    mostly determines how many slow requests can overlap. The threads
+    are kept for later calls (with as many threads), so their clients
+    (see ClientPool) are reused rather than authorised again. Sheets
+    whose revision is unchanged since they were last fetched are
+    served from the cache without fetching their contents.
+
+    Parameters
+    ----------
+
+    sheet_class : type
+        AbstractGSheet subclass, constructed with the workbook name.
+
+    workbook_names : iterable of str
+        Names of shared Google Sheets.
+
+    threads : int
+        Maximum number of concurrent fetches.
+
+    cache : SheetCache, optional
+        Cache of fetched sheets; None to always fetch.
+
+    Returns
+    -------
+
+    list of SheetResult
+        One result per workbook in the given order, holding either
+        the fetched sheet or a description of the error; errors don't
+        abort the batch.
+    """
+    workbook_names = list(workbook_names)
+    fetch = functools.partial(_fetch_sheet, sheet_class, cache)
+    threads = min(threads, len(set(workbook_names)))
+    if threads <= 1:
+        return list(map(fetch, workbook_names))
+
+    return _get_fetch_pool(threads).map(fetch, workbook_names,
+                                        chunksize=1)
+
+
+# Thread pools for fetch_sheets by number of threads.
+_fetch_pools = {}
+_fetch_pools_lock = threading.Lock()
+
+
+def _get_fetch_pool(threads):
+    with _fetch_pools_lock:
+        try:
+            return _fetch_pools[threads]
+        except KeyError:
+            pool = _fetch_pools[threads] = ThreadPool(threads)
+            return pool
+
+
+def _fetch_sheet(sheet_class, cache, workbook_name):
+    try:
+        revision = sheet = None
+        if cache is not None:
+            revision, sheet = cache.get(sheet_class, workbook_name)
+        if sheet is None:
+            sheet = sheet_class(workbook_name)
+
+        current = sheet.get_revision()
+        if current != revision:
+            sheet.refresh()
+            sheet.df
+            if cache is not None:
+                cache.put(sheet_class, workbook_name, current, sheet)
+    except Exception as err:
+        error = '{}: {}'.format(type(err).__name__, err)
+        return SheetResult(workbook_name, None, error)
+    return SheetResult(workbook_name, sheet, None)
 
 
 class WorksheetAdapter(object):
@@ -94,12 +692,68 @@ class WorksheetAdapter(object):
     def __getattr__(self, attr):
         return getattr(self._sheet, attr)
 
-    def get_all_values(self):
-        # TODO: Consider tackling this method's API upstream
+    def get_all_values(self, value_range=None):
+        """Return the populated cells as a 2D list of strings.
+
+        Only the used range is downloaded, not the whole grid, unless
+        value_range (A1 notation, e.g. 'A1:F20') is given. Trailing
+        empty columns and rows are stripped.
+        """
+        return self.get_ranges([value_range])[0]
+
+    def get_ranges(self, value_ranges):
+        """Return the populated cells in each of several ranges.
+
+        See get_all_values; the ranges are read in one request.
+        """
         sheet = self._sheet
-        rows = sheet.get_all_values(include_tailing_empty_rows=False)
-        # Strip all empty trailing columns
-        rows = zip(*rows)
-        rows = [cell for cell in rows if any(cell)]
-        rows = [list(row) for row in zip(*rows)]
-        return rows
+        ranges = [self._qualify_range(value_range)
+                  for value_range in value_ranges]
+        value_ranges = sheet.client.sheet.values_batch_get(
+            sheet.spreadsheet.id, ranges
+        )
+        return [self._trim(value_range.get('values', []))
+                for value_range in value_ranges]
+
+    def update_ranges(self, value_ranges):
+        """Write values to several ranges in one request.
+
+            value_ranges: list of (str, list of list)
+                A1 ranges and the rows of values to write to each.
+                Values are parsed as if entered by a user.
+        """
+        sheet = self._sheet
+        body = {
+            'valueInputOption': 'USER_ENTERED',
+            'data': [{'range': self._qualify_range(value_range),
+                      'values': values}
+                     for value_range, values in value_ranges]
+        }
+        request = (sheet.client.sheet.service.spreadsheets().values()
+                   .batchUpdate(spreadsheetId=sheet.spreadsheet.id,
+                                body=body))
+        return request.execute()
+
+    def _qualify_range(self, value_range):
+        # A1 range on this sheet; the title alone is the used range.
+        title = "'{}'".format(self._sheet.title.replace("'", "''"))
+        if value_range is None:
+            return title
+        return '{}!{}'.format(title, value_range)
+
+    @staticmethod
+    def _trim(rows):
+        # The values API omits trailing empty cells, so rows are
+        # ragged; pad to a grid then drop trailing empty columns and
+        # rows (so cells keep their positions in the sheet).
+        width = max([len(row) for row in rows] or [0])
+        cells = np.full((len(rows), width), '', dtype=object)
+        for i, row in enumerate(rows):
+            cells[i,:len(row)] = row
+
+        populated = cells != ''
+        if not populated.any():
+            return []
+        nrows = len(rows) - np.argmax(populated.any(axis=1)[::-1])
+        ncols = width - np.argmax(populated.any(axis=0)[::-1])
+        return cells[:nrows,:ncols].tolist()
@@ -0,0 +1,104 @@
+import threading
+import time
+import unittest
+
+import mock
+
+from .. import aio
+
+
+@unittest.skipIf(aio.asyncio is None, "asyncio requires Python 3")
+class TestRunInExecutor(unittest.TestCase):
+
+    def setUp(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.loop = aio.asyncio.new_event_loop()
+        aio.asyncio.set_event_loop(self.loop)
+        self.addCleanup(aio.asyncio.set_event_loop, None)
+        self.addCleanup(self.loop.close)
+
+        self.executor = ThreadPoolExecutor(2)
+        self.addCleanup(self.executor.shutdown)
+
+    def run_all(self, *awaitables):
+        return self.loop.run_until_complete(
+            aio.asyncio.gather(*awaitables, return_exceptions=True)
+        )
+
+    def test_run_in_executor(self):
+        func = mock.Mock(return_value='result')
+
+        actual = self.run_all(aio.run_in_executor(self.executor, func,
+                                                  1, 2))
+
+        self.assertEqual(actual, ['result'])
+        func.assert_called_once_with(1, 2)
+
+    def test_run_in_executor__running_loop(self):
+        """The running loop is used, rather than the current one."""
+        if not hasattr(aio.asyncio, 'get_running_loop'):
+            self.skipTest("get_running_loop requires Python 3.7")
+        func = mock.Mock(return_value='result')
+        awaitables = []
+
+        with mock.patch.object(aio.asyncio,
+                               'get_event_loop') as get_event_loop:
+            self.loop.call_soon(lambda: awaitables.append(
+                aio.run_in_executor(self.executor, func)
+            ))
+            self.loop.run_until_complete(aio.asyncio.sleep(0))
+            actual = self.run_all(*awaitables)
+
+        self.assertEqual(actual, ['result'])
+        self.assertFalse(get_event_loop.called)
+
+    def test_run_in_executor__default(self):
+        awaitable = aio.run_in_executor('sheets', threading.current_thread)
+
+        thread, = self.run_all(awaitable)
+
+        self.assertIsNot(thread, threading.current_thread())
+        self.assertIs(aio.get_executor('sheets'),
+                      aio.get_executor('sheets'))
+
+    def test_run_in_executor__limit(self):
+        """Concurrent calls are bounded by the executor's workers."""
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def func():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+
+        self.run_all(*[aio.run_in_executor(self.executor, func)
+                       for _ in range(6)])
+
+        self.assertEqual(len(peak), 6)
+        self.assertEqual(max(peak), 2)
+
+    def test_run_in_executor__cancel(self):
+        """Cancelled calls which haven't started aren't made."""
+        release = threading.Event()
+        blocked = [aio.run_in_executor(self.executor, release.wait)
+                   for _ in range(2)]
+        func = mock.Mock()
+        queued = aio.run_in_executor(self.executor, func)
+
+        queued.cancel()
+        # Cancellation reaches the executor via the loop.
+        self.loop.run_until_complete(aio.asyncio.sleep(0.01))
+        release.set()
+        results = self.run_all(queued, *blocked)
+
+        self.assertIsInstance(results[0], aio.asyncio.CancelledError)
+        self.assertFalse(func.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+import unittest
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
+from .. import instrument
+from ...coda import models as coda_models
+from ...coda.tests import DATA_DIR
+from ...requirements import models as requirements_models
+
+
+class TestInstrument(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(instrument, '_sinks', ())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.clock = iter(range(100))
+        patcher = mock.patch.object(instrument, '_clock',
+                                    lambda: next(self.clock))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        @instrument.timed('work')
+        def work(x):
+            if x is None:
+                raise ValueError
+            return x * 2
+        self.work = work
+
+    def test_timed__disabled(self):
+        """Without sinks, calls aren't timed."""
+        self.assertEqual(self.work(2), 4)
+        self.assertEqual(next(self.clock), 0)
+
+    def test_profile(self):
+        with instrument.profile() as stats:
+            self.work(1)
+            self.work(2)
+            instrument.count('items', 3)
+            instrument.count('items')
+        self.work(3)
+
+        self.assertEqual(stats.timings,
+                         {'work': stats.TimingStats(2, 2.0, 1, 1)})
+        self.assertEqual(stats.counters, {'items': 4})
+        self.assertEqual(instrument._sinks, ())
+
+    def test_profile__nested(self):
+        """Another block can't be entered while profiling."""
+        with instrument.profile() as stats:
+            with self.assertRaises(RuntimeError):
+                with instrument.profile():
+                    pass
+            self.work(1)
+
+        self.assertEqual(stats.timings,
+                         {'work': stats.TimingStats(1, 1.0, 1, 1)})
+        with instrument.profile():
+            pass
+
+    def test_profile__concurrent(self):
+        errors = []
+
+        def target():
+            try:
+                with instrument.profile():
+                    pass
+            except RuntimeError as err:
+                errors.append(err)
+
+        with instrument.profile():
+            thread = threading.Thread(target=target)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(len(errors), 1)
+
+    def test_timed__error(self):
+        """Failed calls are timed too."""
+        sink = mock.Mock(spec=instrument.Sink)
+        instrument.add_sink(sink)
+        self.assertRaises(ValueError, self.work, None)
+        sink.record.assert_called_once_with('work', 1)
+
+        instrument.remove_sink(sink)
+        self.work(1)
+        self.assertEqual(sink.record.call_count, 1)
+
+    def test_logging_sink(self):
+        logger = mock.Mock(spec=logging.Logger)
+        instrument.add_sink(instrument.LoggingSink(logger, logging.INFO))
+        self.work(1)
+        instrument.count('items', 2)
+        logger.log.assert_has_calls([
+            mock.call(logging.INFO, "%s took %.6fs", 'work', 1),
+            mock.call(logging.INFO, "%s +%s", 'items', 2),
+        ])
+
+    def test_report(self):
+        with instrument.profile() as stats:
+            self.work(1)
+            instrument.count('items', 2)
+        lines = stats.report().splitlines()
+        self.assertEqual(lines[1].split(),
+                         ['work', '1', '1.000000', '1.000000'])
+        self.assertEqual(lines[-1].split(), ['items', '2'])
+
+    def test_to_openmetrics(self):
+        with instrument.profile() as stats:
+            self.work(1)
+            instrument.count('a "quoted" name', 2)
+        self.assertEqual(stats.to_openmetrics(), '\n'.join([
+            '# TYPE vdd_call_seconds summary',
+            '# UNIT vdd_call_seconds seconds',
+            'vdd_call_seconds_count{name="work"} 1',
+            'vdd_call_seconds_sum{name="work"} 1.0',
+            '# TYPE vdd_work counter',
+            'vdd_work_total{name="a \\"quoted\\" name"} 2',
+            '# EOF',
+        ]) + '\n')
+
+
+class TestHotPaths(unittest.TestCase):
+
+    def test_profile(self):
+        """Parsing, construction and evaluation are instrumented."""
+        with instrument.profile() as stats:
+            model = coda_models.CODA.read_excel(
+                os.path.join(DATA_DIR, 'demo_model_casestudy1.xlsx')
+            )
+            model.parameter_value = [24, 13, 4.3, 0.2]
+            model.merit
+            requirements_models.BinWM('a', 'b').score
+
+        self.assertEqual(
+            set(stats.timings),
+            {'ExcelParser.df', 'ExcelParser._parse_row',
+             'CODA._transfer_elements', 'CODA._merit', 'BinWM.score'}
+        )
+        self.assertEqual(stats.counters['ExcelParser.relationships'],
+                         16)
+
+
+if __name__ == '__main__':
+    unittest.main()
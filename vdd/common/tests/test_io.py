@@ -1,10 +1,23 @@
+import collections
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import threading
 import unittest
 
 import mock
 import pygsheets
 import pandas as pd
 
-from .. import io
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+from .. import instrument, io
 
 
 @mock.patch.object(io.GSheetsFacade, '_sheet',
@@ -21,9 +34,18 @@ class TestGSheetsFacade(unittest.TestCase):
         # complain (rightfully). Using spec (rather than spec_set)
         # allows this and balances between strict and useful.
         mock_sheet.set_dataframe = mock.Mock()
+        mock_sheet.get_all_values.return_value = [['A1', 'B1']]
         return mock_sheet
 
     def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        for attr, value in [('_mirror_dir', tmpdir),
+                            ('get_revision', mock.Mock(return_value='1'))]:
+            patcher = mock.patch.object(io.GSheetsFacade, attr, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
         self.sut = io.GSheetsFacade('dummy workbook name')
 
     def test_get_rows(self, mock_sheet_property):
@@ -32,9 +54,62 @@ class TestGSheetsFacade(unittest.TestCase):
 
         retval = self.sut.get_rows()
 
-        mock_sheet.get_all_values.assert_called_once_with()
+        mock_sheet.get_all_values.assert_called_once_with(None)
         self.assertIs(retval, mock_sheet.get_all_values.return_value)
 
+    def test_get_rows__instrumented(self, mock_sheet_property):
+        self.setup_mock_sheet(mock_sheet_property)
+
+        with instrument.profile() as stats:
+            self.sut.get_rows()
+
+        self.assertEqual(stats.timings['GSheetsFacade.get_rows'].calls, 1)
+        self.assertEqual(stats.counters, {'GSheetsFacade.rows': 1})
+
+    def test_get_rows__range(self, mock_sheet_property):
+        mock_sheet = self.setup_mock_sheet(mock_sheet_property)
+
+        self.sut.get_rows('A1:D4')
+
+        mock_sheet.get_all_values.assert_called_once_with('A1:D4')
+
+    def test_get_ranges(self, mock_sheet_property):
+        mock_sheet = self.setup_mock_sheet(mock_sheet_property)
+
+        retval = self.sut.get_ranges(['A1:D4', 'F1:F4'])
+
+        mock_sheet.get_ranges.assert_called_once_with(['A1:D4', 'F1:F4'])
+        self.assertIs(retval, mock_sheet.get_ranges.return_value)
+
+    def test_get_rows__mirrored(self, mock_sheet_property):
+        """Rows are reused while the revision is unchanged."""
+        mock_sheet = self.setup_mock_sheet(mock_sheet_property)
+        self.sut.get_rows()
+
+        retval = io.GSheetsFacade('dummy workbook name').get_rows()
+
+        self.assertEqual(retval, [['A1', 'B1']])
+        self.assertEqual(mock_sheet.get_all_values.call_count, 1)
+
+        io.GSheetsFacade.get_revision.return_value = '2'
+        io.GSheetsFacade('dummy workbook name').get_rows()
+        self.assertEqual(mock_sheet.get_all_values.call_count, 2)
+
+    @mock.patch.object(io.GSheetsFacade, 'offline', True)
+    def test_get_rows__offline(self, mock_sheet_property):
+        self.assertRaises(io.GSheetsFacade.NotMirrored,
+                          self.sut.get_rows)
+
+        with mock.patch.object(io.GSheetsFacade, 'offline', False):
+            self.setup_mock_sheet(mock_sheet_property)
+            self.sut.get_rows()
+        mock_sheet_property.reset_mock()
+
+        self.assertEqual(self.sut.get_rows(), [['A1', 'B1']])
+        self.assertRaises(io.GSheetsFacade.NotMirrored,
+                          self.sut.get_rows, 'A1:B2')
+        self.assertFalse(mock_sheet_property.called)
+
     def test_write_dataframe(self, mock_sheet_property):
         """Utilises the pygsheets method 'Worksheet.set_dataframe'"""
         mock_sheet = self.setup_mock_sheet(mock_sheet_property)
@@ -52,16 +127,587 @@ class TestGSheetsFacade(unittest.TestCase):
         )
         self.assertIs(retval, None)
 
+    def setup_synced_sheet(self, mock_sheet_property):
+        # Facade having read a 3x3 matrix with scores.
+        mock_sheet = self.setup_mock_sheet(mock_sheet_property)
+        mock_sheet.get_all_values.return_value = [
+            ['Reqs', 'A', 'B', 'C', 'Score'],
+            ['A', '', '1', '0', '0.5'],
+            ['B', '', '', '1', '0.33'],
+            ['C', '', '', '', '0.17'],
+        ]
+        self.sut.get_rows()
+        return mock_sheet
+
+    def get_dataframe(self, matrix, score):
+        df = pd.DataFrame(matrix, index=list('ABC'), columns=list('ABC'))
+        df.index.name = 'Reqs'
+        df['Score'] = score
+        return df
+
+    def test_write_dataframe__changed_cells(self, mock_sheet_property):
+        """Only changed cells are written, in one request."""
+        mock_sheet = self.setup_synced_sheet(mock_sheet_property)
+        df = self.get_dataframe([['', 0, 0], ['', '', 1], ['', '', '']],
+                                [0.25, 0.5, 0.25])
+
+        self.sut.write_dataframe(df, 'A1')
+
+        self.assertFalse(mock_sheet.set_dataframe.called)
+        mock_sheet.update_ranges.assert_called_once_with([
+            ('C2:C2', [['0']]),
+            ('E2:E4', [['0.25'], ['0.5'], ['0.25']]),
+        ])
+
+    def test_write_dataframe__read_after_write(self, mock_sheet_property):
+        """Rows are read afresh, not from the mirror, after a write."""
+        mock_sheet = self.setup_synced_sheet(mock_sheet_property)
+        df = self.get_dataframe([['', 0, 0], ['', '', 1], ['', '', '']],
+                                [0.25, 0.5, 0.25])
+        self.sut.write_dataframe(df, 'A1')
+        written = [['Reqs', 'A', 'B', 'C', 'Score'],
+                   ['A', '', '0', '0', '0.25'],
+                   ['B', '', '', '1', '0.5'],
+                   ['C', '', '', '', '0.25']]
+        mock_sheet.get_all_values.return_value = written
+
+        # Within the revision TTL, and the revision not yet changed.
+        self.assertEqual(self.sut.get_rows(), written)
+        self.assertEqual(
+            io.GSheetsFacade('dummy workbook name').get_rows(), written
+        )
+        self.assertEqual(mock_sheet.get_all_values.call_count, 2)
+
+        # Changes are found against the rows as written.
+        mock_sheet.update_ranges.reset_mock()
+        df.loc['A', 'C'] = 1
+        self.sut.write_dataframe(df, 'A1')
+        mock_sheet.update_ranges.assert_called_once_with([
+            ('D2:D2', [['1']])
+        ])
+
+    def test_write_dataframe__unchanged(self, mock_sheet_property):
+        mock_sheet = self.setup_synced_sheet(mock_sheet_property)
+        df = self.get_dataframe([['', 1, 0], ['', '', 1], ['', '', '']],
+                                ['0.5', '0.33', '0.17'])
+
+        self.sut.write_dataframe(df, 'A1')
+        self.sut.write_dataframe(df, 'A1')
+
+        self.assertFalse(mock_sheet.set_dataframe.called)
+        self.assertFalse(mock_sheet.update_ranges.called)
+
+    def test_write_dataframe__value_range(self, mock_sheet_property):
+        """Cells read from a range are diffed from its upper left cell."""
+        mock_sheet = self.setup_mock_sheet(mock_sheet_property)
+        mock_sheet.get_all_values.return_value = [
+            ['Reqs', 'A', 'B', 'C', 'Score'],
+            ['A', '', '1', '0', '0.5'],
+            ['B', '', '', '1', '0.33'],
+            ['C', '', '', '', '0.17'],
+        ]
+        self.sut.get_rows('B2:F5')
+        df = self.get_dataframe([['', 0, 0], ['', '', 1], ['', '', '']],
+                                [0.25, 0.5, 0.25])
+
+        self.sut.write_dataframe(df, 'B2')
+
+        self.assertFalse(mock_sheet.set_dataframe.called)
+        mock_sheet.update_ranges.assert_called_once_with([
+            ('D3:D3', [['0']]),
+            ('F3:F5', [['0.25'], ['0.5'], ['0.25']]),
+        ])
+
+        # Elsewhere, the cells aren't known.
+        self.sut.write_dataframe(df, 'A1')
+        self.assertTrue(mock_sheet.set_dataframe.called)
+
+    def test_write_dataframe__resized(self, mock_sheet_property):
+        """Dataframes with a different extent are written whole."""
+        mock_sheet = self.setup_synced_sheet(mock_sheet_property)
+        df = self.get_dataframe([['', 1, 0], ['', '', 1], ['', '', '']],
+                                ['0.5', '0.33', '0.17'])
+        df = df.drop(columns='Score')
+
+        self.sut.write_dataframe(df, 'A1')
+
+        self.assertTrue(mock_sheet.set_dataframe.called)
+        self.assertFalse(mock_sheet.update_ranges.called)
+
+        # The written state is tracked.
+        df.loc['A', 'B'] = 0
+        self.sut.write_dataframe(df, 'A1')
+        mock_sheet.update_ranges.assert_called_once_with([
+            ('C2:C2', [['0']])
+        ])
+
+
+class TestAbstractGSheet(unittest.TestCase):
+
+    class Concrete(io.AbstractGSheet):
+        is_valid = update = None
+
+    def test_refresh(self):
+        """Cached source data is discarded."""
+        sut = self.Concrete('dummy workbook name')
+        sut._cached_df = pd.DataFrame()
+
+        sut.refresh()
+        sut.refresh()
+
+        self.assertFalse(hasattr(sut, '_cached_df'))
+
+
+class FakeTokenServer(object):
+    """Local stand-in for the OAuth token endpoint.
+
+    Issues a numbered access token for each request.
+    """
+
+    def __init__(self):
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                server.requests.append(self.rfile.read(length))
+                body = json.dumps({
+                    'access_token': 'token-{}'.format(
+                        len(server.requests)
+                    ),
+                    'expires_in': 3600,
+                    'token_type': 'Bearer'
+                }).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{}/token'.format(
+            self._httpd.server_port
+        )
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def shutdown(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class TestClientPool(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            from cryptography.hazmat.backends import default_backend
+            from cryptography.hazmat.primitives import serialization
+            from cryptography.hazmat.primitives.asymmetric import rsa
+        except ImportError:
+            self.skipTest("`cryptography` required to sign tokens.")
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+        self.server = FakeTokenServer()
+        self.addCleanup(self.server.shutdown)
+
+        key = rsa.generate_private_key(public_exponent=65537,
+                                       key_size=2048,
+                                       backend=default_backend())
+        pem = key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        self.credentials_path = os.path.join(self.tmpdir,
+                                             'credentials.json')
+        with open(self.credentials_path, 'w') as f:
+            json.dump({
+                'type': 'service_account',
+                'project_id': 'test',
+                'private_key_id': '1',
+                'private_key': pem.decode('utf-8'),
+                'client_email': 'test@test.iam.gserviceaccount.com',
+                'client_id': '1',
+                'token_uri': self.server.url,
+            }, f)
+
+        patcher = mock.patch.object(io.ClientPool, '_token_dir',
+                                    os.path.join(self.tmpdir, 'tokens'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.sut = io.ClientPool()
+
+    def test_get_client(self):
+        """Clients are authorised once and reused."""
+        client = self.sut.get_client(self.credentials_path)
+
+        self.assertIsInstance(client, pygsheets.client.Client)
+        self.assertIs(self.sut.get_client(self.credentials_path),
+                      client)
+        self.assertEqual(client.oauth.token, 'token-1')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_get_client__threads(self):
+        """Threads share credentials but not clients."""
+        results = []
+
+        def target():
+            results.append(self.sut.get_client(self.credentials_path))
+
+        threads = [threading.Thread(target=target) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(set(map(id, results))), 8)
+        self.assertEqual(len(set(id(c.oauth) for c in results)), 1)
+
+    def test_token_persisted(self):
+        """Another pool (e.g. process) reuses the persisted token."""
+        self.sut.get_client(self.credentials_path)
+
+        client = io.ClientPool().get_client(self.credentials_path)
+
+        self.assertEqual(client.oauth.token, 'token-1')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_token_expired(self):
+        """Persisted tokens close to expiry are refreshed."""
+        credentials = self.sut.get_credentials(self.credentials_path)
+        credentials.expiry = (datetime.datetime.utcnow()
+                              + datetime.timedelta(minutes=1))
+        self.sut._save_token(
+            credentials,
+            self.sut._token_path(os.path.abspath(self.credentials_path))
+        )
+
+        client = io.ClientPool().get_client(self.credentials_path)
+
+        self.assertEqual(client.oauth.token, 'token-2')
+
+    def test_facades_share_client(self):
+        with mock.patch.object(io, 'client_pool', self.sut), \
+                mock.patch.object(io.GSheetsFacade, '_credentials_path',
+                                  self.credentials_path):
+            facades = [io.GSheetsFacade(name) for name in 'ab']
+            self.assertIs(facades[0]._client, facades[1]._client)
+        self.assertEqual(len(self.server.requests), 1)
+
+
+class FakeSheetsServer(object):
+    """Local stand-in for the Sheets and Drive APIs.
+
+    Serves workbooks (name -> rows) by key. Statuses queued in
+    `failures` are returned instead of the next responses.
+    """
+
+    def __init__(self, workbooks):
+        self.workbooks = workbooks
+        self.modified = dict.fromkeys(workbooks, '2019-01-01T00:00:00Z')
+        self.failures = collections.deque()
+        self.requests = collections.Counter()
+        lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                path = self.path.split('?')[0].split('/')
+                with lock:
+                    kind = server._kind(path)
+                    server.requests[kind] += 1
+                    status = (server.failures.popleft()
+                              if server.failures else 200)
+                if status == 200:
+                    body = server._respond(kind, path)
+                else:
+                    body = {'error': {'code': status,
+                                      'message': 'Stand-in error'}}
+                body = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = HTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = 'http://127.0.0.1:{}/'.format(self._httpd.server_port)
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def shutdown(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @staticmethod
+    def _kind(path):
+        # Path is e.g. ['', 'v4', 'spreadsheets', key, 'values:batchGet']
+        if path[1] == 'files':
+            return 'revision' if len(path) > 2 else 'list'
+        return 'values' if len(path) > 4 else 'spreadsheet'
+
+    def _respond(self, kind, path):
+        if kind == 'list':
+            return {'files': [{'id': 'key-' + name, 'name': name}
+                              for name in self.workbooks]}
+        name = (path[2] if kind == 'revision' else path[3])[4:]
+        if kind == 'revision':
+            return {'modifiedTime': self.modified[name]}
+        if kind == 'values':
+            return {'valueRanges': [{'range': 'Sheet1',
+                                     'majorDimension': 'ROWS',
+                                     'values': self.workbooks[name]}]}
+        return {
+            'spreadsheetId': 'key-' + name,
+            'properties': {'title': name, 'defaultFormat': {}},
+            'sheets': [{'properties': {
+                'sheetId': 0, 'title': 'Sheet1', 'index': 0,
+                'gridProperties': {'rowCount': 100, 'columnCount': 26}
+            }}]
+        }
+
+
+class RowsSheet(io.AbstractGSheet):
+    # Minimal sheet holding the raw rows.
+
+    @property
+    def df(self):
+        try:
+            return self._cached_df
+        except AttributeError:
+            self._cached_df = pd.DataFrame(self._facade.get_rows())
+            return self._cached_df
+
+    def is_valid(self):
+        return True
+
+    def update(self, df):
+        pass
+
+
+class TestFetchSheets(unittest.TestCase):
+
+    def setUp(self):
+        import google.oauth2.credentials
+
+        self.server = FakeSheetsServer({
+            'workbook-{}'.format(i): [['Label', 'Value'],
+                                      ['Item', str(i)]]
+            for i in range(6)
+        })
+        self.addCleanup(self.server.shutdown)
+
+        pool = io.ClientPool()
+        new_client = pool._new_client
+
+        def redirected_client(credentials):
+            client = new_client(credentials)
+            client.sheet.service._baseUrl = self.server.url
+            client.drive.service._baseUrl = self.server.url
+            return client
+
+        pool._new_client = redirected_client
+        pool.get_credentials = lambda path: (
+            google.oauth2.credentials.Credentials('token')
+        )
+        for name, value in [('client_pool', pool),
+                            ('rate_limiter', io.TokenBucket(1000, 100))]:
+            patcher = mock.patch.object(io, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        for attr, value in [('_retry_delay', 0.01),
+                            ('_mirror_dir', tmpdir)]:
+            patcher = mock.patch.object(io.GSheetsFacade, attr, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.cache = io.SheetCache()
+        self.names = sorted(self.server.workbooks)
+
+    def fetch(self, names=None, **kwargs):
+        kwargs.setdefault('cache', self.cache)
+        return io.fetch_sheets(RowsSheet, names or self.names, **kwargs)
+
+    def test_fetch_sheets(self):
+        results = self.fetch(threads=4)
+
+        self.assertEqual([r.workbook_name for r in results], self.names)
+        for i, result in enumerate(results):
+            self.assertIsNone(result.error)
+            self.assertEqual(result.sheet.df.iloc[1, 1], str(i))
+        self.assertEqual(self.server.requests['values'], 6)
+
+    def test_fetch_sheets__clients_reused(self):
+        """Each thread's client is reused by later fetches."""
+        pool = io.client_pool
+        with mock.patch.object(pool, '_new_client',
+                               side_effect=pool._new_client) as new_client:
+            for _ in range(3):
+                self.fetch(threads=2, cache=None)
+
+        self.assertLessEqual(new_client.call_count, 2)
+
+    def test_fetch_sheets__cached_by_revision(self):
+        """Only sheets with a new revision are fetched again."""
+        first = self.fetch(threads=4)
+        self.server.workbooks['workbook-2'][1][1] = 'changed'
+        self.server.modified['workbook-2'] = '2019-01-02T00:00:00Z'
+
+        second = self.fetch(threads=4)
+
+        self.assertEqual(self.server.requests['values'], 7)
+        for a, b in zip(first, second):
+            self.assertIs(a.sheet, b.sheet)
+        self.assertEqual(second[2].sheet.df.iloc[1, 1], 'changed')
+
+    def test_fetch_sheets__mirrored(self):
+        """Later runs check the revision only (one cheap request)."""
+        self.fetch(threads=4)
+        self.server.requests.clear()
+
+        results = self.fetch(threads=4, cache=None)
+
+        self.assertEqual([r.error for r in results], [None] * 6)
+        self.assertEqual(self.server.requests, {'revision': 6})
+
+    def test_fetch_sheets__offline(self):
+        self.fetch(['workbook-0'], threads=1)
+        self.server.requests.clear()
+
+        with mock.patch.object(io.GSheetsFacade, 'offline', True):
+            results = self.fetch(['workbook-0', 'workbook-1'],
+                                 threads=1, cache=None)
+
+        self.assertEqual(results[0].sheet.df.iloc[1, 1], '0')
+        self.assertIn('NotMirrored', results[1].error)
+        self.assertEqual(sum(self.server.requests.values()), 0)
+
+    def test_fetch_sheets__retry(self):
+        """Rate limit and server errors are retried."""
+        self.server.failures.extend([429, 503, 429])
+
+        results = self.fetch(threads=1)
+
+        self.assertEqual([r.error for r in results], [None] * 6)
+
+    def test_fetch_sheets__errors(self):
+        """Persistent and client errors are reported per workbook."""
+        self.server.failures.extend([404])
+
+        results = self.fetch(['workbook-0', 'workbook-1'], threads=1)
+
+        self.assertIn('HttpError', results[0].error)
+        self.assertIsNone(results[0].sheet)
+        self.assertIsNone(results[1].error)
+
+    def test_fetch_sheets__rate_limited(self):
+        with mock.patch.object(io, 'rate_limiter') as mock_limiter:
+            self.fetch(threads=4)
+        # One per call; opening by name also lists the files.
+        requests = self.server.requests
+        self.assertEqual(mock_limiter.acquire.call_count,
+                         sum(requests.values()) - requests['list'])
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        patcher = mock.patch.object(io.TokenBucket, '_clock',
+                                    lambda bucket: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sut = io.TokenBucket(rate=2, capacity=3)
+
+    @mock.patch('time.sleep')
+    def test_acquire(self, mock_sleep):
+        waits = [self.sut.acquire() for _ in range(5)]
+        self.assertEqual(waits, [0, 0, 0, 0.5, 1.0])
+
+        self.now = 10.0
+        self.assertEqual(self.sut.acquire(), 0)
+
+
+class TestCallWithBackoff(unittest.TestCase):
+
+    def http_error(self, status):
+        return io.HttpError(mock.Mock(status=status), b'')
+
+    @mock.patch('time.sleep')
+    def test_call_with_backoff(self, mock_sleep):
+        func = mock.Mock(side_effect=[self.http_error(429),
+                                      self.http_error(500), 'result'])
+
+        with mock.patch('random.uniform', side_effect=lambda a, b: b):
+            actual = io.call_with_backoff(func, ('arg',), delay=1.0)
+
+        self.assertEqual(actual, 'result')
+        self.assertEqual(mock_sleep.call_args_list,
+                         [mock.call(1.0), mock.call(2.0)])
+
+    @mock.patch('time.sleep')
+    def test_call_with_backoff__exhausted(self, mock_sleep):
+        func = mock.Mock(side_effect=self.http_error(503))
+        with self.assertRaises(io.HttpError):
+            io.call_with_backoff(func, retries=2)
+        self.assertEqual(func.call_count, 3)
+
+    @mock.patch('time.sleep')
+    def test_call_with_backoff__not_retried(self, mock_sleep):
+        func = mock.Mock(side_effect=self.http_error(403))
+        with self.assertRaises(io.HttpError):
+            io.call_with_backoff(func)
+        self.assertEqual(func.call_count, 1)
+
 
 class TestWorksheetAdapter(unittest.TestCase):
     """Adapter for external (pygsheets) worksheet model."""
 
     def setUp(self):
         self.mock_sheet = mock.MagicMock(
-            spec_set=pygsheets.worksheet.Worksheet
+            spec=pygsheets.worksheet.Worksheet
+        )
+        # Instance attributes of the wrapped worksheet
+        self.mock_sheet.title = "Bob's Sheet"
+        self.mock_sheet.spreadsheet = mock.Mock(id='key')
+        self.mock_sheet.client = mock.MagicMock(
+            spec=pygsheets.client.Client
+        )
+        self.mock_sheet.client.sheet = mock.MagicMock(
+            spec=pygsheets.sheet.SheetAPIWrapper
         )
+        self.values_batch_get = self.mock_sheet.client.sheet.values_batch_get
         self.sut = io.WorksheetAdapter(self.mock_sheet)
 
+    def set_values(self, *value_ranges):
+        self.values_batch_get.return_value = [
+            {'range': 'dummy', 'values': values}
+            for values in value_ranges
+        ]
+
     def test_attribute_passthrough(self):
         """Attributes not explicitly overriden are passed through."""
         mock_sheet = self.mock_sheet
@@ -80,7 +726,7 @@ class TestWorksheetAdapter(unittest.TestCase):
         This test checks using source data typical of a binary
         weighting matrix
         """
-        self.mock_sheet.get_all_values.return_value = [
+        self.set_values([
             ['Requirements',
              'Requirement 1',
              'Requirement 2',
@@ -92,7 +738,7 @@ class TestWorksheetAdapter(unittest.TestCase):
             ['Requirement 1', '', '', '', '', '', '', ''],
             ['Requirement 2', '', '', '', '', '', '', ''],
             ['Requirement 3', '', '', '', '', '', '', '']
-        ]
+        ])
 
         adapter = self.sut
         actual = adapter.get_all_values()
@@ -117,12 +763,12 @@ class TestWorksheetAdapter(unittest.TestCase):
         This test checks using a source data structure typical of a
         coda model.
         """
-        self.mock_sheet.get_all_values.return_value = [
+        self.set_values([
                 [  '', 'B1', 'C1',   '', 'E1',   '', ''],
                 ['A2', 'B2', 'C2', 'D2', 'E2', 'F2', ''],
                 ['A3', 'B3', 'C3',   '', 'E3', 'F3', ''],
                 ['A4', 'B4', 'C4', 'D4', 'E4',   '', ''],
-        ]
+        ])
 
         adapter = self.sut
         actual = adapter.get_all_values()
@@ -136,5 +782,55 @@ class TestWorksheetAdapter(unittest.TestCase):
         self.assertEqual(actual, expected)
 
 
+    def test_get_all_values__used_range(self):
+        """Only the used range is requested; ragged rows are padded."""
+        self.set_values([
+            ['A1', 'B1', '', 'D1'],
+            [],
+            ['A3'],
+            ['', '', '', ''],
+        ])
+
+        actual = self.sut.get_all_values()
+
+        self.values_batch_get.assert_called_once_with(
+            'key', ["'Bob''s Sheet'"]
+        )
+        self.assertEqual(actual, [['A1', 'B1', '', 'D1'],
+                                  ['', '', '', ''],
+                                  ['A3', '', '', '']])
+
+    def test_get_all_values__empty(self):
+        self.values_batch_get.return_value = [{'range': 'dummy'}]
+        self.assertEqual(self.sut.get_all_values(), [])
+
+    def test_update_ranges(self):
+        service = self.mock_sheet.client.sheet.service = mock.MagicMock()
+        values_api = service.spreadsheets.return_value.values.return_value
+
+        self.sut.update_ranges([('C2:C2', [['0']]),
+                                ('E2:E3', [['0.5'], ['0.25']])])
+
+        values_api.batchUpdate.assert_called_once_with(
+            spreadsheetId='key',
+            body={'valueInputOption': 'USER_ENTERED',
+                  'data': [{'range': "'Bob''s Sheet'!C2:C2",
+                            'values': [['0']]},
+                           {'range': "'Bob''s Sheet'!E2:E3",
+                            'values': [['0.5'], ['0.25']]}]}
+        )
+        values_api.batchUpdate.return_value.execute.assert_called_once_with()
+
+    def test_get_ranges(self):
+        self.set_values([['A1', 'B1']], [['F1'], ['F2']])
+
+        actual = self.sut.get_ranges(['A1:B1', 'F1:F2'])
+
+        self.values_batch_get.assert_called_once_with(
+            'key', ["'Bob''s Sheet'!A1:B1", "'Bob''s Sheet'!F1:F2"]
+        )
+        self.assertEqual(actual, [[['A1', 'B1']], [['F1'], ['F2']]])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1 +1,2 @@
-from .models import BinWM
\ No newline at end of file
+from .models import (AHP, BinWM, BinWMSet, BradleyTerry,
+                     HierarchicalWM)
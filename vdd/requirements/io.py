@@ -35,7 +35,7 @@ class GSheetBinWM(BinWMSheet, common.io.AbstractGSheet):
         try:
             return self._cached_df
         except AttributeError:
-            rows = self.get_rows()
+            rows = self._read_rows = self.get_rows()
             header = rows[0]
             records = rows[1:]
 
@@ -50,56 +50,56 @@ class GSheetBinWM(BinWMSheet, common.io.AbstractGSheet):
             self._validate_df_shape(df)
 
             # Check integrity of axes.
-            for r, c in zip(df.index.values, df.columns.values):
-                if r != c:
-                    raise self.InvalidSource(
-                        "Row and column labels misaligned."
-                    )
-            if len(set(df.index.values)) != len(df.index.values):
+            if (df.index.values != df.columns.values).any():
+                raise self.InvalidSource(
+                    "Row and column labels misaligned."
+                )
+            if df.index.duplicated().any():
                 raise self.InvalidSource("Duplicate row labels.")
-            if len(set(df.columns.values)) != len(df.columns.values):
+            if df.columns.duplicated().any():
                 raise self.InvalidSource("Duplicate column labels.")
 
-            mat = df.to_numpy()
-
-            lower_tri = mat[np.tril_indices(n=len(df.index), k=0)]
-            upper_tri = mat[np.triu_indices(n=len(df.index), k=1)]
-            # check all elements are '', '0' or '1'
-            # if all zero, break
-            # check for 1s in the lower tri (bad)
-            # Set lower tri to ''
-            # If all blank; set to '0'; break
-            # If not all blank, we have values in upper.
-            # Check for blanks in upper tri (bad)
-            # Only '0' and '1' left in upper tri (fine)
-            # Replace '' with '0' in whole
-            if not ((mat == '') | (mat == '0') | (mat == '1')).all():
+            codes = self._cell_codes(df.to_numpy())
+            n = len(codes)
+            i = np.arange(n)
+            lower_tri = i[:,None] >= i      # including the diagonal
+            upper_tri = ~lower_tri
+
+            # Either all zeros, or only zeros/blanks in the lower tri
+            # and a complete (or blank) upper tri.
+            if (codes == self._INVALID).any():
                 raise self.InvalidSource(
                     "Valid matrix values are empty, 0 or 1"
                 )
-
-            elif (mat == '0').all():
-                df[:] = '0'
-
-            elif (lower_tri == '1').any():
+            elif (codes == 0).all():
+                pass
+            elif (codes[lower_tri] == 1).any():
                 raise self.InvalidSource(
                     "Lower triangular matrix should be 0 or empty"
                 )
-
             else:
-                mat[np.tril_indices(n=len(df.index), k=0)] = ''
-                if (mat == '').all():
-                    df[:] = '0'
-
-                elif (upper_tri == '').any():
+                upper_blank = codes[upper_tri] == self._BLANK
+                if upper_blank.any() and not upper_blank.all():
                     raise self.InvalidSource(
                         "Upper triangular matrix must be complete."
                     )
-            df[df == ''] = '0'
 
-            df = self._cached_df = df.astype(int)
+            mat = (upper_tri & (codes == 1)).astype(np.int8)
+            df = self._cached_df = pd.DataFrame(mat, index=df.index,
+                                                columns=df.columns)
             return df
 
+    # Cell codes; the matrix cells are coded in a single pass.
+    _CELL_VALUES = ('0', '1', '')
+    _BLANK = 2
+    _INVALID = -1
+
+    @classmethod
+    def _cell_codes(cls, mat):
+        # Code cells by position in _CELL_VALUES (invalid otherwise)
+        codes = pd.Categorical(mat.ravel(), categories=cls._CELL_VALUES)
+        return codes.codes.reshape(mat.shape)
+
     def _validate_df_shape(self, df):
         # Checks the dataframe shape is valid
         #
@@ -143,8 +143,42 @@ class GSheetBinWM(BinWMSheet, common.io.AbstractGSheet):
 
     def get_rows(self):
         """Return the rows in the source spreadsheet."""
-        return self._facade.get_rows()
+        return self._facade.get_rows(self._value_range)
 
     def update(self, df):
-        """Bulk update the contents of the source spreadsheet."""
-        self._facade.write_dataframe(df, position='A1')
+        """Bulk update the contents of the source spreadsheet.
+
+        The dataframe is written at the upper left cell of the value
+        range. Cells on or below the diagonal are written as they were
+        read (0 or blank) if the requirements are unchanged, so only
+        the decisions and scores which differ are updated.
+        """
+        self._facade.write_dataframe(
+            self._with_read_lower_tri(df),
+            position=common.io.range_start(self._value_range)
+        )
+
+    def _with_read_lower_tri(self, df):
+        # df with the cells on or below the matrix diagonal replaced by
+        # those read from the sheet, if it was read with the same
+        # requirements (in order).
+        try:
+            rows = self._read_rows
+        except AttributeError:
+            return df
+        n = len(df.index)
+        labels = [str(label) for label in df.columns[:n]]
+        if (len(rows) != n + 1
+                or any(len(row) < n + 1 for row in rows)
+                or rows[0][1:n+1] != labels):
+            return df
+
+        read = np.array([row[1:n+1] for row in rows[1:]], dtype=object)
+        i = np.arange(n)
+        lower_tri = i[:,None] >= i
+        matrix = df.iloc[:,:n].astype(object).to_numpy()
+        matrix[lower_tri] = read[lower_tri]
+        return pd.concat([
+            pd.DataFrame(matrix, index=df.index, columns=df.columns[:n]),
+            df.iloc[:,n:]
+        ], axis=1)
@@ -1,16 +1,40 @@
 from __future__ import division
 
+import collections
 import itertools
+import json
+import os
 import random
+import re
 import warnings
 
 import numpy as np
 import pandas as pd
 
+from .. import common
 from . import io
 
 
-class BinWM(object):
+class _ScoreSeries(object):
+    # Mixin for weighting models with `requirements` and a `score`.
+
+    _fallback_score_column_name = 'Score'
+
+    def get_score_as_series(self):
+        # Glue method until API changes; see BinWM.score TODO
+        try:
+            score_column_name = self._sheet.score_column_name
+        except AttributeError:
+            if hasattr(self, '_sheet'):
+                raise
+            score_column_name = self._fallback_score_column_name
+
+        return pd.Series(self.score,
+                         index=self.requirements,
+                         name=score_column_name)
+
+
+class BinWM(_ScoreSeries):
     """Binary Weighting Matrix
 
     Used to model relative importance of requirements. Each
@@ -22,8 +46,6 @@ class BinWM(object):
     # access to the underlying data; this helps maintain integrity and
     # limits complexity in keeping it in sync with source data.
 
-    _fallback_score_column_name = 'Score'
-
     def __init__(self, *args, **kwargs):
         """
         Parameters
@@ -33,21 +55,103 @@ class BinWM(object):
             Requirements provided as N positional args.
 
         matrix : np.array, optional
-            2D, square NxN binary matrix for N requirements.
+            2D, square NxN binary matrix for N requirements. Only
+            the upper triangle (above the diagonal) is significant.
         """
         self.requirements = args
-        default_matrix = np.zeros([len(args), len(args)])
-        matrix = kwargs.get('matrix', default_matrix)
-        self._matrix = matrix
+        try:
+            self._matrix = kwargs['matrix']
+        except KeyError:
+            self._decisions = PackedTriangle(len(args))
+            self._tally = self._score = None
+
+    @property
+    def _matrix(self):
+        # Dense form of the decisions, created on demand; they're
+        # stored bit-packed (see PackedTriangle). Read-only, as
+        # writes wouldn't reach the decisions; see _set_decision.
+        matrix = self._decisions.to_dense()
+        matrix.flags.writeable = False
+        return matrix
+
+    @_matrix.setter
+    def _matrix(self, matrix):
+        self._decisions = PackedTriangle.from_dense(matrix)
+        self._tally = self._score = None
+
+    def _set_decision(self, i, j, value):
+        # Set decision (i, j), i < j, updating the score in O(1).
+        value = int(bool(value))
+        change = value - self._decisions[i, j]
+        if not change:
+            return
+        self._decisions[i, j] = value
+        tally, score = self._tally, self._score
+        if tally is not None:
+            tally[i] += change
+            tally[j] -= change
+            for k in i, j:
+                score[k] = tally[k] / self._score_total
 
     @classmethod
-    def from_google_sheet(cls, workbook_name):
+    def from_google_sheet(cls, workbook_name, value_range=None):
         """Construct the binary matrix from a Google Sheet.
 
         The spreadsheet must be a standard format (see included Excel
-        examples).
+        examples). Only the used range of the sheet is read unless
+        value_range (A1 notation) is given.
+        """
+        return cls._from_sheet(cls._get_sheet(workbook_name,
+                                              value_range))
+
+    @classmethod
+    def afrom_google_sheet(cls, workbook_name, value_range=None,
+                           executor='sheets'):
+        """Awaitable `from_google_sheet`, run in an executor.
+
+        e.g. `bwm = await BinWM.afrom_google_sheet(name)`. The
+        executor bounds concurrent fetches; see `common.aio`.
+        """
+        return common.aio.run_in_executor(executor, cls.from_google_sheet,
+                                          workbook_name, value_range)
+
+    @classmethod
+    def from_google_sheets(cls, workbook_names, threads=8):
+        """Construct binary matrices from many Google Sheets.
+
+        Sheets are fetched concurrently, rate limited to the Sheets
+        API quota, and cached by revision; see
+        `common.io.fetch_sheets`.
+
+        Returns
+        -------
+
+        matrices : dict
+            BinWM instances keyed by workbook name.
+
+        errors : dict
+            Descriptions of the errors raised fetching or
+            constructing a matrix, keyed by workbook name.
         """
-        sheet = cls._get_sheet(workbook_name)
+        matrices, errors = {}, {}
+        for result in common.io.fetch_sheets(io.GSheetBinWM,
+                                             workbook_names,
+                                             threads=threads):
+            if result.error is not None:
+                errors[result.workbook_name] = result.error
+                continue
+            try:
+                matrices[result.workbook_name] = cls._from_sheet(
+                    result.sheet
+                )
+            except Exception as err:
+                errors[result.workbook_name] = '{}: {}'.format(
+                    type(err).__name__, err
+                )
+        return matrices, errors
+
+    @classmethod
+    def _from_sheet(cls, sheet):
         inst = cls(*sheet.get_requirements())
         inst._sheet = sheet
         inst._matrix = sheet.get_value_matrix()
@@ -57,25 +161,108 @@ class BinWM(object):
     @property
     def matrix(self):
         """Copy of the weighting matrix."""
-        return np.copy(self._matrix)
+        return self._decisions.to_dense()
 
     @property
+    @common.instrument.timed('BinWM.score')
     def score(self):
-        """Calculate the relative score."""
+        """Relative score.
+
+        Computed once from the decisions and then kept up to date as
+        decisions are made (e.g. by prompt). Each access returns a
+        new array.
+        """
         # TODO: Use a series for this. Major version bump though.
         #       1.x will probably be pandas everywhere.
-        sum_x = self.matrix.sum(axis=1)
-        sum_y = np.triu(1 - self.matrix, k=1).sum(axis=0).T
+        if self._score is None:
+            decisions = self._decisions
+            # Decisions for (row) and against (column) each requirement
+            sum_x = decisions.row_sums()
+            sum_y = np.arange(decisions.n) - decisions.column_sums()
+
+            sum_combined = sum_x + sum_y
+            self._tally = sum_biased = sum_combined + 1
+            self._score = sum_biased / self._score_total
+
+        return self._score.copy()
+
+    @property
+    def _score_total(self):
+        # Sum of the biased tallies; every decision adds one to a
+        # requirement's tally, so this is constant.
+        n = self._decisions.n
+        return n * (n + 1) // 2
 
-        sum_combined = sum_x + sum_y
-        sum_biased = sum_combined + 1
+    @property
+    def cyclic_triads(self):
+        """Number of intransitive triads (A > B > C > A).
 
-        return sum_biased / sum_biased.sum()
+        Counted from each requirement's number of wins, s, as
+        C(N, 3) - sum(C(s, 2)), rather than by enumerating triads.
+        """
+        n = len(self.requirements)
+        wins = self._wins
+        return n * (n - 1) * (n - 2) // 6 - (wins * (wins - 1) // 2).sum()
+
+    @property
+    def consistency(self):
+        """Kendall's coefficient of consistence.
+
+        1 for fully transitive decisions, 0 for the maximum possible
+        number of cyclic triads.
+        """
+        n = len(self.requirements)
+        if n < 3:
+            return 1.0
+        max_triads = (n**3 - n) / 24 if n % 2 else (n**3 - 4 * n) / 24
+        return 1 - self.cyclic_triads / max_triads
+
+    def inconsistent_decisions(self):
+        """Decisions to revisit to make the matrix transitive.
+
+        A heuristic (not necessarily minimum) feedback arc set: the
+        requirements are ordered by wins, refined by swapping
+        adjacent requirements while that removes a reversed
+        decision. Decisions contradicting the order are returned.
+
+        Returns
+        -------
+
+        list of (str, str)
+            Pairs of requirements in matrix (row, column) order.
+        """
+        n = len(self.requirements)
+        upper = self.matrix.astype(bool)
+        beats = upper | np.triu(~upper, k=1).T
+
+        order = list(np.lexsort((np.arange(n), -self._wins)))
+        swapped = True
+        while swapped:
+            swapped = False
+            for k in range(n - 1):
+                a, b = order[k], order[k+1]
+                if beats[b, a]:
+                    order[k], order[k+1] = b, a
+                    swapped = True
+
+        rank = np.empty(n, dtype=int)
+        rank[order] = np.arange(n)
+        winners, losers = np.nonzero(beats & (rank[:,None] > rank))
+        reqs = self.requirements
+        return sorted((reqs[i], reqs[j]) for i, j in
+                      zip(np.minimum(winners, losers),
+                          np.maximum(winners, losers)))
+
+    @property
+    def _wins(self):
+        # Decisions won by each requirement (the unbiased tally).
+        self.score
+        return self._tally - 1
 
     @staticmethod
-    def _get_sheet(workbook_name):
+    def _get_sheet(workbook_name, value_range=None):
         # Helper method for constructing a sheet
-        return io.GSheetBinWM(workbook_name)
+        return io.GSheetBinWM(workbook_name, value_range)
 
     @staticmethod
     def _input(prompt_string):
@@ -95,20 +282,7 @@ class BinWM(object):
         df.style.set_properties(**properties).set_table_styles(styles)
         return df
 
-    def get_score_as_series(self):
-        # Glue method until API changes; see score TODO
-        try:
-            score_column_name = self._sheet.score_column_name
-        except AttributeError:
-            if hasattr(self, '_sheet'):
-                raise
-            score_column_name = self._fallback_score_column_name
-
-        return pd.Series(self.score,
-                         index=self.requirements,
-                         name=score_column_name)
-
-    def prompt(self, shuffle=True):
+    def prompt(self, shuffle=True, adaptive=False, checkpoint=None):
         """Step through an interactive prompt to calculate weighting.
 
         Parameters
@@ -117,13 +291,37 @@ class BinWM(object):
         shuffle: bool
             Shuffle the comparisons so each decision is presented in
             random order.
+
+        adaptive: bool
+            Rank the requirements by binary insertion, asking around
+            N log2(N) questions rather than all N(N-1)/2. The other
+            decisions follow from the ranking by transitivity, so
+            this assumes consistent (transitive) preferences.
+
+        checkpoint: str, optional
+            Path of a JSON file recording answers as they're given.
+            If it exists, the session resumes from it; questions
+            already answered aren't asked again.
         """
         reqs = self.requirements
-        combinations = itertools.combinations(reqs, 2)
-        coordinates = itertools.combinations(range(len(reqs)), 2)
+        session = _PromptSession(self, checkpoint)
 
         self._print("Please agree (y) or disagree (n) with the "
                     "following statements:\n")
+
+        if adaptive:
+            order = session.order
+            if order is None:
+                order = list(range(len(reqs)))
+                if shuffle:
+                    random.shuffle(order)
+                session.order = order
+            self._rank(order, session.ask)
+            return
+
+        combinations = itertools.combinations(reqs, 2)
+        coordinates = itertools.combinations(range(len(reqs)), 2)
+
         iterable = zip(coordinates, combinations)
         decisions = []
         for x, grp in itertools.groupby(iterable, lambda o: o[1][0]):
@@ -134,21 +332,45 @@ class BinWM(object):
             random.shuffle(decisions)
 
         for i, j, this, other in decisions:
+            self._set_decision(i, j, session.ask(i, j))
 
-                # Keep asking until response is valid
-                while True:
-                    response = self._input(
-                        "'{}' is more important than '{}': "
-                        .format(this, other)
-                    )
-                    if response in 'yn':
-                        break
-                    else:
-                        self._print(
-                            "Sorry I didn't understand...\n\n"
-                        )
-
-                self._matrix[i, j] = 1 if response == 'y' else 0
+    def _ask(self, this, other):
+        # Keep asking until response is valid
+        while True:
+            response = self._input(
+                "'{}' is more important than '{}': "
+                .format(this, other)
+            )
+            if response in 'yn':
+                return response == 'y'
+            else:
+                self._print(
+                    "Sorry I didn't understand...\n\n"
+                )
+
+    def _rank(self, order, ask):
+        # Binary insertion of requirements (indices, in order) into a
+        # ranking, most important first; ask(i, j) for i < j answers
+        # whether i is more important than j.
+        ranking = []
+        for k in order:
+            lo, hi = 0, len(ranking)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                other = ranking[mid]
+                if k < other:
+                    more_important = ask(k, other)
+                else:
+                    more_important = not ask(other, k)
+                if more_important:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            ranking.insert(lo, k)
+
+        rank = np.empty(len(ranking), dtype=int)
+        rank[ranking] = np.arange(len(ranking))
+        self._matrix = rank[:,None] < rank
 
     def save(self):
         """If created from a google sheet, update it.
@@ -186,3 +408,673 @@ class BinWM(object):
         df.index.name = self.label
         df = df.assign(**{'Score': self.get_score_as_series()})
         return df
+
+
+class BinWMSet(object):
+    """Binary weighting matrices from a set of stakeholders.
+
+    The matrices are aligned by requirement name and stacked into an
+    (S, N, N) tensor for S stakeholders and N requirements, so scores,
+    consensus and disagreement are computed for every stakeholder (or
+    pair of requirements) at once.
+    """
+
+    def __init__(self, matrices, labels=None):
+        """
+        Parameters
+        ----------
+
+        matrices : list of BinWM or dict
+            Matrices, or matrices keyed by stakeholder. Each must
+            list the same requirements, in any order.
+
+        labels : list, optional
+            Stakeholder labels (default: dict keys or indices).
+        """
+        if isinstance(matrices, dict):
+            labels = list(matrices) if labels is None else labels
+            matrices = [matrices[label] for label in labels]
+        matrices = list(matrices)
+        if not matrices:
+            raise ValueError("At least one matrix is required.")
+        self.labels = (list(range(len(matrices))) if labels is None
+                       else list(labels))
+        self.requirements = tuple(matrices[0].requirements)
+
+        tensor = np.zeros((len(matrices), len(self.requirements),
+                           len(self.requirements)), dtype=np.int8)
+        for k, bwm in enumerate(matrices):
+            tensor[k] = self._align(bwm)
+        tensor.flags.writeable = False
+        self.tensor = tensor
+
+    def _align(self, bwm):
+        # Upper triangular decisions reordered to self.requirements.
+        names = list(bwm.requirements)
+        if sorted(names) != sorted(self.requirements):
+            raise ValueError(
+                "Requirements differ from {}: {}"
+                .format(self.requirements, names)
+            )
+        upper = bwm.matrix
+        # Full preference matrix: [a, b] is 1 where a beats b.
+        preferences = upper + np.triu(1 - upper, k=1).T
+        order = [names.index(name) for name in self.requirements]
+        return np.triu(preferences[np.ix_(order, order)], k=1)
+
+    @property
+    def scores(self):
+        """Relative scores, (S, N) for S stakeholders."""
+        n = len(self.requirements)
+        sum_x = self.tensor.sum(axis=2)
+        sum_y = np.arange(n) - self.tensor.sum(axis=1)
+        return (sum_x + sum_y + 1) / (n * (n + 1) / 2)
+
+    @property
+    def mean_matrix(self):
+        """Fraction of stakeholders agreeing with each decision."""
+        return self.tensor.mean(axis=0)
+
+    @property
+    def disagreement(self):
+        """Fraction of stakeholders in the minority on each decision.
+
+        Upper triangular; 0 is unanimous, 0.5 an even split.
+        """
+        mean = self.mean_matrix
+        return np.triu(np.minimum(mean, 1 - mean), k=1)
+
+    def consensus(self):
+        """Majority decisions as a BinWM.
+
+        Evenly split decisions go against the first requirement of
+        the pair (i.e. 0).
+        """
+        majority = (self.mean_matrix > 0.5).astype(np.int8)
+        return BinWM(*self.requirements, matrix=majority)
+
+
+class AHP(_ScoreSeries):
+    """Analytic Hierarchy Process weighting (Saaty)
+
+    Each requirement is compared with every other on a ratio scale
+    (conventionally 1 to 9, 1 being equally important, or the
+    reciprocal where the other is more important). The weights are
+    the principal eigenvector of the comparison matrix, found by
+    power iteration.
+
+    Unlike BinWM, the judgements needn't be consistent; the
+    consistency ratio measures how far they are from a set that
+    multiplies through (a > b by 2 and b > c by 3 implies a > c by
+    6). Above 0.1 they're usually worth revisiting.
+
+    Comparisons may be left out (NaN); missing ratios are handled by
+    Harker's method.
+    """
+
+    # Saaty's random consistency index, by number of requirements.
+    _RANDOM_INDEX = (0, 0, 0, 0.58, 0.90, 1.12, 1.24, 1.32, 1.41, 1.45,
+                     1.49, 1.51, 1.48, 1.56, 1.57, 1.59)
+
+    def __init__(self, *args, **kwargs):
+        """
+        Parameters
+        ----------
+
+        *args : str
+            Requirements provided as N positional args.
+
+        matrix : np.array, optional
+            NxN matrix of ratios; [i, j] is how many times more
+            important requirement i is than requirement j. Only the
+            upper triangle (above the diagonal) is significant, the
+            rest follows by reciprocity. NaN where not compared.
+            Default: all equally important.
+        """
+        self.requirements = args
+        n = len(args)
+        self.matrix = kwargs.get('matrix', np.ones([n, n]))
+
+    @property
+    def matrix(self):
+        """Copy of the (reciprocal) comparison matrix."""
+        return self._ratios.copy()
+
+    @matrix.setter
+    def matrix(self, matrix):
+        n = len(self.requirements)
+        matrix = np.array(matrix, dtype=float)
+        if matrix.shape != (n, n):
+            raise ValueError("Expected a {0}x{0} matrix.".format(n))
+        if (matrix[np.triu_indices(n, k=1)] <= 0).any():
+            raise ValueError("Ratios must be positive.")
+        with np.errstate(divide='ignore'):
+            reciprocal = np.triu(1 / matrix, k=1)
+        ratios = np.triu(matrix, k=1) + reciprocal.T
+        np.fill_diagonal(ratios, 1)
+        self._ratios = ratios
+        self._solution = None
+
+    def set_ratio(self, this, other, ratio):
+        """Set how many times more important this is than other."""
+        i = self.requirements.index(this)
+        j = self.requirements.index(other)
+        if i == j:
+            raise ValueError("Can't compare {!r} with itself."
+                             .format(this))
+        if not ratio > 0:
+            raise ValueError("Ratios must be positive.")
+        self._ratios[i, j] = ratio
+        self._ratios[j, i] = 1 / ratio
+        self._solution = None
+
+    @property
+    def score(self):
+        """Relative score (principal eigenvector, sums to 1)."""
+        return self._solve()[0].copy()
+
+    @property
+    def eigenvalue(self):
+        """Principal eigenvalue of the comparison matrix."""
+        return self._solve()[1]
+
+    @property
+    def consistency_ratio(self):
+        """Consistency index relative to random judgements.
+
+        0 for consistent judgements.
+        """
+        return self._consistency_ratio(self.eigenvalue,
+                                       len(self.requirements))
+
+    def _solve(self):
+        if self._solution is None:
+            self._solution = self._power_iteration(self._ratios)
+        return self._solution
+
+    @classmethod
+    def solve(cls, matrices, tol=1e-12, max_iter=1000):
+        """Weights for a stack of comparison matrices.
+
+        e.g. one matrix per stakeholder, solved together.
+
+        Parameters
+        ----------
+
+        matrices : np.array
+            (..., N, N) reciprocal comparison matrices; NaN where
+            not compared.
+
+        Returns
+        -------
+
+        weights : np.array
+            (..., N) principal eigenvectors, each summing to 1.
+
+        consistency_ratios : np.array
+            (...) consistency ratios.
+        """
+        matrices = np.asarray(matrices, dtype=float)
+        weights, eigenvalues = cls._power_iteration(matrices, tol,
+                                                    max_iter)
+        return weights, cls._consistency_ratio(eigenvalues,
+                                               matrices.shape[-1])
+
+    @staticmethod
+    def _power_iteration(matrices, tol=1e-12, max_iter=1000):
+        # Harker's method for missing ratios: zero them, adding one
+        # to the diagonal for each missing from the row.
+        missing = np.isnan(matrices)
+        if missing.any():
+            matrices = np.where(missing, 0, matrices)
+            n = matrices.shape[-1]
+            diagonal = np.arange(n)
+            matrices[..., diagonal, diagonal] += missing.sum(axis=-1)
+
+        # Each iteration is one matrix-vector product, O(N^2), rather
+        # than a full O(N^3) eigendecomposition.
+        weights = np.full(matrices.shape[:-1], 1 / matrices.shape[-1])
+        for _ in range(max_iter):
+            product = np.matmul(matrices, weights[..., None])[..., 0]
+            # Weights sum to 1, so the sum is the eigenvalue estimate.
+            eigenvalues = product.sum(axis=-1)
+            new_weights = product / eigenvalues[..., None]
+            converged = np.abs(new_weights - weights).max() < tol
+            weights = new_weights
+            if converged:
+                break
+        else:
+            warnings.warn("Power iteration didn't converge in {} "
+                          "iterations.".format(max_iter))
+        return weights, eigenvalues
+
+    @classmethod
+    def _consistency_ratio(cls, eigenvalue, n):
+        if n < 3:
+            return np.zeros_like(eigenvalue)
+        index = cls._RANDOM_INDEX[min(n, len(cls._RANDOM_INDEX) - 1)]
+        return (eigenvalue - n) / (n - 1) / index
+
+
+class HierarchicalWM(_ScoreSeries):
+    """Hierarchical (grouped) weighting of requirements.
+
+    Requirements are grouped into categories and compared only within
+    their group, and the groups compared with one another; a
+    requirement's weight is its group's weight times its weight
+    within the group. This cuts the number of comparisons: 200
+    requirements in 10 groups of 20 need 10 * 190 + 45 = 1945
+    rather than 19900.
+
+    Groups are any weighting model (BinWM, AHP, BradleyTerry or
+    another HierarchicalWM, for deeper trees). Each caches its own
+    score, so editing one group re-weights only that subtree; the
+    global weights are recomposed from the cached group scores when
+    read.
+    """
+
+    def __init__(self, groups, weighting=None):
+        """
+        Parameters
+        ----------
+
+        groups : dict or list of (str, model) tuples
+            Weighting model for each group, keyed by group name.
+            Requirement names must be unique across groups.
+
+        weighting : model, optional
+            Weighting model of the groups (requirements named after
+            the groups). Default: a BinWM to be filled in.
+        """
+        groups = collections.OrderedDict(
+            groups.items() if hasattr(groups, 'items') else groups
+        )
+        if weighting is None:
+            weighting = BinWM(*groups)
+        if sorted(weighting.requirements) != sorted(groups):
+            raise ValueError(
+                "Group weighting requirements {} differ from groups {}."
+                .format(list(weighting.requirements), list(groups))
+            )
+        self.groups = groups
+        self.weighting = weighting
+        requirements = self.requirements
+        if len(set(requirements)) != len(requirements):
+            raise ValueError("Requirement names must be unique across "
+                             "groups.")
+
+    @classmethod
+    def from_groups(cls, groups, model=BinWM):
+        """Construct with new, empty models of each group.
+
+        e.g. `HierarchicalWM.from_groups({'Cost': ['Price',
+        'Running Cost'], 'Comfort': ['Ride', 'Noise', 'Space']})`
+
+        Parameters
+        ----------
+
+        groups : dict or list of (str, list) tuples
+            Requirement names in each group, keyed by group name.
+
+        model : class, optional
+            Weighting model for the groups and within each group.
+        """
+        groups = collections.OrderedDict(
+            groups.items() if hasattr(groups, 'items') else groups
+        )
+        return cls([(name, model(*requirements))
+                    for name, requirements in groups.items()],
+                   weighting=model(*groups))
+
+    @property
+    def requirements(self):
+        """Requirements of every group, in order of `groups`.
+
+        Read from the groups, so it follows groups which add
+        requirements (e.g. BradleyTerry, on votes for new names).
+        """
+        return tuple(itertools.chain.from_iterable(
+            model.requirements for model in self.groups.values()
+        ))
+
+    @property
+    def comparisons(self):
+        """Number of pairwise comparisons to weight every group."""
+        return sum(self._comparisons(model) for model in
+                   itertools.chain([self.weighting], self.groups.values()))
+
+    @staticmethod
+    def _comparisons(model):
+        try:
+            return model.comparisons
+        except AttributeError:
+            n = len(model.requirements)
+            return n * (n - 1) // 2
+
+    @property
+    def group_score(self):
+        """Score of each group, in order of `groups`."""
+        score = dict(zip(self.weighting.requirements,
+                         self.weighting.score))
+        return np.array([score[name] for name in self.groups])
+
+    @property
+    def score(self):
+        """Relative score (global weights, sums to 1)."""
+        return np.concatenate([
+            group_score * np.asarray(model.score)
+            for group_score, model in zip(self.group_score,
+                                          self.groups.values())
+        ])
+
+    def prompt(self, checkpoint=None, **kwargs):
+        """Prompt for comparisons within each group, then of groups.
+
+        Groups and their weighting must be models which prompt
+        (BinWM or HierarchicalWM); keyword arguments are passed on.
+
+        checkpoint: str, optional
+            Path of the checkpoint of the group weighting. Each
+            group is checkpointed alongside it, to the path suffixed
+            with the group name (e.g. answers.Cost.json).
+        """
+        paths = dict.fromkeys(self.groups)
+        if checkpoint is not None:
+            root, ext = os.path.splitext(checkpoint)
+            for name in self.groups:
+                paths[name] = '{}.{}{}'.format(
+                    root, re.sub(r'[^\w-]+', '_', name), ext
+                )
+            if len(set(paths.values())) < len(paths):
+                raise ValueError("Group names {} give clashing "
+                                 "checkpoint paths."
+                                 .format(list(self.groups)))
+
+        for name, model in self.groups.items():
+            self._print("\n{}\n{}\n".format(name, '-' * len(name)))
+            model.prompt(checkpoint=paths[name], **kwargs)
+        self._print("\nGroups\n------\n")
+        self.weighting.prompt(checkpoint=checkpoint, **kwargs)
+
+    @staticmethod
+    def _print(string):
+        # Wrapper for testing
+        print(string)
+
+
+class BradleyTerry(_ScoreSeries):
+    """Requirement weighting from pairwise votes (Bradley-Terry).
+
+    Suited to many noisy, partial or repeated judgements (e.g.
+    crowd-sourced) rather than one complete matrix. Votes are
+    accumulated as sparse win counts; each requirement's strength,
+    p, models the probability of it beating another as
+    p_i / (p_i + p_j).
+
+    Strengths are fitted with the MM algorithm (Hunter, 2004) when
+    the score is next read, starting from the previous fit so new
+    votes only need a few iterations.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Parameters
+        ----------
+
+        *args : str
+            Requirements; others are added as they appear in votes.
+
+        prior : real, optional
+            Pseudo-votes won and lost by each requirement against a
+            reference of unit strength (default 0.5). Keeps the fit
+            finite for requirements which never win or never lose.
+
+        tol : real, optional
+            Convergence tolerance on the change in score.
+        """
+        self.requirements = []
+        self._index = {}
+        self._wins = collections.defaultdict(int)
+        self._strength = np.zeros(0)
+        self._score = None
+        self.prior = kwargs.get('prior', 0.5)
+        self.tol = kwargs.get('tol', 1e-9)
+        self.iterations = 0
+        for name in args:
+            self._add_requirement(name)
+
+    def _add_requirement(self, name):
+        try:
+            return self._index[name]
+        except KeyError:
+            i = self._index[name] = len(self.requirements)
+            self.requirements.append(name)
+            self._strength = np.append(self._strength, 1.0)
+            return i
+
+    def add_vote(self, winner, loser, count=1):
+        """Record a vote for winner over loser."""
+        if winner == loser:
+            raise ValueError("Can't compare {!r} with itself."
+                             .format(winner))
+        i = self._add_requirement(winner)
+        j = self._add_requirement(loser)
+        self._wins[i, j] += count
+        self._score = None
+
+    def add_votes(self, votes):
+        """Record (winner, loser) votes from an iterable."""
+        for winner, loser in votes:
+            self.add_vote(winner, loser)
+
+    @property
+    def score(self):
+        """Relative score (strengths normalised to sum to 1)."""
+        if self._score is None:
+            strength = self.fit()
+            self._score = strength / strength.sum()
+        return self._score.copy()
+
+    def fit(self, max_iter=10000):
+        """Fit the strengths to the votes so far.
+
+        Returns
+        -------
+
+        np.array
+            Strengths relative to the prior's reference strength.
+        """
+        n = len(self.requirements)
+        if not self._wins:
+            # Nothing to fit; all requirements (if any) equally strong.
+            self.iterations = 0
+            self._strength = np.ones(n)
+            return self._strength
+
+        keys = list(self._wins)
+        winners = np.array([i for i, _ in keys], dtype=int)
+        losers = np.array([j for _, j in keys], dtype=int)
+        counts = np.array([self._wins[k] for k in keys], dtype=float)
+        wins = np.bincount(winners, counts, minlength=n) + self.prior
+
+        p = self._strength
+        for iteration in range(1, max_iter + 1):
+            # MM update: p_i = W_i / sum_j n_ij / (p_i + p_j), with
+            # the prior's comparisons against a unit reference.
+            pair_rates = counts / (p[winners] + p[losers])
+            denominator = (np.bincount(winners, pair_rates, minlength=n)
+                           + np.bincount(losers, pair_rates, minlength=n)
+                           + 2 * self.prior / (p + 1))
+            new_p = wins / denominator
+            # The prior pins the overall scale only weakly; judge
+            # convergence on relative strength.
+            change = np.abs(new_p / new_p.sum() - p / p.sum()).max()
+            p = new_p
+            if change < self.tol:
+                break
+
+        self.iterations = iteration
+        self._strength = p
+        return p
+
+
+class _PromptSession(object):
+    # Answers given during BinWM.prompt, optionally checkpointed to a
+    # JSON file so an interrupted session can resume. Answers are
+    # recorded by requirement name.
+
+    def __init__(self, bwm, checkpoint=None):
+        self._bwm = bwm
+        self._path = checkpoint
+        self._answers = {}
+        self._order = None
+
+        if checkpoint is not None and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                data = json.load(f)
+            self._answers = {(this, other): answer
+                             for this, other, answer in data['answers']}
+            self._order = data.get('order')
+
+    @property
+    def order(self):
+        """Insertion order (indices) for adaptive prompts, if saved."""
+        reqs = list(self._bwm.requirements)
+        if self._order is None or sorted(self._order) != sorted(reqs):
+            return None
+        return [reqs.index(name) for name in self._order]
+
+    @order.setter
+    def order(self, order):
+        reqs = self._bwm.requirements
+        self._order = [reqs[k] for k in order]
+        self._save()
+
+    def ask(self, i, j):
+        """Whether requirement i is more important than j (i < j)."""
+        reqs = self._bwm.requirements
+        key = (reqs[i], reqs[j])
+        try:
+            return self._answers[key]
+        except KeyError:
+            answer = self._answers[key] = self._bwm._ask(*key)
+            self._save()
+            return answer
+
+    def _save(self):
+        if self._path is None:
+            return
+        data = {
+            'requirements': list(self._bwm.requirements),
+            'order': self._order,
+            'answers': [[this, other, answer] for (this, other), answer
+                        in sorted(self._answers.items())]
+        }
+        with open(self._path, 'w') as f:
+            json.dump(data, f, indent=1)
+
+
+class PackedTriangle(object):
+    """Bit-packed strict upper triangle of a square binary matrix.
+
+    Stores the N(N-1)/2 decisions above the diagonal, row by row, as
+    bits (8 per byte) rather than a dense NxN array.
+    """
+
+    # Bits unpacked at a time (bounds memory use).
+    _CHUNK_BITS = 2**22
+
+    def __init__(self, n, bits=None):
+        """
+            n: int
+                Dimension of the square matrix.
+
+            bits: np.array of uint8, optional
+                Packed bits (see np.packbits); all zero by default.
+        """
+        self.n = n
+        size = n * (n - 1) // 2
+        if bits is None:
+            bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+        self.bits = bits
+
+    @classmethod
+    def from_dense(cls, matrix):
+        """Pack the upper triangle of a dense NxN matrix."""
+        matrix = np.asarray(matrix)
+        inst = cls(len(matrix))
+        upper = np.empty(inst.size, dtype=bool)
+        for i in range(inst.n):
+            start = inst._offset(i)
+            upper[start:start + inst.n - 1 - i] = matrix[i, i+1:] != 0
+        inst.bits = np.packbits(upper)
+        return inst
+
+    @property
+    def size(self):
+        """Number of decisions."""
+        return self.n * (self.n - 1) // 2
+
+    def to_dense(self):
+        """Unpack into a dense NxN (int8) matrix."""
+        matrix = np.zeros((self.n, self.n), dtype=np.int8)
+        for i, row in self._rows():
+            matrix[i, i+1:] = row
+        return matrix
+
+    def row_sums(self):
+        """Number of set bits in each row."""
+        sums = np.zeros(self.n, dtype=np.int64)
+        for i, row in self._rows():
+            sums[i] = np.count_nonzero(row)
+        return sums
+
+    def column_sums(self):
+        """Number of set bits in each column."""
+        sums = np.zeros(self.n, dtype=np.int64)
+        for i, row in self._rows():
+            sums[i+1:] += row
+        return sums
+
+    def __getitem__(self, index):
+        byte, mask = self._locate(*index)
+        return int(bool(self.bits[byte] & mask))
+
+    def __setitem__(self, index, value):
+        byte, mask = self._locate(*index)
+        if value:
+            self.bits[byte] |= mask
+        else:
+            self.bits[byte] &= ~mask
+
+    def _offset(self, i):
+        # Position of row i's first bit.
+        return i * self.n - i * (i + 1) // 2
+
+    def _locate(self, i, j):
+        if not 0 <= i < j < self.n:
+            raise IndexError(
+                "({}, {}) not above the diagonal of a {}x{} matrix"
+                .format(i, j, self.n, self.n)
+            )
+        position = self._offset(i) + j - i - 1
+        # np.packbits is big-endian; the first bit is the MSB.
+        return position // 8, np.uint8(0x80 >> (position % 8))
+
+    def _unpack(self, start, stop):
+        # Bits in [start, stop) as uint8 0/1 values.
+        first, last = start // 8, (stop + 7) // 8
+        bits = np.unpackbits(self.bits[first:last])
+        return bits[start - first * 8:stop - first * 8]
+
+    def _rows(self):
+        # (i, bits of row i) for each row, columns i+1 to n-1; rows
+        # are unpacked a chunk at a time, never the whole triangle.
+        rows_per_chunk = max(1, self._CHUNK_BITS // max(self.n, 1))
+        for first in range(0, self.n, rows_per_chunk):
+            last = min(first + rows_per_chunk, self.n)
+            base = self._offset(first)
+            bits = self._unpack(base, self._offset(last))
+            for i in range(first, last):
+                start = self._offset(i) - base
+                yield i, bits[start:start + self.n - 1 - i]
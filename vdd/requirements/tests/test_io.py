@@ -116,8 +116,29 @@ class TestGSheetBinWM(unittest.TestCase):
         ])
 
         sut = self.get_subject_under_test(fixture)
-        np.testing.assert_array_almost_equal(sut.get_value_matrix(),
-                                             expected)
+        actual = sut.get_value_matrix()
+        np.testing.assert_array_almost_equal(actual, expected)
+        self.assertEqual(actual.dtype, np.int8)
+
+    def test_get_value_matrix__large(self):
+        n = 200
+        labels = ['R{}'.format(i) for i in range(n)]
+        expected = np.triu(np.random.randint(0, 2, (n, n)), k=1)
+        cells = np.where(np.tril(np.ones((n, n), bool)), '',
+                         expected.astype(str))
+        sut = io.GSheetBinWM('dummy_workbook_name')
+        sut._facade = mock.Mock(spec_set=common.io.GSheetsFacade)
+        sut._facade.get_rows.return_value = (
+            [['Requirements'] + labels]
+            + [[label] + list(row) for label, row in zip(labels, cells)]
+        )
+
+        np.testing.assert_array_equal(sut.get_value_matrix(), expected)
+
+        sut._facade.get_rows.return_value[151][11] = 'x'
+        sut.refresh()
+        self.assertRaises(io.GSheetBinWM.InvalidSource,
+                          sut.get_value_matrix)
 
     @data(
         'minimal_example_incomplete_triu.json',
@@ -143,6 +164,61 @@ class TestGSheetBinWM(unittest.TestCase):
             dummy_df, position='A1'
         )
 
+    def test_update__value_range(self):
+        """Written at the upper left cell of the value range."""
+        sut = io.GSheetBinWM('dummy_workbook_name', 'B2:E5')
+        sut._facade = self.get_mock_facade('case__minimal_example.json')
+
+        dummy_df = mock.MagicMock(spec_set=pd.DataFrame)
+        sut.update(dummy_df)
+        sut._facade.write_dataframe.assert_called_once_with(
+            dummy_df, position='B2'
+        )
+
+    @mock.patch.object(common.io.GSheetsFacade, '_sheet',
+                       new_callable=mock.PropertyMock)
+    @mock.patch.object(common.io.GSheetsFacade, 'get_revision',
+                       mock.Mock(return_value='1'))
+    @mock.patch.object(common.io.GSheetsFacade, '_mirror_dir', None)
+    def test_update__unchanged(self, mock_sheet_property):
+        """Nothing is written where the sheet (as read) is unchanged.
+
+        In particular, blank cells below the diagonal aren't
+        rewritten as 0.
+        """
+        mock_sheet_property.return_value = mock_sheet = mock.MagicMock(
+            spec=common.io.WorksheetAdapter
+        )
+        mock_sheet.set_dataframe = mock.Mock()
+        mock_sheet.get_all_values.return_value = [
+            ['Reqs', 'A', 'B', 'C', 'Score'],
+            ['A', '', '1', '0', '0.5'],
+            ['B', '', '', '1', '0.25'],
+            ['C', '', '', '', '0.25'],
+        ]
+        sut = io.GSheetBinWM('dummy_workbook_name', 'B2:F5')
+
+        df = sut.df.assign(Score=[0.5, 0.25, 0.25])
+        sut.update(df)
+
+        self.assertFalse(mock_sheet.set_dataframe.called)
+        self.assertFalse(mock_sheet.update_ranges.called)
+
+        df.loc['A', 'C'] = 1
+        sut.update(df)
+        mock_sheet.update_ranges.assert_called_once_with([
+            ('E3:E3', [['1']])
+        ])
+
+    def test_get_rows__value_range(self):
+        """Rows are read from the sheet's range (if specified)."""
+        sut = io.GSheetBinWM('dummy_workbook_name', 'B2:E5')
+        sut._facade = self.get_mock_facade('case__minimal_example.json')
+
+        sut.get_rows()
+
+        sut._facade.get_rows.assert_called_once_with('B2:E5')
+
     def test__score_column_is_ignored(self):
         """Score columns in the source spreadsheet are dropped.
 
@@ -1,9 +1,17 @@
+import itertools
 import json
 import os
+import re
+import shutil
+import tempfile
 import unittest
 
 import mock
 import numpy as np
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
 import pandas as pd
 from ddt import ddt, unpack, data
 
@@ -56,6 +64,37 @@ class TestBinWM(TestCase):
             atol=0.1
         )
 
+    def test_score__incremental(self):
+        """Score is updated as decisions change, without recomputing."""
+        bwm = self.setup_binary_weighting_matrix('Simple Aircraft')
+        bwm.score
+        matrix = bwm.matrix
+        for i, j in [(0, 1), (0, 8), (3, 7), (0, 1)]:
+            matrix[i, j] = 1 - matrix[i, j]
+        reference = models.BinWM(*bwm.requirements, matrix=matrix)
+
+        with mock.patch.object(models.PackedTriangle,
+                               'row_sums') as mock_row_sums:
+            for i, j in [(0, 1), (0, 8), (3, 7), (0, 1)]:
+                bwm._set_decision(i, j, 1 - bwm.matrix[i, j])
+            actual = bwm.score
+
+        self.assertFalse(mock_row_sums.called)
+        np.testing.assert_allclose(actual, reference.score)
+
+    def test_score__unchanged_by_decisions(self):
+        """Scores read earlier aren't changed by later decisions."""
+        bwm = self.setup_binary_weighting_matrix('Simple Aircraft')
+        score = bwm.score
+        series = bwm.get_score_as_series()
+        expected = score.copy()
+
+        bwm._set_decision(0, 1, 1 - bwm.matrix[0, 1])
+
+        np.testing.assert_array_equal(score, expected)
+        np.testing.assert_array_equal(series.values, expected)
+        self.assertFalse(np.array_equal(bwm.score, expected))
+
     @data(
         [('n', 'n', 'n'), (0.17, 0.33, 0.5)],
         [('y', 'n', 'n'), (0.33, 0.17, 0.5)],
@@ -98,6 +137,101 @@ class TestBinWM(TestCase):
             (1, 2, 'Requirement 2', 'Requirement 3')
         ])
 
+    def test_cyclic_triads(self):
+        # A > B, B > C, C > A; D beats all.
+        bwm = models.BinWM('A', 'B', 'C', 'D',
+                           matrix=np.array([[0, 1, 0, 0],
+                                            [0, 0, 1, 0],
+                                            [0, 0, 0, 0],
+                                            [0, 0, 0, 0]]))
+
+        self.assertEqual(bwm.cyclic_triads, 1)
+        self.assertAlmostEqual(bwm.consistency, 1 - 1 / 2)
+        self.assertEqual(len(bwm.inconsistent_decisions()), 1)
+
+    def test_cyclic_triads__random(self):
+        """Triad count matches enumeration; revisions remove cycles."""
+        n = 12
+        names = ['R{}'.format(i) for i in range(n)]
+        matrix = np.triu(np.random.randint(0, 2, (n, n)), k=1)
+        bwm = models.BinWM(*names, matrix=matrix)
+        beats = matrix + np.triu(1 - matrix, k=1).T
+
+        expected = sum(
+            1 for a, b, c in itertools.combinations(range(n), 3)
+            if beats[a, b] == beats[b, c] == beats[c, a]
+        )
+        self.assertEqual(bwm.cyclic_triads, expected)
+
+        for this, other in bwm.inconsistent_decisions():
+            i, j = names.index(this), names.index(other)
+            matrix[i, j] = 1 - matrix[i, j]
+        revised = models.BinWM(*names, matrix=matrix)
+        self.assertEqual(revised.cyclic_triads, 0)
+        self.assertEqual(revised.consistency, 1)
+        self.assertEqual(revised.inconsistent_decisions(), [])
+
+    def oracle(self, importance):
+        # Answers prompts consistently with an importance per
+        # requirement (named 'R<index>'); records the questions.
+        questions = []
+
+        def answer(prompt_string):
+            this, other = re.findall(r"'R(\d+)'", prompt_string)
+            questions.append((int(this), int(other)))
+            return 'y' if importance[int(this)] > importance[int(other)] \
+                else 'n'
+
+        return answer, questions
+
+    @mock.patch.object(models.BinWM, '_print')
+    @mock.patch.object(models.BinWM, '_input')
+    def test_prompt__adaptive(self, mock_input, mock_print):
+        """Ranking needs ~N log N questions for the same decisions."""
+        n = 40
+        importance = np.random.permutation(n)
+        mock_input.side_effect, questions = self.oracle(importance)
+        bwm = models.BinWM(*['R{}'.format(i) for i in range(n)])
+
+        bwm.prompt(adaptive=True)
+
+        expected = np.triu(importance[:,None] > importance, k=1)
+        np.testing.assert_array_equal(bwm.matrix, expected)
+        self.assertLessEqual(len(questions), n * np.ceil(np.log2(n)))
+        self.assertEqual(len(set(questions)), len(questions))
+        self.assertTrue(all(i < j for i, j in questions))
+
+    @data(False, True)
+    @mock.patch.object(models.BinWM, '_print')
+    @mock.patch.object(models.BinWM, '_input')
+    def test_prompt__checkpoint(self, adaptive, mock_input, mock_print):
+        """Interrupted sessions resume without repeating questions."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        checkpoint = os.path.join(tmpdir, 'session.json')
+        n = 8
+        importance = np.random.permutation(n)
+        answer, questions = self.oracle(importance)
+        names = ['R{}'.format(i) for i in range(n)]
+
+        def interrupted(prompt_string):
+            if len(questions) == 5:
+                raise KeyboardInterrupt
+            return answer(prompt_string)
+
+        mock_input.side_effect = interrupted
+        with self.assertRaises(KeyboardInterrupt):
+            models.BinWM(*names).prompt(adaptive=adaptive,
+                                        checkpoint=checkpoint)
+
+        mock_input.side_effect = answer
+        bwm = models.BinWM(*names)
+        bwm.prompt(adaptive=adaptive, checkpoint=checkpoint)
+
+        self.assertEqual(len(set(questions)), len(questions))
+        expected = np.triu(importance[:,None] > importance, k=1)
+        np.testing.assert_array_equal(bwm.matrix, expected)
+
     def test_to_dataframe(self):
         """Method coerces the matrix to a pandas dataframe.
 
@@ -142,9 +276,441 @@ class TestBinWM(TestCase):
     def test_save(self):
         """Method is only implemented in special cases."""
         bwm = self.setup_binary_weighting_matrix('Minimal Example')
-        bwm._matrix[2, 0] = 1
+        bwm._set_decision(0, 2, 1)
         self.assertRaises(NotImplementedError, bwm.save)
 
+    def test_matrix__private_read_only(self):
+        """Writes to the dense decisions fail rather than being lost."""
+        bwm = self.setup_binary_weighting_matrix('Minimal Example')
+        self.assertRaises(ValueError, bwm._matrix.__setitem__, (0, 2), 1)
+
+        matrix = bwm.matrix
+        matrix[0, 2] = 1 - matrix[0, 2]
+        self.assertNotEqual(bwm.matrix[0, 2], matrix[0, 2])
+
+
+class TestBinWMSet(TestCase):
+
+    def setUp(self):
+        data = self.get_fixture_data('case__simple_aircraft.json')
+        self.requirements = data['requirements']
+        self.matrix = np.array(data['binary_matrix'])
+
+    def random_bwm(self, order=None):
+        n = len(self.requirements)
+        importance = np.random.permutation(n)
+        bwm = models.BinWM(
+            *self.requirements,
+            matrix=np.triu(importance[:,None] > importance, k=1)
+        )
+        if order is None:
+            return bwm, bwm
+        # Same decisions, requirements listed in another order.
+        importance = importance[order]
+        reordered = models.BinWM(
+            *[self.requirements[k] for k in order],
+            matrix=np.triu(importance[:,None] > importance, k=1)
+        )
+        return bwm, reordered
+
+    def test_scores(self):
+        """Scores match individual scores, aligned by name."""
+        pairs = [self.random_bwm()] + [
+            self.random_bwm(np.random.permutation(9)) for _ in range(4)
+        ]
+
+        sut = models.BinWMSet({str(k): reordered
+                               for k, (_, reordered) in enumerate(pairs)})
+
+        self.assertEqual(sut.tensor.shape, (5, 9, 9))
+        self.assertEqual(sut.labels, list('01234'))
+        for (bwm, _), scores in zip(pairs, sut.scores):
+            np.testing.assert_allclose(scores, bwm.score)
+
+    def test_consensus(self):
+        bwms = [models.BinWM(*self.requirements, matrix=matrix)
+                for matrix in [self.matrix, self.matrix,
+                               np.triu(1 - self.matrix, k=1)]]
+
+        sut = models.BinWMSet(bwms)
+
+        np.testing.assert_array_equal(sut.consensus().matrix,
+                                      self.matrix)
+        np.testing.assert_allclose(sut.mean_matrix,
+                                   (2 * self.matrix + np.triu(
+                                       1 - self.matrix, k=1)) / 3)
+        np.testing.assert_allclose(sut.disagreement,
+                                   np.triu(np.full((9, 9), 1 / 3), k=1))
+
+    def test_mismatched_requirements(self):
+        bwm, _ = self.random_bwm()
+        other = models.BinWM(*self.requirements[:-1])
+        self.assertRaises(ValueError, models.BinWMSet, [bwm, other])
+
+
+class TestAHP(unittest.TestCase):
+
+    def setUp(self):
+        self.requirements = ('A', 'B', 'C', 'D')
+        self.weights = np.array([0.5, 0.25, 0.15, 0.1])
+        self.consistent = self.weights[:,None] / self.weights
+        # Saaty's 3x3 example, slightly inconsistent.
+        self.inconsistent = np.array([[1, 3, 5],
+                                      [0, 1, 3],
+                                      [0, 0, 1]])
+
+    def test_score__consistent(self):
+        sut = models.AHP(*self.requirements,
+                         matrix=np.triu(self.consistent))
+        np.testing.assert_allclose(sut.matrix, self.consistent)
+        np.testing.assert_allclose(sut.score, self.weights)
+        self.assertAlmostEqual(sut.eigenvalue, 4)
+        self.assertAlmostEqual(sut.consistency_ratio, 0)
+
+    def test_score__copy(self):
+        """Changing a score read doesn't change the model's."""
+        sut = models.AHP(*self.requirements,
+                         matrix=np.triu(self.consistent))
+        sut.score[0] = 99
+        np.testing.assert_allclose(sut.score, self.weights)
+
+    def test_score__inconsistent(self):
+        """Power iteration matches the principal eigenvector."""
+        sut = models.AHP('A', 'B', 'C', matrix=self.inconsistent)
+
+        eigenvalues, eigenvectors = np.linalg.eig(sut.matrix)
+        k = np.argmax(eigenvalues.real)
+        expected = eigenvectors[:,k].real / eigenvectors[:,k].real.sum()
+        np.testing.assert_allclose(sut.score, expected)
+        self.assertAlmostEqual(sut.eigenvalue, eigenvalues[k].real)
+        self.assertAlmostEqual(sut.consistency_ratio,
+                               (eigenvalues[k].real - 3) / 2 / 0.58)
+
+    def test_score__incomplete(self):
+        """Consistent judgements are recovered with gaps."""
+        matrix = self.consistent.copy()
+        matrix[0, 3] = matrix[1, 2] = np.nan
+        sut = models.AHP(*self.requirements, matrix=matrix)
+        np.testing.assert_allclose(sut.score, self.weights)
+        self.assertAlmostEqual(sut.consistency_ratio, 0)
+
+    def test_set_ratio(self):
+        sut = models.AHP(*self.requirements)
+        np.testing.assert_allclose(sut.score, 0.25)
+        for (i, this), (j, other) in itertools.combinations(
+                enumerate(self.requirements), 2):
+            sut.set_ratio(this, other, self.consistent[i, j])
+        np.testing.assert_allclose(sut.score, self.weights)
+        self.assertRaises(ValueError, sut.set_ratio, 'A', 'B', 0)
+        self.assertRaises(ValueError, sut.set_ratio, 'A', 'A', 2)
+
+    def test_invalid_matrix(self):
+        self.assertRaises(ValueError, models.AHP, 'A', 'B',
+                          matrix=np.ones((3, 3)))
+        self.assertRaises(ValueError, models.AHP, 'A', 'B',
+                          matrix=[[1, -2], [0, 1]])
+
+    def test_solve(self):
+        """Stacked matrices are solved together."""
+        matrices = np.stack([
+            models.AHP(*self.requirements, matrix=matrix).matrix
+            for matrix in (self.consistent, np.triu(np.ones((4, 4))),
+                           np.pad(self.inconsistent, (0, 1),
+                                  'constant', constant_values=1))
+        ])
+
+        weights, ratios = models.AHP.solve(matrices)
+
+        self.assertEqual(weights.shape, (3, 4))
+        for matrix, w, ratio in zip(matrices, weights, ratios):
+            sut = models.AHP(*self.requirements, matrix=matrix)
+            np.testing.assert_allclose(w, sut.score)
+            self.assertAlmostEqual(ratio, sut.consistency_ratio)
+
+    def test_get_score_as_series(self):
+        sut = models.AHP(*self.requirements,
+                         matrix=np.triu(self.consistent))
+        series = sut.get_score_as_series()
+        self.assertEqual(series.name, 'Score')
+        self.assertEqual(list(series.index), list(self.requirements))
+        np.testing.assert_allclose(series.values, self.weights)
+
+
+class TestHierarchicalWM(unittest.TestCase):
+
+    def setUp(self):
+        self.cost = models.BinWM('Price', 'Running Cost',
+                                 matrix=[[0, 1], [0, 0]])
+        self.comfort = models.AHP('Ride', 'Noise', 'Space',
+                                  matrix=[[1, 2, 4],
+                                          [0, 1, 2],
+                                          [0, 0, 1]])
+        self.weighting = models.BinWM('Comfort', 'Cost',
+                                      matrix=[[0, 0], [0, 0]])
+        self.sut = models.HierarchicalWM(
+            [('Cost', self.cost), ('Comfort', self.comfort)],
+            weighting=self.weighting
+        )
+
+    def test_score(self):
+        """Global weights are group weights times local weights."""
+        # Cost (2/3) over Comfort (1/3).
+        expected = np.concatenate([2 / 3 * self.cost.score,
+                                   1 / 3 * self.comfort.score])
+        np.testing.assert_allclose(self.sut.score, expected)
+        np.testing.assert_allclose(self.sut.group_score, [2 / 3, 1 / 3])
+        self.assertEqual(self.sut.requirements,
+                         ('Price', 'Running Cost',
+                          'Ride', 'Noise', 'Space'))
+
+    def test_score__edit_group(self):
+        """Editing one group re-weights only that group."""
+        self.sut.score
+        self.cost._set_decision(0, 1, 0)
+
+        with mock.patch.object(models.AHP, '_power_iteration') as mock_solve:
+            actual = self.sut.score
+
+        self.assertFalse(mock_solve.called)
+        np.testing.assert_allclose(actual[:2], 2 / 3 * np.array([1, 2]) / 3)
+
+    def test_score__nested(self):
+        sut = models.HierarchicalWM([
+            ('Vehicle', self.sut),
+            ('Service', models.BinWM('Warranty', 'Dealers')),
+        ], weighting=models.BinWM('Vehicle', 'Service',
+                                  matrix=[[0, 1], [0, 0]]))
+        self.assertEqual(len(sut.score), 7)
+        self.assertAlmostEqual(sut.score.sum(), 1)
+        np.testing.assert_allclose(sut.score[:5], 2 / 3 * self.sut.score)
+        self.assertEqual(sut.comparisons, 1 + 1 + 1 + 1 + 3)
+
+    def test_from_groups(self):
+        groups = [('G{}'.format(g), ['R{}.{}'.format(g, k)
+                                     for k in range(20)])
+                  for g in range(10)]
+
+        sut = models.HierarchicalWM.from_groups(groups)
+
+        self.assertEqual(len(sut.requirements), 200)
+        self.assertEqual(sut.comparisons, 10 * 190 + 45)
+        self.assertIsInstance(sut.groups['G3'], models.BinWM)
+        self.assertAlmostEqual(sut.score.sum(), 1)
+
+    def test_invalid_groups(self):
+        self.assertRaises(ValueError, models.HierarchicalWM,
+                          [('Cost', self.cost)], weighting=self.weighting)
+        self.assertRaises(ValueError, models.HierarchicalWM,
+                          [('A', self.cost), ('B', self.cost)])
+
+    def test_prompt(self):
+        groups = [('A', mock.Mock(requirements=('a1', 'a2'))),
+                  ('B', mock.Mock(requirements=('b1',)))]
+        weighting = mock.Mock(requirements=('A', 'B'))
+        sut = models.HierarchicalWM(groups, weighting=weighting)
+
+        with mock.patch.object(sut, '_print'):
+            sut.prompt(shuffle=False)
+
+        for _, model in groups:
+            model.prompt.assert_called_once_with(checkpoint=None,
+                                                 shuffle=False)
+        weighting.prompt.assert_called_once_with(checkpoint=None,
+                                                 shuffle=False)
+
+    @mock.patch.object(models.HierarchicalWM, '_print')
+    @mock.patch.object(models.BinWM, '_print')
+    @mock.patch.object(models.BinWM, '_input')
+    def test_prompt__checkpoint(self, mock_input, *mocks):
+        """Each group resumes from its own checkpoint."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'answers.json')
+        sut = models.HierarchicalWM.from_groups([
+            ('Cost', ['Price', 'Running Cost']),
+            ('Comfort/Space', ['Ride', 'Space']),
+        ])
+        mock_input.side_effect = ['y', 'n', 'y']
+        sut.prompt(shuffle=False, checkpoint=path)
+
+        self.assertEqual(sorted(os.listdir(tmpdir)),
+                         ['answers.Comfort_Space.json',
+                          'answers.Cost.json', 'answers.json'])
+
+        resumed = models.HierarchicalWM.from_groups([
+            ('Cost', ['Price', 'Running Cost']),
+            ('Comfort/Space', ['Ride', 'Space']),
+        ])
+        mock_input.reset_mock()
+        resumed.prompt(shuffle=False, checkpoint=path)
+
+        self.assertFalse(mock_input.called)
+        np.testing.assert_allclose(resumed.score, sut.score)
+
+    def test_get_score_as_series(self):
+        series = self.sut.get_score_as_series()
+        self.assertEqual(series.name, 'Score')
+        self.assertEqual(tuple(series.index), self.sut.requirements)
+        np.testing.assert_allclose(series.values, self.sut.score)
+
+    def test_requirements__growing_group(self):
+        """Requirements follow groups which add requirements."""
+        votes = models.BradleyTerry('Ride', 'Noise')
+        sut = models.HierarchicalWM([('Cost', self.cost),
+                                     ('Comfort', votes)])
+
+        votes.add_vote('Space', 'Ride', 5)
+
+        self.assertEqual(sut.requirements, ('Price', 'Running Cost',
+                                            'Ride', 'Noise', 'Space'))
+        series = sut.get_score_as_series()
+        np.testing.assert_allclose(series['Space'],
+                                   sut.group_score[1] * votes.score[2])
+
+
+class TestBradleyTerry(unittest.TestCase):
+
+    def setUp(self):
+        self.requirements = ['R{}'.format(k) for k in range(6)]
+        rng = np.random.RandomState(0)
+        self.strength = rng.gamma(2, 1, 6)
+        self.votes = []
+        for _ in range(6000):
+            i, j = rng.choice(6, 2, replace=False)
+            p = self.strength[i] / (self.strength[i] + self.strength[j])
+            if rng.rand() > p:
+                i, j = j, i
+            self.votes.append((self.requirements[i],
+                               self.requirements[j]))
+
+    def test_score(self):
+        """Strengths are recovered from simulated votes."""
+        sut = models.BradleyTerry(*self.requirements)
+        sut.add_votes(self.votes)
+        np.testing.assert_allclose(sut.score,
+                                   self.strength / self.strength.sum(),
+                                   atol=0.02)
+        self.assertAlmostEqual(sut.score.sum(), 1)
+
+    def test_score__incremental(self):
+        """New votes refit from the previous strengths."""
+        sut = models.BradleyTerry(*self.requirements)
+        sut.add_votes(self.votes[:5900])
+        sut.score
+        cold_start = sut.iterations
+
+        sut.add_votes(self.votes[5900:])
+        actual = sut.score
+
+        expected = models.BradleyTerry(*self.requirements)
+        expected.add_votes(self.votes)
+        np.testing.assert_allclose(actual, expected.score, atol=1e-6)
+        self.assertLess(sut.iterations, cold_start)
+
+    def test_score__empty(self):
+        """Without requirements or votes, the score is empty or equal."""
+        sut = models.BradleyTerry()
+        self.assertEqual(sut.score.shape, (0,))
+        self.assertTrue(sut.get_score_as_series().empty)
+
+        sut = models.BradleyTerry('a', 'b', 'c')
+        np.testing.assert_allclose(sut.score, np.ones(3) / 3)
+        self.assertEqual(sut.iterations, 0)
+
+    def test_score__copy(self):
+        """Changing a score read doesn't change the model's."""
+        sut = models.BradleyTerry(*self.requirements)
+        sut.add_votes(self.votes)
+        score = sut.score
+        expected = score.copy()
+
+        score[0] = 99
+
+        np.testing.assert_array_equal(sut.score, expected)
+
+    def test_score__unbeaten(self):
+        """The prior keeps requirements which never lose finite."""
+        sut = models.BradleyTerry('A', 'B', 'C')
+        sut.add_vote('A', 'B', count=3)
+        sut.add_vote('B', 'C')
+        self.assertTrue(np.isfinite(sut.score).all())
+        self.assertTrue((sut.score > 0).all())
+        self.assertEqual(list(np.argsort(-sut.score)), [0, 1, 2])
+
+    def test_add_vote__new_requirement(self):
+        sut = models.BradleyTerry('A')
+        sut.add_vote('B', 'A')
+        self.assertEqual(sut.requirements, ['A', 'B'])
+        self.assertGreater(sut.score[1], sut.score[0])
+        self.assertRaises(ValueError, sut.add_vote, 'A', 'A')
+
+    def test_get_score_as_series(self):
+        sut = models.BradleyTerry(*self.requirements)
+        sut.add_votes(self.votes)
+        series = sut.get_score_as_series()
+        self.assertEqual(series.name, 'Score')
+        self.assertEqual(list(series.index), self.requirements)
+        np.testing.assert_allclose(series.values, sut.score)
+
+
+@ddt
+class TestPackedTriangle(unittest.TestCase):
+
+    def random_matrix(self, n):
+        return np.triu(np.random.randint(0, 2, (n, n)), k=1)
+
+    @data(0, 1, 2, 3, 8, 9, 31)
+    def test_from_dense(self, n):
+        matrix = self.random_matrix(n)
+
+        sut = models.PackedTriangle.from_dense(matrix)
+
+        self.assertEqual(sut.bits.nbytes, (n * (n - 1) // 2 + 7) // 8)
+        np.testing.assert_array_equal(sut.to_dense(), matrix)
+
+    @data(1, 2, 9, 31)
+    def test_sums(self, n):
+        matrix = self.random_matrix(n)
+        sut = models.PackedTriangle.from_dense(matrix)
+        sut._CHUNK_BITS = 16    # exercise chunking
+
+        np.testing.assert_array_equal(sut.row_sums(), matrix.sum(axis=1))
+        np.testing.assert_array_equal(sut.column_sums(),
+                                      matrix.sum(axis=0))
+
+    @unittest.skipIf(tracemalloc is None, "requires tracemalloc")
+    def test_memory(self):
+        """Neither construction nor scoring builds a dense matrix."""
+        n = 2000
+        names = ['R{}'.format(i) for i in range(n)]
+        bound = n * n // 8      # a dense int8 matrix is n * n bytes
+
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        bwm = models.BinWM(*names)
+        _, construction_peak = tracemalloc.get_traced_memory()
+        tracemalloc.clear_traces()
+        with mock.patch.object(models.PackedTriangle, '_CHUNK_BITS',
+                               2**16):
+            bwm.score
+        _, score_peak = tracemalloc.get_traced_memory()
+
+        self.assertLess(construction_peak, bound)
+        self.assertLess(score_peak, bound)
+
+    def test_setitem(self):
+        sut = models.PackedTriangle(5)
+
+        sut[0, 4] = 1
+        sut[3, 4] = True
+        sut[3, 4] = 0
+        sut[1, 2] = 1
+
+        self.assertEqual(sut[0, 4], 1)
+        self.assertEqual(sut[3, 4], 0)
+        np.testing.assert_array_equal(sut.row_sums(), [1, 1, 0, 0, 0])
+        self.assertRaises(IndexError, sut.__setitem__, (2, 1), 1)
+
 
 @mock.patch.object(models.BinWM, '_get_sheet')
 class TestBinWM_GoogleSheetsIntegration(TestCase):
@@ -205,6 +771,42 @@ class TestBinWM_GoogleSheetsIntegration(TestCase):
 
         mock_sheet.update.assert_called_once_with(blank_df)
 
+    def test_afrom_google_sheet(self, mock_getter):
+        """Awaitable constructor fetches the sheet in an executor."""
+        if models.common.aio.asyncio is None:
+            self.skipTest("asyncio requires Python 3")
+        asyncio = models.common.aio.asyncio
+        mock_sheet = self.setup_mock_sheet(mock_getter)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.addCleanup(asyncio.set_event_loop, None)
+        self.addCleanup(loop.close)
+
+        bwm = loop.run_until_complete(
+            models.BinWM.afrom_google_sheet('dummy name')
+        )
+
+        mock_getter.assert_called_once_with('dummy name', None)
+        self.assertIs(bwm._sheet, mock_sheet)
+
+    @mock.patch.object(models.common.io, 'fetch_sheets')
+    def test_from_google_sheets(self, mock_fetch_sheets, mock_getter):
+        """Matrices are built per workbook and errors are collected."""
+        mock_sheet = self.setup_mock_sheet(mock_getter)
+        SheetResult = models.common.io.SheetResult
+        mock_fetch_sheets.return_value = [
+            SheetResult('a', mock_sheet, None),
+            SheetResult('b', None, 'HttpError: 403'),
+        ]
+
+        matrices, errors = models.BinWM.from_google_sheets(['a', 'b'])
+
+        self.assertEqual(list(matrices), ['a'])
+        self.assertIs(matrices['a']._sheet, mock_sheet)
+        np.testing.assert_allclose(matrices['a'].matrix,
+                                   mock_sheet.get_value_matrix())
+        self.assertEqual(errors, {'b': 'HttpError: 403'})
+
 
 class TestBinWM_ExcelIntegration(unittest.TestCase):
     # TODO: BinWM is not current integrated with Excel
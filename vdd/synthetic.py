@@ -0,0 +1,205 @@
+"""Synthetic models and weighting matrices for load testing.
+
+Generates random but valid CODA models and binary weighting matrices
+at any size, as in-memory models, Excel workbooks (compact or full
+layout) or the rows of a Google Sheet (as returned by
+`common.io.GSheetsFacade.get_rows`), for benchmarking and stress
+testing the parsers and evaluators.
+
+Generation is seeded for reproducibility, e.g.
+
+    records = synthetic.coda_records(5000, 20, density=0.2, seed=1)
+    synthetic.write_excel(records, 'large.xlsx', layout='full')
+
+Note that the Excel parsers read a limited number of characteristics
+(see `ExcelParser._MAX_COL`); model size is best scaled by
+requirements when generating workbooks.
+"""
+from __future__ import division
+
+import numpy as np
+
+from .coda import io as coda_io
+from .coda import models as coda_models
+from .requirements import models as requirements_models
+
+
+RELATIONSHIP_TYPES = ('max', 'min', 'opt')
+CORRELATIONS = (0.1, 0.3, 0.9)
+
+
+def coda_records(n_requirements, n_characteristics, density=0.3,
+                 type_mix=None, seed=None):
+    """Random CODA model definition.
+
+    Every requirement relates to at least one characteristic (a
+    requirement without relationships has no defined satisfaction).
+
+    Parameters
+    ----------
+
+    n_requirements, n_characteristics : int
+        Model size.
+
+    density : real
+        Fraction of requirement-characteristic pairs related.
+
+    type_mix : dict, optional
+        Relative frequency of each relationship type ('max', 'min',
+        'opt'); equal by default.
+
+    seed : int, optional
+        Random seed.
+
+    Returns
+    -------
+
+    coda.io.CODARecords
+    """
+    if n_characteristics < 1 and n_requirements:
+        raise ValueError("Requirements need a characteristic to relate "
+                         "to.")
+    rng = np.random.RandomState(seed)
+    type_mix = type_mix or dict.fromkeys(RELATIONSHIP_TYPES, 1)
+    if set(type_mix) - set(RELATIONSHIP_TYPES):
+        raise ValueError("Relationship types are {}."
+                         .format(RELATIONSHIP_TYPES))
+    types = sorted(type_mix)
+    p = np.array([type_mix[t] for t in types], dtype=float)
+
+    requirements = [('Requirement {}'.format(i), int(weight))
+                    for i, weight in enumerate(
+                        rng.randint(1, 11, n_requirements))]
+
+    lower = np.round(rng.uniform(0, 100, n_characteristics), 2)
+    upper = np.round(lower + rng.uniform(10, 100, n_characteristics), 2)
+    # Not 'Characteristic n'; the Excel parsers take that for a
+    # default column name.
+    characteristics = [('Parameter {}'.format(j), lower[j], upper[j])
+                       for j in range(n_characteristics)]
+
+    related = rng.rand(n_requirements, n_characteristics) < density
+    related[np.arange(n_requirements),
+            rng.randint(0, max(n_characteristics, 1),
+                        n_requirements)] = True
+    rows, cols = np.nonzero(related)
+    count = len(rows)
+    type_index = rng.choice(len(types), count, p=p / p.sum())
+    correlations = rng.choice(CORRELATIONS, count)
+    span = upper[cols] - lower[cols]
+    targets = np.round(lower[cols] + rng.uniform(0.1, 0.9, count) * span,
+                       2)
+    tolerances = np.round(rng.uniform(0.05, 0.25, count) * span, 2)
+
+    relationships = []
+    for k, (i, j) in enumerate(zip(rows, cols)):
+        type_ = types[type_index[k]]
+        rec = (requirements[i][0], characteristics[j][0], type_,
+               correlations[k], targets[k])
+        if type_ == 'opt':
+            rec += (tolerances[k],)
+        relationships.append(rec)
+
+    return coda_io.CODARecords(requirements, characteristics,
+                               relationships)
+
+
+def coda_model(n_requirements, n_characteristics, density=0.3,
+               type_mix=None, seed=None):
+    """Random CODA model, with parameter values set.
+
+    See `coda_records`.
+    """
+    records = coda_records(n_requirements, n_characteristics, density,
+                           type_mix, seed)
+    model = coda_models.CODA.from_records(records)
+    rng = np.random.RandomState(seed)
+    model.parameter_value = [rng.uniform(min_, max_) for _, min_, max_
+                             in records.get_characteristics()]
+    return model
+
+
+def binwm_matrix(n, noise=0.0, seed=None):
+    """Random binary weighting matrix (upper triangular decisions).
+
+    Decisions follow a random ranking of the requirements, each
+    reversed with probability `noise` (0.5 is wholly random).
+    """
+    rng = np.random.RandomState(seed)
+    rank = rng.permutation(n)
+    decisions = rank[:,None] < rank
+    decisions ^= rng.rand(n, n) < noise
+    return np.triu(decisions, k=1).astype(np.int8)
+
+
+def binwm(n, noise=0.0, seed=None):
+    """Random BinWM of n requirements; see `binwm_matrix`."""
+    names = ['Requirement {}'.format(i) for i in range(n)]
+    return requirements_models.BinWM(
+        *names, matrix=binwm_matrix(n, noise, seed)
+    )
+
+
+def write_excel(source, path, layout='compact', sheet_name='CODA'):
+    """Write a CODA model definition (io.CODASheet) to Excel.
+
+    layout is 'compact' (read by CompactExcelParser) or 'full'
+    (ExcelParser).
+    """
+    writer = {'compact': coda_io.write_compact_excel,
+              'full': coda_io.write_excel}[layout]
+    writer(source, path, sheet_name)
+
+
+def coda_rows(source):
+    """Rows of a CODA model definition (io.CODASheet) as a sheet.
+
+    As returned by `GSheetsFacade.get_rows` for a compact layout
+    Google Sheet (read by `coda.io.GSheetCODA`): a rectangular list
+    of rows of strings, blank cells empty.
+    """
+    characteristics = source.get_characteristics()
+    cidx = {rec[0]: j for j, rec in enumerate(characteristics)}
+    n = coda_io.CompactExcelParser._NCOLS_CHAR
+
+    rows = [['', 'Characteristics'], ['', ''],
+            ['Requirements', 'Weighting']]
+    for name, min_, max_ in characteristics:
+        rows[0] += [name, '', '']
+        rows[1] += ['Bounds', _cell(min_), _cell(max_)]
+        rows[2] += ['Relationship Type', 'Target Value', 'Tolerance']
+
+    body = {}
+    for name, weight in source.get_requirements():
+        body[name] = [name, _cell(weight)] + [''] * (n * len(cidx))
+        rows.append(body[name])
+    for rec in source.get_relationships():
+        row = body[rec[0]]
+        j = 2 + cidx[rec[1]] * n
+        row[j] = coda_io._relationship_symbol(rec[2], rec[3])
+        row[j+1] = _cell(rec[4])
+        if rec[2] == 'opt':
+            row[j+2] = _cell(rec[5])
+    return rows
+
+
+def binwm_rows(matrix, requirements=None, label=''):
+    """Rows of a binary weighting matrix as a sheet.
+
+    As returned by `GSheetsFacade.get_rows` for a Google Sheet read
+    by `requirements.io.GSheetBinWM`; the lower triangle is blank.
+    """
+    matrix = np.asarray(matrix)
+    n = len(matrix)
+    if requirements is None:
+        requirements = ['Requirement {}'.format(i) for i in range(n)]
+    cells = np.where(np.triu(matrix, k=1) == 1, '1', '0')
+    cells[np.tril_indices(n)] = ''
+    return [[label] + list(requirements)] + [
+        [name] + row for name, row in zip(requirements, cells.tolist())
+    ]
+
+
+def _cell(value):
+    # Sheet cell text of a value.
+    return '' if value is None else '{}'.format(value)
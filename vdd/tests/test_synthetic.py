@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+import numpy as np
+
+from .. import synthetic
+from ..coda import io as coda_io
+from ..coda import models as coda_models
+from ..requirements import io as requirements_io
+
+
+class TestCODA(unittest.TestCase):
+
+    def setUp(self):
+        self.records = synthetic.coda_records(60, 8, density=0.2, seed=1)
+
+    def test_coda_records(self):
+        requirements = self.records.get_requirements()
+        characteristics = self.records.get_characteristics()
+        relationships = self.records.get_relationships()
+        self.assertEqual(len(requirements), 60)
+        self.assertEqual(len(characteristics), 8)
+
+        # Every requirement is related, targets are within bounds.
+        self.assertEqual(set(rec[0] for rec in relationships),
+                         set(rec[0] for rec in requirements))
+        bounds = dict((rec[0], rec[1:]) for rec in characteristics)
+        for rec in relationships:
+            min_, max_ = bounds[rec[1]]
+            self.assertTrue(min_ <= rec[4] <= max_)
+            self.assertIn(rec[3], synthetic.CORRELATIONS)
+            self.assertEqual(len(rec), 6 if rec[2] == 'opt' else 5)
+
+    def test_coda_records__seed(self):
+        self.assertEqual(
+            synthetic.coda_records(60, 8, density=0.2,
+                                   seed=1).get_relationships(),
+            self.records.get_relationships()
+        )
+
+    def test_coda_records__type_mix(self):
+        records = synthetic.coda_records(100, 10, type_mix={'min': 1},
+                                         seed=1)
+        types = set(rec[2] for rec in records.get_relationships())
+        self.assertEqual(types, {'min'})
+        self.assertRaises(ValueError, synthetic.coda_records, 10, 2,
+                          type_mix={'less': 1})
+
+    def test_coda_model(self):
+        model = synthetic.coda_model(60, 8, density=0.2, seed=1)
+        self.assertEqual(model.shape, (60, 8))
+        self.assertTrue(0 < model.merit < 1)
+
+    def test_write_excel(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        for layout, parser_class in [
+                ('compact', coda_io.CompactExcelParser),
+                ('full', coda_io.ExcelParser)]:
+            path = os.path.join(tmpdir, layout + '.xlsx')
+            synthetic.write_excel(self.records, path, layout)
+            parser = parser_class(path)
+            self.assertEqual(parser.get_requirements(),
+                             self.records.get_requirements())
+            self.assertEqual(len(parser.get_relationships()),
+                             len(self.records.get_relationships()))
+
+    def test_coda_rows(self):
+        """Rows are read by GSheetCODA as the model."""
+        rows = synthetic.coda_rows(self.records)
+        self.assertEqual(set(map(len, rows)), {2 + 3 * 8})
+        self.assertTrue(all(isinstance(cell, str)
+                            for row in rows for cell in row))
+
+        sheet = coda_io.GSheetCODA('workbook')
+        sheet._facade = mock.Mock(**{'get_rows.return_value': rows})
+        expected = coda_models.CODA.from_records(self.records)
+        actual = coda_models.CODA.from_records(sheet)
+
+        np.testing.assert_allclose(actual.correlation,
+                                   expected.correlation)
+        np.testing.assert_allclose(actual.weight, expected.weight)
+
+
+class TestBinWM(unittest.TestCase):
+
+    def test_binwm_matrix(self):
+        """Noiseless decisions are consistent, noisy ones aren't."""
+        consistent = synthetic.binwm(30, seed=1)
+        self.assertEqual(consistent.cyclic_triads, 0)
+        self.assertEqual(sorted(consistent.score * 465),
+                         list(range(1, 31)))
+
+        noisy = synthetic.binwm(30, noise=0.3, seed=1)
+        self.assertGreater(noisy.cyclic_triads, 0)
+
+    def test_binwm_rows(self):
+        """Rows are read by GSheetBinWM as the matrix."""
+        matrix = synthetic.binwm_matrix(25, noise=0.2, seed=1)
+
+        sheet = requirements_io.GSheetBinWM('workbook')
+        sheet._facade = mock.Mock(**{
+            'get_rows.return_value': synthetic.binwm_rows(matrix)
+        })
+
+        np.testing.assert_array_equal(sheet.get_value_matrix(), matrix)
+        self.assertEqual(sheet.get_requirements()[0], 'Requirement 0')
+
+
+if __name__ == '__main__':
+    unittest.main()